@@ -255,7 +255,7 @@ class AgentFactory:
             meta = await self.pm.refine_with_clarification(meta, answers)
 
             # Re-estimate complexity and plan after refinement
-            complexity = await self.pm.estimate_complexity(user_input, bool(paths))
+            complexity = self.pm.estimate_complexity(user_input, bool(paths))
             meta.complexity_score = complexity
             if complexity >= 4:
                 execution_plan = await self.pm.create_execution_plan(meta)
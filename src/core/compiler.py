@@ -1,7 +1,12 @@
 """Compiler module for generating agent code from JSON configurations."""
 
 import json
+import logging
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from types import MappingProxyType
 from typing import Optional
 from datetime import datetime
 from jinja2 import Environment, FileSystemLoader, Template
@@ -10,6 +15,98 @@ from pydantic import BaseModel, Field
 from ..schemas import GraphStructure, RAGConfig, ToolsConfig, ProjectMeta
 from ..tools.definitions import CURATED_TOOLS
 from ..utils.config_utils import atomic_write_json
+from ..utils.file_utils import write_text_if_changed
+
+logger = logging.getLogger(__name__)
+
+# Splits a requirement spec into its distribution name (e.g. "pypdf>=3.17.0" -> "pypdf")
+_REQUIREMENT_NAME_SPLIT = re.compile(r"[<>=!~;\[\s]")
+
+# Chroma collection name sanitizing (see Compiler's sanitize_collection_name filter)
+_SANITIZE_INVALID = re.compile(r"[^a-zA-Z0-9._-]")
+_SANITIZE_UNDERSCORES = re.compile(r"_{2,}")
+_ASCII_ALNUM = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789")
+
+# Header line of the generated .env that carries the generation timestamp
+_ENV_TIMESTAMP_PREFIX = "# Generated from system configuration on "
+
+# Generated .env layout, filled by Compiler._generate_env_file_content
+_ENV_FILE_TEMPLATE = (
+    """# IteraAgent - Auto-generated Configuration
+"""
+    + _ENV_TIMESTAMP_PREFIX
+    + """{timestamp}
+# This file is auto-populated with your current environment settings.
+
+# Runtime API Configuration
+RUNTIME_PROVIDER={RUNTIME_PROVIDER}
+RUNTIME_MODEL={RUNTIME_MODEL}
+RUNTIME_API_KEY={RUNTIME_API_KEY}
+RUNTIME_BASE_URL={RUNTIME_BASE_URL}
+RUNTIME_TIMEOUT={RUNTIME_TIMEOUT}
+RUNTIME_TEMPERATURE={RUNTIME_TEMPERATURE}
+
+# Embedding Configuration
+EMBEDDING_PROVIDER={EMBEDDING_PROVIDER}
+EMBEDDING_MODEL_NAME={EMBEDDING_MODEL_NAME}
+EMBEDDING_BASE_URL={EMBEDDING_BASE_URL}
+EMBEDDING_API_KEY={EMBEDDING_API_KEY}
+
+# Judge API Configuration (用于 DeepEval 测试评估)
+# 如果未配置,DeepEval 将使用 Runtime API
+JUDGE_PROVIDER={JUDGE_PROVIDER}
+JUDGE_MODEL={JUDGE_MODEL}
+JUDGE_API_KEY={JUDGE_API_KEY}
+JUDGE_BASE_URL={JUDGE_BASE_URL}
+JUDGE_TIMEOUT={JUDGE_TIMEOUT}
+JUDGE_TEMPERATURE={JUDGE_TEMPERATURE}
+"""
+)
+
+
+def _dedupe_requirements(lines: list[str]) -> list[str]:
+    """Drop duplicate requirement specs while preserving order.
+
+    Package lines are keyed by distribution name; a later spec for the same
+    package replaces the earlier one in place (last wins). Comments and blank
+    lines are kept only if a new package follows them, so a section whose
+    packages were all listed earlier does not leave an empty header behind.
+    """
+    result: list[str] = []
+    pending: list[str] = []
+    positions: dict[str, int] = {}
+    for line in lines:
+        stripped = line.strip()
+        if not stripped:
+            # A blank line opens a new section; drop any header left without packages
+            pending = [line]
+            continue
+        if stripped.startswith("#"):
+            pending.append(line)
+            continue
+        name = _REQUIREMENT_NAME_SPLIT.split(stripped, 1)[0].lower()
+        if name in positions:
+            result[positions[name]] = line
+            continue
+        result.extend(pending)
+        pending = []
+        positions[name] = len(result)
+        result.append(line)
+    return result
+
+
+def _strip_env_timestamp(content: str) -> str:
+    """Generated .env content without its timestamp header, for change detection."""
+    return "".join(
+        line
+        for line in content.splitlines(keepends=True)
+        if not line.startswith(_ENV_TIMESTAMP_PREFIX)
+    )
+
+
+def _stream_template_to_file(template: Template, path: Path, context) -> None:
+    """Render a template directly into a file without building the full string."""
+    template.stream(context).dump(str(path), encoding="utf-8")
 
 
 class CompileResult(BaseModel):
@@ -30,13 +127,16 @@ class Compiler:
     using Jinja2 templates.
     """
 
-    def __init__(self, template_dir: Path):
+    def __init__(self, template_dir: Path, parallel_render: bool = False):
         """Initialize compiler with template directory.
 
         Args:
             template_dir: Path to directory containing Jinja2 templates
+            parallel_render: Render/write prompts.yaml on a worker thread while
+                agent.py is rendered and formatted (default: False)
         """
         self.template_dir = template_dir
+        self._parallel_render = parallel_render
         self.env = Environment(
             loader=FileSystemLoader(template_dir),
             trim_blocks=True,
@@ -46,15 +146,13 @@ class Compiler:
         # 🆕 Add custom filter for sanitizing collection names
         def sanitize_collection_name(name: str) -> str:
             """Replace non-ASCII and special characters with underscores"""
-            import re
-
             # 1. Replace invalid chars with underscores
-            clean = re.sub(r"[^a-zA-Z0-9._-]", "_", name)
+            clean = _SANITIZE_INVALID.sub("_", name)
 
-            # 2. Ensure start/end with alphanumeric
-            if not clean or not clean[0].isalnum():
+            # 2. Ensure start/end with alphanumeric (ASCII-only after step 1)
+            if not clean or clean[0] not in _ASCII_ALNUM:
                 clean = "agent" + clean
-            if not clean[-1].isalnum():
+            if clean[-1] not in _ASCII_ALNUM:
                 clean = clean + "docs"
 
             # 3. Ensure length (3-63) - Chroma allows 512 but safe limit is better
@@ -62,7 +160,7 @@ class Compiler:
                 clean = clean + "_data"
 
             # 4. Collapse multiple underscores
-            clean = re.sub(r"_{2,}", "_", clean)
+            clean = _SANITIZE_UNDERSCORES.sub("_", clean)
 
             return clean
 
@@ -90,24 +188,25 @@ class Compiler:
         """
         tool_imports = set()
         tool_inits = []
+        skipped = []  # (tool_id, reason), reported once after the loop
 
         for tool_id in enabled_tools:
             # 从 CURATED_TOOLS 获取元数据
             meta = next((t for t in CURATED_TOOLS if t["id"] == tool_id), None)
             if not meta:
-                print(f"⚠️ Warning: Tool '{tool_id}' not found in CURATED_TOOLS")
+                skipped.append((tool_id, "not found in CURATED_TOOLS"))
                 continue
 
             # 1. 解析导入路径 (Python 处理,不在模板里做)
             import_path = meta.get("import_path")
             if not import_path:
-                print(f"⚠️ Warning: Tool '{tool_id}' missing import_path")
+                skipped.append((tool_id, "missing import_path"))
                 continue
 
             try:
                 module_path, class_name = import_path.rsplit(".", 1)
             except ValueError:
-                print(f"⚠️ Warning: Invalid import_path for '{tool_id}': {import_path}")
+                skipped.append((tool_id, f"invalid import_path {import_path!r}"))
                 continue
 
             tool_imports.add(f"from {module_path} import {class_name}")
@@ -125,13 +224,12 @@ class Compiler:
             args_schema = meta.get("args_schema", {})
             properties = args_schema.get("properties", {})
 
-            for prop_name, prop_def in properties.items():
-                if "default" in prop_def:
-                    default_value = prop_def["default"]
-                    if isinstance(default_value, str):
-                        init_params.append(f'{prop_name}="{default_value}"')
-                    else:
-                        init_params.append(f"{prop_name}={default_value}")
+            # repr() yields valid Python literals (quotes escaped, True/None)
+            init_params.extend(
+                f"{prop_name}={prop_def['default']!r}"
+                for prop_name, prop_def in properties.items()
+                if "default" in prop_def
+            )
 
             tool_inits.append(
                 {
@@ -143,8 +241,35 @@ class Compiler:
                 }
             )
 
+        if skipped:
+            logger.warning(
+                "Skipped %d tool(s): %s",
+                len(skipped),
+                "; ".join(f"'{tool_id}' {reason}" for tool_id, reason in skipped),
+            )
+
         return {"tool_imports": sorted(list(tool_imports)), "tool_inits": tool_inits}
 
+    def _write_agent_code(self, template: Template, agent_file: Path, context) -> None:
+        """Render agent.py, format it with black (if available) and write it.
+
+        Args:
+            template: agent.py template
+            agent_file: Output path
+            context: Template context mapping
+        """
+        agent_code = template.render(context)
+
+        # Format code with black (if available)
+        try:
+            import black
+
+            agent_code = black.format_str(agent_code, mode=black.Mode())
+        except ImportError:
+            pass  # Black not available, skip formatting
+
+        agent_file.write_text(agent_code, encoding="utf-8")
+
     def compile(
         self,
         project_meta: ProjectMeta,
@@ -169,14 +294,17 @@ class Compiler:
             # Create output directory
             output_dir.mkdir(parents=True, exist_ok=True)
             generated_files = []
+            # Pure-chat agents (no tools) skip tool metadata prep and tools_config.json
+            has_tools = bool(tools_config.enabled_tools)
+            enabled_tool_ids = set(tools_config.enabled_tools)
 
             # Prepare template context
             context = {
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
                 "agent_name": project_meta.agent_name,
                 "description": project_meta.description,
                 "has_rag": project_meta.has_rag,
-                "has_tools": len(tools_config.enabled_tools) > 0,
+                "has_tools": has_tools,
                 # New Phase 3 fields
                 "pattern": graph.pattern,
                 "state_schema": graph.state_schema,
@@ -188,9 +316,9 @@ class Compiler:
                 "entry_point": graph.entry_point,
                 # Tools and config
                 "enabled_tools": tools_config.enabled_tools,
-                "enabled_tools_meta": [
-                    t for t in CURATED_TOOLS if t["id"] in tools_config.enabled_tools
-                ],
+                "enabled_tools_meta": (
+                    [t for t in CURATED_TOOLS if t["id"] in enabled_tool_ids] if has_tools else []
+                ),
                 "agent_type": project_meta.task_type,
                 "language": project_meta.language,
                 "custom_instructions": project_meta.description,
@@ -202,7 +330,7 @@ class Compiler:
                 context["rag_config"] = rag_config
 
             # 🆕 方案 A+: 预处理工具上下文
-            if len(tools_config.enabled_tools) > 0:
+            if has_tools:
                 tool_context = self._prepare_tool_context(tools_config.enabled_tools)
                 context["tool_imports"] = tool_context["tool_imports"]
                 context["tool_inits"] = tool_context["tool_inits"]
@@ -210,66 +338,73 @@ class Compiler:
                 context["tool_imports"] = []
                 context["tool_inits"] = []
 
-            # Generate agent.py
-            agent_template = self.env.get_template("agent_template.py.j2")
-            agent_code = agent_template.render(**context)
-
-            # Format code with black (if available)
-            try:
-                import black
-
-                agent_code = black.format_str(agent_code, mode=black.Mode())
-            except ImportError:
-                pass  # Black not available, skip formatting
-
-            agent_file = output_dir / "agent.py"
-            agent_file.write_text(agent_code, encoding="utf-8")
-            generated_files.append("agent.py")
+            # Shared read-only by every template; render() takes the mapping positionally
+            context = MappingProxyType(context)
 
             # Generate prompts.yaml
+            # Streamed straight to disk; agent.py needs the full text for black
             prompts_template = self.env.get_template("prompts_template.yaml.j2")
-            prompts_content = prompts_template.render(**context)
             prompts_file = output_dir / "prompts.yaml"
-            prompts_file.write_text(prompts_content, encoding="utf-8")
+
+            # Generate agent.py (overlapping with the prompts.yaml render/write)
+            agent_template = self.env.get_template("agent_template.py.j2")
+            agent_file = output_dir / "agent.py"
+            if self._parallel_render:
+                with ThreadPoolExecutor(max_workers=1) as executor:
+                    prompts_future = executor.submit(
+                        _stream_template_to_file, prompts_template, prompts_file, context
+                    )
+                    self._write_agent_code(agent_template, agent_file, context)
+                    prompts_future.result()
+            else:
+                self._write_agent_code(agent_template, agent_file, context)
+                _stream_template_to_file(prompts_template, prompts_file, context)
+            generated_files.append("agent.py")
             generated_files.append("prompts.yaml")
 
             # Generate requirements.txt
             requirements = self._generate_requirements(
                 has_rag=project_meta.has_rag,
-                has_tools=len(tools_config.enabled_tools) > 0,
+                has_tools=has_tools,
                 rag_config=rag_config,
                 file_paths=project_meta.file_paths,
             )
             requirements_file = output_dir / "requirements.txt"
-            requirements_file.write_text(requirements, encoding="utf-8")
+            write_text_if_changed(requirements_file, requirements)
             generated_files.append("requirements.txt")
 
             # Generate .env.template
             env_template = self._generate_env_template()
             env_file = output_dir / ".env.template"
-            env_file.write_text(env_template, encoding="utf-8")
+            write_text_if_changed(env_file, env_template)
             generated_files.append(".env.template")
 
             # 🆕 Generate real .env with current config (Auto-configuration)
+            # Only the timestamp changes between identical compiles, so ignore it
             env_content = self._generate_env_file_content()
             real_env_file = output_dir / ".env"
-            real_env_file.write_text(env_content, encoding="utf-8")
+            try:
+                unchanged = _strip_env_timestamp(
+                    real_env_file.read_text(encoding="utf-8")
+                ) == _strip_env_timestamp(env_content)
+            except (UnicodeDecodeError, OSError):
+                unchanged = False
+            if not unchanged:
+                real_env_file.write_text(env_content, encoding="utf-8")
             generated_files.append(".env")
 
             # 🆕 Phase 4: 生成 pip.conf (优化 2 - 预安装)
             pip_config = self._generate_pip_config()
             pip_config_file = output_dir / "pip.conf"
-            pip_config_file.write_text(pip_config, encoding="utf-8")
+            write_text_if_changed(pip_config_file, pip_config)
             generated_files.append("pip.conf")
 
             # 🆕 Phase 4: 生成安装脚本
             install_sh = self._generate_install_script_sh()
             install_sh_file = output_dir / "install.sh"
-            install_sh_file.write_text(install_sh, encoding="utf-8")
+            write_text_if_changed(install_sh_file, install_sh)
             # 设置可执行权限 (Unix/Linux/Mac)
             try:
-                import os
-
                 os.chmod(install_sh_file, 0o755)
             except Exception:
                 pass  # Windows 不需要
@@ -277,7 +412,7 @@ class Compiler:
 
             install_bat = self._generate_install_script_bat()
             install_bat_file = output_dir / "install.bat"
-            install_bat_file.write_text(install_bat, encoding="utf-8")
+            write_text_if_changed(install_bat_file, install_bat)
             generated_files.append("install.bat")
 
             # Save graph.json for UI visualization
@@ -291,7 +426,7 @@ class Compiler:
                 generated_files.append("rag_config.json")
 
             # 🆕 Save tools_config.json if tools are enabled
-            if tools_config and len(tools_config.enabled_tools) > 0:
+            if has_tools:
                 atomic_write_json(output_dir / "tools_config.json", tools_config.model_dump())
                 generated_files.append("tools_config.json")
 
@@ -423,7 +558,7 @@ class Compiler:
                 ]
             )
 
-        return "\n".join(requirements)
+        return "\n".join(_dedupe_requirements(requirements))
 
     def _generate_env_template(self) -> str:
         """Generate .env.template content.
@@ -464,40 +599,35 @@ JUDGE_TEMPERATURE=0.0
         Returns:
             Populated .env content as string
         """
-        import os
-        from datetime import datetime
-
-        # Helper to get env with default (fallback to sensible defaults if env not set)
-        def get_val(key, default):
-            return os.getenv(key, default)
-
-        return f"""# IteraAgent - Auto-generated Configuration
-# Generated from system configuration on {datetime.now().isoformat()}
-# This file is auto-populated with your current environment settings.
-
-# Runtime API Configuration
-RUNTIME_PROVIDER={get_val("RUNTIME_PROVIDER", "openai")}
-RUNTIME_MODEL={get_val("RUNTIME_MODEL", "deepseek-chat")}
-RUNTIME_API_KEY={get_val("RUNTIME_API_KEY", "")}
-RUNTIME_BASE_URL={get_val("RUNTIME_BASE_URL", "https://api.deepseek.com")}
-RUNTIME_TIMEOUT={get_val("RUNTIME_TIMEOUT", "30")}
-RUNTIME_TEMPERATURE={get_val("RUNTIME_TEMPERATURE", "0.7")}
-
-# Embedding Configuration
-EMBEDDING_PROVIDER={get_val("EMBEDDING_PROVIDER", "ollama")}
-EMBEDDING_MODEL_NAME={get_val("EMBEDDING_MODEL_NAME", get_val("EMBEDDING_MODEL", "nomic-embed-text"))}
-EMBEDDING_BASE_URL={get_val("EMBEDDING_BASE_URL", "http://localhost:11434")}
-EMBEDDING_API_KEY={get_val("EMBEDDING_API_KEY", "")}
-
-# Judge API Configuration (用于 DeepEval 测试评估)
-# 如果未配置,DeepEval 将使用 Runtime API
-JUDGE_PROVIDER={get_val("JUDGE_PROVIDER", get_val("RUNTIME_PROVIDER", "openai"))}
-JUDGE_MODEL={get_val("JUDGE_MODEL", get_val("RUNTIME_MODEL", "deepseek-chat"))}
-JUDGE_API_KEY={get_val("JUDGE_API_KEY", get_val("RUNTIME_API_KEY", ""))}
-JUDGE_BASE_URL={get_val("JUDGE_BASE_URL", get_val("RUNTIME_BASE_URL", "https://api.deepseek.com"))}
-JUDGE_TIMEOUT={get_val("JUDGE_TIMEOUT", "60")}
-JUDGE_TEMPERATURE={get_val("JUDGE_TEMPERATURE", "0.0")}
-"""
+        env = os.environ
+        runtime_provider = env.get("RUNTIME_PROVIDER", "openai")
+        runtime_model = env.get("RUNTIME_MODEL", "deepseek-chat")
+        runtime_api_key = env.get("RUNTIME_API_KEY", "")
+        runtime_base_url = env.get("RUNTIME_BASE_URL", "https://api.deepseek.com")
+
+        # Fallback to sensible defaults if env not set; Judge falls back to Runtime settings
+        values = {
+            "timestamp": datetime.now().isoformat(),
+            "RUNTIME_PROVIDER": runtime_provider,
+            "RUNTIME_MODEL": runtime_model,
+            "RUNTIME_API_KEY": runtime_api_key,
+            "RUNTIME_BASE_URL": runtime_base_url,
+            "RUNTIME_TIMEOUT": env.get("RUNTIME_TIMEOUT", "30"),
+            "RUNTIME_TEMPERATURE": env.get("RUNTIME_TEMPERATURE", "0.7"),
+            "EMBEDDING_PROVIDER": env.get("EMBEDDING_PROVIDER", "ollama"),
+            "EMBEDDING_MODEL_NAME": env.get(
+                "EMBEDDING_MODEL_NAME", env.get("EMBEDDING_MODEL", "nomic-embed-text")
+            ),
+            "EMBEDDING_BASE_URL": env.get("EMBEDDING_BASE_URL", "http://localhost:11434"),
+            "EMBEDDING_API_KEY": env.get("EMBEDDING_API_KEY", ""),
+            "JUDGE_PROVIDER": env.get("JUDGE_PROVIDER", runtime_provider),
+            "JUDGE_MODEL": env.get("JUDGE_MODEL", runtime_model),
+            "JUDGE_API_KEY": env.get("JUDGE_API_KEY", runtime_api_key),
+            "JUDGE_BASE_URL": env.get("JUDGE_BASE_URL", runtime_base_url),
+            "JUDGE_TIMEOUT": env.get("JUDGE_TIMEOUT", "60"),
+            "JUDGE_TEMPERATURE": env.get("JUDGE_TEMPERATURE", "0.0"),
+        }
+        return _ENV_FILE_TEMPLATE.format_map(values)
 
     def _generate_pip_config(self) -> str:
         """🆕 Phase 4: 生成 pip.conf (使用国内镜像源)
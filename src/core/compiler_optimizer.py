@@ -4,12 +4,30 @@ Phase 6 Task 6.5: Compiler Optimizer
 Optimizes compiler configuration (dependencies and environment).
 """
 
+import logging
 import re
-from typing import List, Optional
+from functools import lru_cache
+from typing import Dict, Optional, Set, Tuple
 from pathlib import Path
 from ..core.compiler import Compiler
 from ..schemas.analysis_result import AnalysisResult
 
+logger = logging.getLogger(__name__)
+
+# 匹配 "No module named 'xxx'"
+_NO_MODULE_PATTERN = re.compile(r"No module named ['\"]([^'\"]+)['\"]")
+# 匹配 "ImportError: cannot import name 'xxx' from 'yyy'"
+_CANNOT_IMPORT_PATTERN = re.compile(
+    r"cannot import name ['\"]([^'\"]+)['\"] from ['\"]([^'\"]+)['\"]"
+)
+# 从 requirements 行中切出包名 (去掉版本约束/环境标记/extras/注释)
+_REQUIREMENT_NAME_SPLIT = re.compile(r"[<>=!~;\[#\s]")
+
+
+def _normalize_name(name: str) -> str:
+    """统一包名大小写与分隔符 (langchain_openai == langchain-openai)"""
+    return name.lower().replace("_", "-")
+
 
 class CompilerOptimizer:
     """Compiler 配置优化器
@@ -26,6 +44,31 @@ class CompilerOptimizer:
             compiler: Compiler 实例
         """
         self.compiler = compiler
+        # requirements.txt 路径 -> (mtime_ns, 已声明的包名集合)
+        self._req_cache: Dict[Path, Tuple[int, Set[str]]] = {}
+
+    def _get_requirement_names(self, requirements_file: Path) -> Set[str]:
+        """读取 requirements.txt 中已声明的包名 (规范化后), 按 mtime 缓存
+
+        Args:
+            requirements_file: requirements.txt 路径
+
+        Returns:
+            包名集合
+        """
+        mtime_ns = requirements_file.stat().st_mtime_ns
+        cached = self._req_cache.get(requirements_file)
+        if cached and cached[0] == mtime_ns:
+            return cached[1]
+
+        names = set()
+        for line in requirements_file.read_text(encoding="utf-8").splitlines():
+            line = line.strip()
+            if line and not line.startswith("#"):
+                names.add(_normalize_name(_REQUIREMENT_NAME_SPLIT.split(line, 1)[0]))
+
+        self._req_cache[requirements_file] = (mtime_ns, names)
+        return names
 
     async def optimize_dependencies(
         self, agent_dir: Path, analysis: AnalysisResult, error_message: str
@@ -54,48 +97,43 @@ class CompilerOptimizer:
         # 2. 更新 requirements.txt
         requirements_file = agent_dir / "requirements.txt"
         if requirements_file.exists():
-            current_content = requirements_file.read_text(encoding="utf-8")
+            existing = self._get_requirement_names(requirements_file)
 
             # 添加缺失的包
-            new_lines = []
-            for pkg in missing_packages:
-                if pkg not in current_content:
-                    new_lines.append(f"{pkg}>=0.1.0  # Auto-added by optimizer")
-
-            if new_lines:
-                updated_content = (
-                    current_content + "\n\n# Auto-added dependencies\n" + "\n".join(new_lines)
+            new_packages = [pkg for pkg in missing_packages if _normalize_name(pkg) not in existing]
+
+            if new_packages:
+                new_lines = [f"{pkg}>=0.1.0  # Auto-added by optimizer" for pkg in new_packages]
+                with requirements_file.open("a", encoding="utf-8") as f:
+                    f.write("\n\n# Auto-added dependencies\n" + "\n".join(new_lines))
+                existing.update(_normalize_name(pkg) for pkg in new_packages)
+                self._req_cache[requirements_file] = (
+                    requirements_file.stat().st_mtime_ns,
+                    existing,
                 )
-                requirements_file.write_text(updated_content, encoding="utf-8")
-                print(f"📦 添加依赖: {', '.join(missing_packages)}")
+                logger.info("Added dependencies: %s", ", ".join(new_packages))
                 return True
 
         return False
 
-    def _extract_missing_packages(self, error_message: str) -> List[str]:
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _extract_missing_packages(error_message: str) -> Tuple[str, ...]:
         """从错误信息中提取缺失的包名
 
+        自愈循环重试时常遇到相同的错误信息, 因此按错误文本缓存解析结果.
+
         Args:
             error_message: 错误信息
 
         Returns:
-            缺失的包名列表
+            缺失的包名 (去重, 保持出现顺序)
         """
-        packages = []
-
-        # 匹配 "No module named 'xxx'"
-        pattern1 = r"No module named ['\"]([^'\"]+)['\"]"
-        matches1 = re.findall(pattern1, error_message)
-        packages.extend(matches1)
-
-        # 匹配 "ImportError: cannot import name 'xxx' from 'yyy'"
-        pattern2 = r"cannot import name ['\"]([^'\"]+)['\"] from ['\"]([^'\"]+)['\"]"
-        matches2 = re.findall(pattern2, error_message)
-        for _, module in matches2:
-            packages.append(module)
+        packages = _NO_MODULE_PATTERN.findall(error_message)
+        packages.extend(module for _, module in _CANNOT_IMPORT_PATTERN.findall(error_message))
 
         # 去重并清理
-        return list(set(pkg.split(".")[0] for pkg in packages))
+        return tuple(dict.fromkeys(pkg.split(".")[0] for pkg in packages))
 
     async def optimize_env_config(self, agent_dir: Path, analysis: AnalysisResult) -> bool:
         """优化环境配置 (.env)
@@ -118,7 +156,7 @@ class CompilerOptimizer:
             template = agent_dir / ".env.template"
             if template.exists():
                 env_file.write_text(template.read_text(encoding="utf-8"), encoding="utf-8")
-                print(f"📝 创建 .env 文件")
+                logger.info("Created %s from .env.template", env_file)
                 return True
 
         return False
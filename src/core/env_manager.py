@@ -1,26 +1,214 @@
 """Environment manager for creating and managing virtual environments."""
 
+import hashlib
 import os
+import select
+import shutil
 import sys
 import subprocess
+import threading
 import time
+import venv
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
-from pydantic import BaseModel, Field
+from types import MappingProxyType
+from typing import Mapping, NamedTuple, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
 
 from ..utils.uv_downloader import UVDownloader
 from ..utils.performance_metrics import PerformanceMetrics
 
+# pip package mirror (Tsinghua, for faster installation in China), applied through
+# the environment so nested pip invocations (e.g. sdist builds) inherit it too
+_PIP_INDEX_URL = "https://pypi.tuna.tsinghua.edu.cn/simple"
+_PIP_TRUSTED_HOST = "pypi.tuna.tsinghua.edu.cn"
+_PIP_CONFIG = MappingProxyType({"index_url": _PIP_INDEX_URL, "trusted_host": _PIP_TRUSTED_HOST})
+
+# Output kept per stream for error reporting; the rest of a long install log is dropped
+_OUTPUT_TAIL_BYTES = 64 * 1024
+
+# Platform-specific location of the interpreter inside a venv
+_VENV_PYTHON = Path("Scripts/python.exe") if sys.platform == "win32" else Path("bin/python")
+
+# Interval between liveness checks while a subprocess runs (seconds)
+_POLL_INTERVAL = 0.05
+
+# Template venvs kept in the project venv cache; least recently used ones are evicted
+_VENV_CACHE_MAX_TEMPLATES = 8
+
+# ioctl sharing a file's extents copy-on-write (Linux btrfs/XFS/bcachefs)
+_FICLONE = 0x40049409
+
+# Serializes uv resolution across managers set up from concurrent threads, so a
+# cold start downloads uv once instead of once per agent
+_UV_RESOLVE_LOCK = threading.Lock()
+
+
+def _decode(data: bytes) -> str:
+    """Decode subprocess output, tolerating invalid bytes."""
+    return data.decode("utf-8", errors="replace")
+
+
+def _append_tail(buffer: bytearray, chunk: bytes) -> None:
+    """Append output, keeping only the last _OUTPUT_TAIL_BYTES (amortized trim)."""
+    buffer += chunk
+    if len(buffer) > 2 * _OUTPUT_TAIL_BYTES:
+        del buffer[:-_OUTPUT_TAIL_BYTES]
 
-class EnvSetupResult(BaseModel):
-    """Result of environment setup."""
 
-    success: bool = Field(..., description="Whether setup succeeded")
-    venv_path: Path = Field(..., description="Path to virtual environment")
-    python_executable: Path = Field(..., description="Path to Python executable")
-    error_message: Optional[str] = Field(default=None, description="Error message if setup failed")
-    used_uv: bool = Field(default=False, description="Whether uv was used")
-    metrics: Optional[dict] = Field(default=None, description="Performance metrics")
+def _tail(buffer: bytearray) -> str:
+    """Decode the retained tail of a stream."""
+    return _decode(bytes(buffer[-_OUTPUT_TAIL_BYTES:]))
+
+
+def _drain_pipes(buffers: dict[int, bytearray], fds) -> list[int]:
+    """Read whatever is currently available from non-blocking pipe fds.
+
+    Returns:
+        The fds that reached EOF
+    """
+    closed = []
+    for fd in fds:
+        buffer = buffers[fd]
+        while True:
+            try:
+                chunk = os.read(fd, 65536)
+            except BlockingIOError:
+                break
+            if not chunk:
+                closed.append(fd)
+                break
+            _append_tail(buffer, chunk)
+    return closed
+
+
+def _open_pidfd(pid: int) -> Optional[int]:
+    """Open a pidfd for the process, or None where unsupported (non-Linux, old kernels)."""
+    pidfd_open = getattr(os, "pidfd_open", None)
+    if pidfd_open is None or not hasattr(select, "poll"):
+        return None
+    try:
+        return pidfd_open(pid)
+    except OSError:
+        return None
+
+
+def _clone_file(src: str, dst: str) -> str:
+    """Copy a file, sharing its data copy-on-write where the filesystem allows.
+
+    The copy is always a separate inode, so writes to it (e.g. ``pip install -U``
+    in an agent venv) never reach the file it was copied from. Falls back to a
+    regular copy when reflinks are unsupported.
+
+    Args:
+        src: Source file
+        dst: Destination file
+
+    Returns:
+        dst (the shutil.copytree copy_function contract)
+    """
+    if fcntl is not None and sys.platform.startswith("linux"):
+        try:
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+            shutil.copystat(src, dst)
+            return dst
+        except OSError:
+            pass  # Different filesystem or no reflink support
+    return shutil.copy2(src, dst)
+
+
+def _relocate_venv(venv_path: Path, old_path: Path, new_path: Optional[Path] = None) -> None:
+    """Point a copied venv at its new location.
+
+    Scripts in ``bin/`` and ``pyvenv.cfg`` embed the absolute venv path; it is
+    rewritten to the new location.
+
+    Args:
+        venv_path: Directory holding the copied venv
+        old_path: Location the venv was copied from
+        new_path: Final location of the venv (default: venv_path)
+    """
+    old, new = str(old_path).encode(), str(new_path or venv_path).encode()
+    targets = [venv_path / "pyvenv.cfg"]
+    bin_dir = venv_path / "bin"
+    if bin_dir.is_dir():
+        targets.extend(bin_dir.iterdir())
+
+    for path in targets:
+        if path.is_symlink() or not path.is_file():
+            continue
+        data = path.read_bytes()
+        if old not in data:
+            continue
+        mode = path.stat().st_mode
+        path.unlink()
+        path.write_bytes(data.replace(old, new))
+        os.chmod(path, mode)
+
+
+def _prune_venv_cache(cache_dir: Path, keep: int) -> None:
+    """Evict the least recently used template venvs beyond keep.
+
+    Templates are renamed aside before deletion, so a concurrent clone sees
+    either a complete template or none (and then builds a fresh venv).
+
+    Args:
+        cache_dir: Venv cache directory holding one directory per template
+        keep: Number of templates to keep
+    """
+    # Staging and trash directories carry a suffix; templates are bare hashes
+    templates = [path for path in cache_dir.iterdir() if "." not in path.name]
+    if len(templates) <= keep:
+        return
+
+    templates.sort(key=lambda path: path.stat().st_mtime, reverse=True)
+    for template in templates[keep:]:
+        trash = template.with_name(f"{template.name}.trash.{os.getpid()}")
+        try:
+            os.rename(template, trash)
+        except OSError:
+            continue  # Already evicted by another process
+        shutil.rmtree(trash, ignore_errors=True)
+
+
+def _remove_trash(directory: Path, pattern: str) -> None:
+    """Delete renamed-aside directories matching pattern (background cleanup)."""
+    for trash in directory.glob(pattern):
+        shutil.rmtree(trash, ignore_errors=True)
+
+
+class _AgentDirProbe(NamedTuple):
+    """Entries of the agent directory that environment setup branches on."""
+
+    has_venv: bool
+    has_requirements: bool
+
+
+@dataclass(slots=True, frozen=True)
+class EnvSetupResult:
+    """Result of environment setup.
+
+    Attributes:
+        success: Whether setup succeeded
+        venv_path: Path to virtual environment
+        python_executable: Path to Python executable
+        error_message: Error message if setup failed
+        used_uv: Whether uv was used
+        metrics: Performance metrics
+    """
+
+    success: bool
+    venv_path: Path
+    python_executable: Path
+    error_message: Optional[str] = None
+    used_uv: bool = False
+    metrics: Optional[dict] = None
 
 
 class EnvManager:
@@ -30,24 +218,36 @@ class EnvManager:
     without requiring Docker.
     """
 
-    def __init__(self, agent_dir: Path, use_uv: bool = True):
+    def __init__(self, agent_dir: Path, use_uv: bool = True, precompile: bool = False):
         """Initialize environment manager.
 
         Args:
             agent_dir: Path to agent project directory
             use_uv: Whether to use uv for faster installation (default: True)
+            precompile: Compile installed packages to .pyc during setup, trading
+                setup time for a faster first import (default: False)
         """
         self.agent_dir = Path(agent_dir).resolve()  # Convert to absolute path
         self.venv_path = self.agent_dir / ".venv"
         self._python_exe: Optional[Path] = None
         self.use_uv = use_uv
+        self.precompile = precompile
         self._uv_path: Optional[Path] = None
         self.metrics = PerformanceMetrics()
 
+        self.project_root = self.agent_dir.parent.parent  # Assume agents/xxx structure
+        # Template venvs shared across agents, keyed by requirements hash
+        self.venv_cache_dir = self.project_root / ".iteraagent" / "venv_cache"
+        # uv package cache and pinned lockfiles for offline reinstalls
+        self.uv_cache_dir = self.project_root / ".uv_cache"
+        # pip wheel/http cache shared by standard venv installs
+        self.pip_cache_dir = self.project_root / ".pip_cache"
+        self._pip_env_cache: Optional[dict] = None
+        self._uv_env_cache: Optional[dict] = None
+
         # Initialize UV downloader if enabled
         if self.use_uv:
-            project_root = self.agent_dir.parent.parent  # Assume agents/xxx structure
-            self.uv_downloader = UVDownloader(project_root)
+            self.uv_downloader = UVDownloader(self.project_root)
 
     def setup_environment(self) -> EnvSetupResult:
         """Create virtual environment and install dependencies.
@@ -58,16 +258,18 @@ class EnvManager:
         used_uv = False
 
         try:
+            probe = self._probe_agent_dir()
+
             # Try uv first if enabled
             if self.use_uv:
                 try:
-                    return self._setup_with_uv()
+                    return self._setup_with_uv(probe)
                 except Exception as e:
                     print(f"⚠️  uv setup failed: {e}")
                     print("   Falling back to venv...")
 
             # Fallback to standard venv
-            return self._setup_with_venv()
+            return self._setup_with_venv(probe)
 
         except Exception as e:
             return EnvSetupResult(
@@ -79,9 +281,83 @@ class EnvManager:
                 metrics=self.metrics.to_dict(),
             )
 
-    def _setup_with_uv(self) -> EnvSetupResult:
+    @classmethod
+    def setup_many(
+        cls, managers: list["EnvManager"], max_workers: Optional[int] = None
+    ) -> list[EnvSetupResult]:
+        """Set up environments for several agents, sharing work between identical ones.
+
+        Agents are grouped by requirements.txt content. One leader per group
+        resolves and installs (leaving a template venv and pinned lockfile
+        behind); the remaining agents of the group then reuse them. uv is
+        resolved once per project up front, then leaders run in parallel,
+        followed by all followers in parallel.
+
+        Args:
+            managers: EnvManager instances to set up
+            max_workers: Thread pool size (default: CPU count)
+
+        Returns:
+            EnvSetupResult per manager, in input order
+        """
+        groups: dict[bytes, list[int]] = {}
+        for index, manager in enumerate(managers):
+            requirements_file = manager.agent_dir / "requirements.txt"
+            try:
+                key = hashlib.blake2b(requirements_file.read_bytes(), digest_size=16).digest()
+            except FileNotFoundError:
+                key = b""
+            groups.setdefault(key, []).append(index)
+
+        # Fetch uv before the workers start, so a cold cache is downloaded once
+        uv_downloaders = {m.project_root: m.uv_downloader for m in managers if m.use_uv}
+        for uv_downloader in uv_downloaders.values():
+            try:
+                with _UV_RESOLVE_LOCK:
+                    uv_downloader.ensure_uv()
+            except Exception as e:
+                # Each manager retries and falls back to venv on its own
+                print(f"⚠️  uv unavailable for parallel setup: {e}")
+
+        leaders = [indices[0] for indices in groups.values()]
+        followers = [index for indices in groups.values() for index in indices[1:]]
+
+        results: list[Optional[EnvSetupResult]] = [None] * len(managers)
+
+        def run(index: int) -> None:
+            results[index] = managers[index].setup_environment()
+
+        with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+            list(executor.map(run, leaders))
+            list(executor.map(run, followers))
+
+        return results
+
+    def _probe_agent_dir(self) -> _AgentDirProbe:
+        """List the agent directory once instead of stat-ing each probed path.
+
+        Returns:
+            _AgentDirProbe (all False if the agent directory does not exist yet)
+        """
+        try:
+            with os.scandir(self.agent_dir) as it:
+                entries = {entry.name: entry for entry in it}
+        except FileNotFoundError:
+            return _AgentDirProbe(has_venv=False, has_requirements=False)
+
+        venv_entry = entries.get(self.venv_path.name)
+        requirements_entry = entries.get("requirements.txt")
+        return _AgentDirProbe(
+            has_venv=venv_entry is not None and venv_entry.is_dir(),
+            has_requirements=requirements_entry is not None and requirements_entry.is_file(),
+        )
+
+    def _setup_with_uv(self, probe: _AgentDirProbe) -> EnvSetupResult:
         """Setup environment using uv.
 
+        Args:
+            probe: Agent directory listing taken at the start of setup
+
         Returns:
             EnvSetupResult
         """
@@ -89,22 +365,28 @@ class EnvManager:
 
         # Ensure uv is available
         self.metrics.start_timer("download")
-        self._uv_path = self.uv_downloader.ensure_uv()
+        with _UV_RESOLVE_LOCK:
+            self._uv_path = self.uv_downloader.ensure_uv()
         self.metrics.stop_timer("download")
 
-        # Create venv if it doesn't exist
-        if not self.venv_path.exists():
-            print(f"⚡ Creating virtual environment with uv...")
+        requirements_file = self.agent_dir / "requirements.txt"
+        venv_exists = probe.has_venv
+
+        # Create venv if it doesn't exist (cloned from a cached template when possible)
+        cloned = False
+        if not venv_exists:
             self.metrics.start_timer("venv_create")
-            self._create_venv_with_uv()
+            cloned = self._clone_template_venv(requirements_file, used_uv=True)
+            if not cloned:
+                print("⚡ Creating virtual environment...")
+                self._create_bare_venv()
             self.metrics.stop_timer("venv_create")
 
         # Get Python executable
         python_exe = self.get_python_executable()
 
         # Install requirements
-        requirements_file = self.agent_dir / "requirements.txt"
-        if requirements_file.exists():
+        if probe.has_requirements and not cloned:
             print("⚡ Installing dependencies with uv...")
             self.metrics.start_timer("install")
             install_success = self._install_with_uv(requirements_file)
@@ -113,6 +395,12 @@ class EnvManager:
             if not install_success:
                 raise RuntimeError("uv pip install failed")
 
+            if self.precompile:
+                self._precompile_bytecode()
+
+            if not venv_exists:
+                self._store_template_venv(requirements_file, used_uv=True)
+
         # Report performance
         self.metrics.report()
 
@@ -124,27 +412,35 @@ class EnvManager:
             metrics=self.metrics.to_dict(),
         )
 
-    def _setup_with_venv(self) -> EnvSetupResult:
+    def _setup_with_venv(self, probe: _AgentDirProbe) -> EnvSetupResult:
         """Setup environment using standard venv.
 
+        Args:
+            probe: Agent directory listing taken at the start of setup
+
         Returns:
             EnvSetupResult
         """
         print("Using standard venv...")
 
-        # Create venv if it doesn't exist
-        if not self.venv_path.exists():
-            print(f"Creating virtual environment at {self.venv_path}...")
+        requirements_file = self.agent_dir / "requirements.txt"
+
+        # Create venv if it doesn't exist (cloned from a cached template when possible)
+        venv_exists = probe.has_venv
+        cloned = False
+        if not venv_exists:
             self.metrics.start_timer("venv_create")
-            self._create_venv()
+            cloned = self._clone_template_venv(requirements_file, used_uv=False)
+            if not cloned:
+                print(f"Creating virtual environment at {self.venv_path}...")
+                self._create_venv()
             self.metrics.stop_timer("venv_create")
 
         # Get Python executable
         python_exe = self.get_python_executable()
 
         # Install requirements
-        requirements_file = self.agent_dir / "requirements.txt"
-        if requirements_file.exists():
+        if probe.has_requirements and not cloned:
             print("Installing dependencies...")
             self.metrics.start_timer("install")
             install_success = self.install_requirements()
@@ -160,6 +456,12 @@ class EnvManager:
                     metrics=self.metrics.to_dict(),
                 )
 
+            if self.precompile:
+                self._precompile_bytecode()
+
+            if not venv_exists:
+                self._store_template_venv(requirements_file, used_uv=False)
+
         # Report performance
         self.metrics.report()
 
@@ -171,22 +473,184 @@ class EnvManager:
             metrics=self.metrics.to_dict(),
         )
 
-    def _create_venv(self) -> None:
-        """Create virtual environment using venv module."""
-        process = self._run_command(
-            [sys.executable, "-m", "venv", str(self.venv_path)], cwd=self.agent_dir
-        )
+    def _template_venv_for(self, requirements_file: Path, used_uv: bool) -> Optional[Path]:
+        """Locate the template venv for a requirements file.
 
-        if process.returncode != 0:
-            raise RuntimeError(f"Failed to create venv: {process.stderr}")
+        Templates are keyed by the requirements content, the base interpreter
+        and the tool that built them.
+
+        Args:
+            requirements_file: Path to requirements.txt
+            used_uv: Whether the venv is built with uv
+
+        Returns:
+            Template venv path, or None if there is no requirements.txt
+        """
+        try:
+            requirements = requirements_file.read_bytes()
+        except FileNotFoundError:
+            return None
+
+        hasher = hashlib.blake2b(requirements, digest_size=16)
+        hasher.update(sys.executable.encode("utf-8"))
+        hasher.update(b"uv" if used_uv else b"venv")
+        return self.venv_cache_dir / hasher.hexdigest() / ".venv"
+
+    def _clone_template_venv(self, requirements_file: Path, used_uv: bool) -> bool:
+        """Create the agent venv by copying a cached template venv.
+
+        Files are reflinked (copy-on-write) where the filesystem supports it
+        and copied otherwise, so the agent venv never shares an inode with the
+        template. ``bin/`` and ``pyvenv.cfg`` then have the template path
+        rewritten (shebangs, activate scripts).
+
+        Args:
+            requirements_file: Path to requirements.txt
+            used_uv: Whether the venv is built with uv
+
+        Returns:
+            True if the venv was cloned from a template
+        """
+        if os.name != "posix":
+            return False  # Windows launchers embed paths in binaries
 
-    def _create_venv_with_uv(self) -> None:
-        """Create virtual environment using uv."""
-        cmd = [str(self._uv_path), "venv", str(self.venv_path)]
-        process = self._run_command(cmd, cwd=self.agent_dir, timeout=10)
+        template = self._template_venv_for(requirements_file, used_uv)
+        if template is None or not template.is_dir():
+            return False
+
+        try:
+            shutil.copytree(template, self.venv_path, symlinks=True, copy_function=_clone_file)
+            _relocate_venv(self.venv_path, template)
+            os.utime(template.parent)  # Mark as recently used for eviction
+        except OSError as e:
+            print(f"⚠️  Template venv clone failed, creating a fresh one: {e}")
+            shutil.rmtree(self.venv_path, ignore_errors=True)
+            return False
+
+        print(f"⚡ Reused cached virtual environment ({template.parent.name})")
+        return True
+
+    def _store_template_venv(self, requirements_file: Path, used_uv: bool) -> None:
+        """Save the freshly installed agent venv as a template for other agents.
+
+        The cache keeps at most _VENV_CACHE_MAX_TEMPLATES templates, evicting
+        the least recently used; :meth:`clear_venv_cache` empties it.
+
+        Args:
+            requirements_file: Path to requirements.txt
+            used_uv: Whether the venv was built with uv
+        """
+        if os.name != "posix":
+            return
+
+        template = self._template_venv_for(requirements_file, used_uv)
+        if template is None or template.exists():
+            return
+
+        # Build under a private name, then rename into place so readers never see a partial copy
+        staging = template.parent.with_name(f"{template.parent.name}.tmp{os.getpid()}")
+        try:
+            shutil.copytree(
+                self.venv_path, staging / ".venv", symlinks=True, copy_function=_clone_file
+            )
+            _relocate_venv(staging / ".venv", self.venv_path, template)
+            os.rename(staging, template.parent)
+            _prune_venv_cache(self.venv_cache_dir, _VENV_CACHE_MAX_TEMPLATES)
+        except OSError:
+            pass  # Cache is best-effort (disk full, concurrent writer, ...)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def clear_venv_cache(self) -> None:
+        """Remove all cached template venvs of the project."""
+        if self.venv_cache_dir.exists():
+            _prune_venv_cache(self.venv_cache_dir, keep=0)
+
+    def _precompile_bytecode(self) -> None:
+        """Compile the installed packages to .pyc across all cores.
+
+        Runs before the venv is stored as a template, so clones inherit the
+        bytecode. Failures are reported but not fatal: a missing .pyc is
+        simply compiled on import.
+        """
+        cmd = [
+            str(self.get_python_executable()),
+            "-m",
+            "compileall",
+            "-q",
+            "-j",
+            "0",  # one worker per CPU
+            str(self.venv_path),
+        ]
+        try:
+            process = self._run_command(cmd, cwd=self.agent_dir, timeout=300)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            print(f"⚠️  Bytecode precompilation failed: {e}")
+            return
 
         if process.returncode != 0:
-            raise RuntimeError(f"uv venv failed: {process.stderr}")
+            # Typically a few unparsable files shipped in packages (tests, templates)
+            print(f"⚠️  Bytecode precompilation incomplete: {process.stderr or process.stdout}")
+
+    def _create_venv(self) -> None:
+        """Create virtual environment using venv module.
+
+        The venv is built in-process (no extra interpreter start-up). Wheels
+        pip builds from sdists land in the shared pip cache via PEP 517
+        builds, so ``wheel`` need not be installed into the venv.
+        """
+        try:
+            venv.EnvBuilder(with_pip=True, symlinks=(sys.platform != "win32")).create(
+                self.venv_path
+            )
+        except (OSError, subprocess.CalledProcessError) as e:
+            raise RuntimeError(f"Failed to create venv: {e}") from e
+
+    def _pip_env(self) -> dict:
+        """Environment for pip runs: project mirror plus one wheel/http cache shared by agents.
+
+        An index or cache directory already configured in the caller's environment
+        takes precedence.
+        """
+        if self._pip_env_cache is None:
+            env = {
+                "PIP_INDEX_URL": _PIP_INDEX_URL,
+                "PIP_TRUSTED_HOST": _PIP_TRUSTED_HOST,
+                "PIP_CACHE_DIR": str(self.pip_cache_dir),
+            }
+            if "PIP_INDEX_URL" in os.environ:
+                del env["PIP_TRUSTED_HOST"]
+            env.update(os.environ)
+            self._pip_env_cache = env
+        return self._pip_env_cache
+
+    def _uv_env(self) -> dict:
+        """Environment for uv runs: the project uv cache, unless UV_CACHE_DIR is exported.
+
+        uv keeps its own index configuration (PyPI, uv.toml, pyproject) unless
+        the caller exported ``PIP_INDEX_URL``, which is forwarded as ``UV_INDEX_URL``.
+        """
+        if self._uv_env_cache is None:
+            env = {"UV_CACHE_DIR": str(self.uv_cache_dir)}
+            if "PIP_INDEX_URL" in os.environ:
+                env["UV_INDEX_URL"] = os.environ["PIP_INDEX_URL"]
+            env.update(os.environ)
+            self._uv_env_cache = env
+        return self._uv_env_cache
+
+    def _create_bare_venv(self) -> None:
+        """Create a bare virtual environment for uv to install into.
+
+        uv only needs the interpreter layout (no pip, it installs packages
+        itself), so the venv is built in-process from the current interpreter
+        rather than through a separate ``uv venv`` launch.
+        """
+        try:
+            venv.EnvBuilder(with_pip=False, symlinks=(sys.platform != "win32")).create(
+                self.venv_path
+            )
+        except OSError as e:
+            raise RuntimeError(f"venv creation failed: {e}") from e
 
     def get_python_executable(self) -> Path:
         """Get path to Python executable in virtual environment.
@@ -194,15 +658,11 @@ class EnvManager:
         Returns:
             Path to Python executable
         """
+        # Stat once per venv; the path is cached until cleanup() removes the venv
         if self._python_exe is not None:
             return self._python_exe
 
-        # Determine platform-specific path
-        if sys.platform == "win32":
-            python_exe = self.venv_path / "Scripts" / "python.exe"
-        else:
-            python_exe = self.venv_path / "bin" / "python"
-
+        python_exe = self.venv_path / _VENV_PYTHON
         if not python_exe.exists():
             raise FileNotFoundError(f"Python executable not found at {python_exe}")
 
@@ -215,17 +675,28 @@ class EnvManager:
         Returns:
             True if installation succeeded, False otherwise
         """
+        cmd = self._build_pip_install_command()
+        if cmd is None:
+            print("No requirements.txt found, skipping installation")
+            return True
+
+        print(f"Running: {' '.join(cmd)}")
+        process = self._run_command(cmd, cwd=self.agent_dir, timeout=300, env=self._pip_env())
+        return self._report_pip_install(process)
+
+    def _build_pip_install_command(self) -> Optional[list[str]]:
+        """Build the pip install command for requirements.txt.
+
+        Returns:
+            Command list, or None if there is no requirements.txt
+        """
         python_exe = self.get_python_executable()
         requirements_file = self.agent_dir / "requirements.txt"
 
         if not requirements_file.exists():
-            print("No requirements.txt found, skipping installation")
-            return True
-
-        # Configure pip to use mirror (for faster installation in China)
-        pip_config = self._get_pip_config()
+            return None
 
-        # Install dependencies
+        # Install dependencies (mirror comes from PIP_INDEX_URL, see _pip_env)
         cmd = [
             str(python_exe),
             "-m",
@@ -235,13 +706,17 @@ class EnvManager:
             str(requirements_file),
         ]
 
-        # Add mirror configuration
-        if pip_config:
-            cmd.extend(["-i", pip_config["index_url"]])
+        return cmd
 
-        print(f"Running: {' '.join(cmd)}")
-        process = self._run_command(cmd, cwd=self.agent_dir, timeout=300)
+    def _report_pip_install(self, process: subprocess.CompletedProcess) -> bool:
+        """Report the outcome of a pip install run.
+
+        Args:
+            process: Completed pip process
 
+        Returns:
+            True if installation succeeded
+        """
         if process.returncode != 0:
             print(f"Installation failed: {process.stderr}")
             return False
@@ -252,6 +727,11 @@ class EnvManager:
     def _install_with_uv(self, requirements_file: Path) -> bool:
         """Install dependencies using uv.
 
+        Once a requirements set has been installed, its resolution is pinned to
+        a lockfile; later installs of the same set replay the lock with
+        ``--offline`` against the project uv cache, skipping the resolver and
+        the package index entirely.
+
         Args:
             requirements_file: Path to requirements.txt
 
@@ -259,6 +739,26 @@ class EnvManager:
             True if installation succeeded
         """
         python_exe = self.get_python_executable()
+        uv_env = self._uv_env()
+        lock_file = self._uv_lock_file(requirements_file, python_exe)
+
+        if lock_file.exists():
+            cmd = [
+                str(self._uv_path),
+                "pip",
+                "install",
+                "-q",
+                "--offline",
+                "-r",
+                str(lock_file),
+                "--python",
+                str(python_exe),
+            ]
+            process = self._run_command(cmd, cwd=self.agent_dir, timeout=300, env=uv_env)
+            if process.returncode == 0:
+                return True
+            # Cache miss (e.g. cache pruned): fall back to an online install
+
         cmd = [
             str(self._uv_path),
             "pip",
@@ -273,56 +773,167 @@ class EnvManager:
         # print(f"Running: {' '.join(cmd)}") # 🤫 Suppress command printing
 
         # 🆕 Suppress stdout/stderr unless error
-        process = self._run_command(cmd, cwd=self.agent_dir, timeout=300)
+        process = self._run_command(cmd, cwd=self.agent_dir, timeout=300, env=uv_env)
 
         if process.returncode != 0:
             print(f"uv pip install failed: {process.stderr}")
             return False
 
+        # Pin the resolution for the offline fast path (best-effort)
+        lock_file.parent.mkdir(parents=True, exist_ok=True)
+        cmd = [
+            str(self._uv_path),
+            "pip",
+            "compile",
+            "-q",
+            str(requirements_file),
+            "-o",
+            str(lock_file),
+            "--python",
+            str(python_exe),
+        ]
+        try:
+            process = self._run_command(cmd, cwd=self.agent_dir, timeout=120, env=uv_env)
+        except subprocess.TimeoutExpired:
+            process = None
+        if process is None or process.returncode != 0:
+            lock_file.unlink(missing_ok=True)
+
         # print("Dependencies installed successfully with uv") # 🤫 Suppress success message
         return True
 
-    def _get_pip_config(self) -> Optional[dict]:
+    def _uv_lock_file(self, requirements_file: Path, python_exe: Path) -> Path:
+        """Get the lockfile path for a requirements set.
+
+        Args:
+            requirements_file: Path to requirements.txt
+            python_exe: Venv Python executable (resolved to its base interpreter)
+
+        Returns:
+            Lockfile path under the project uv cache
+        """
+        hasher = hashlib.blake2b(requirements_file.read_bytes(), digest_size=16)
+        hasher.update(os.path.realpath(python_exe).encode("utf-8"))
+        return self.uv_cache_dir / "locks" / f"{hasher.hexdigest()}.lock"
+
+    def _get_pip_config(self) -> Mapping[str, str]:
         """Get pip mirror configuration.
 
         Returns:
-            Dictionary with pip configuration or None
+            Read-only mapping with pip configuration
         """
-        # Use Tsinghua mirror for faster installation
-        return {
-            "index_url": "https://pypi.tuna.tsinghua.edu.cn/simple",
-            "trusted_host": "pypi.tuna.tsinghua.edu.cn",
-        }
+        return _PIP_CONFIG
 
     def _run_command(
         self,
         cmd: list[str],
         cwd: Path,
         timeout: int = 60,
+        env: Optional[dict] = None,
     ) -> subprocess.CompletedProcess:
         """Run command in subprocess.
 
+        The calling thread blocks in poll() on a pidfd plus the output pipes
+        (Linux), waking as soon as output arrives or the child exits; elsewhere
+        it sleeps between short polls. Pipes are drained with non-blocking
+        reads, so other Python threads keep running during long installs, and
+        only the last _OUTPUT_TAIL_BYTES of each stream are retained.
+
         Args:
             cmd: Command and arguments
             cwd: Working directory
             timeout: Timeout in seconds
+            env: Environment for the child (default: inherit)
 
         Returns:
             CompletedProcess result
+
+        Raises:
+            subprocess.TimeoutExpired: If the command exceeds the timeout
         """
-        process = subprocess.run(
+        process = subprocess.Popen(
             cmd,
             cwd=cwd,
-            capture_output=True,
-            text=True,
-            timeout=timeout,
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
         )
-        return process
+
+        if os.name != "posix":
+            # Non-blocking pipe reads are POSIX-only; communicate() drains via threads
+            try:
+                stdout, stderr = process.communicate(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.communicate()
+                raise
+            return subprocess.CompletedProcess(
+                cmd, process.returncode, _decode(stdout), _decode(stderr)
+            )
+
+        buffers = {process.stdout.fileno(): bytearray(), process.stderr.fileno(): bytearray()}
+        for fd in buffers:
+            os.set_blocking(fd, False)
+
+        deadline = time.monotonic() + timeout
+        open_fds = list(buffers)
+        pidfd = _open_pidfd(process.pid)
+        try:
+            if pidfd is not None:
+                # Kernel-notified exit: the pidfd becomes readable the moment the child exits
+                poller = select.poll()
+                for fd in (pidfd, *open_fds):
+                    poller.register(fd, select.POLLIN)
+                while process.poll() is None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        process.kill()
+                        process.wait()
+                        raise subprocess.TimeoutExpired(cmd, timeout)
+                    poller.poll(remaining * 1000)
+                    for fd in _drain_pipes(buffers, open_fds):
+                        open_fds.remove(fd)
+                        poller.unregister(fd)
+            else:
+                while process.poll() is None:
+                    for fd in _drain_pipes(buffers, open_fds):
+                        open_fds.remove(fd)
+                    if time.monotonic() > deadline:
+                        process.kill()
+                        process.wait()
+                        raise subprocess.TimeoutExpired(cmd, timeout)
+                    time.sleep(_POLL_INTERVAL)
+            _drain_pipes(buffers, open_fds)
+        finally:
+            if pidfd is not None:
+                os.close(pidfd)
+            process.stdout.close()
+            process.stderr.close()
+
+        stdout, stderr = buffers.values()
+        return subprocess.CompletedProcess(cmd, process.returncode, _tail(stdout), _tail(stderr))
 
     def cleanup(self) -> None:
-        """Remove virtual environment."""
-        if self.venv_path.exists():
-            import shutil
+        """Remove virtual environment.
 
-            shutil.rmtree(self.venv_path)
+        The venv is renamed aside (O(1)) and deleted on a background thread,
+        so teardown returns immediately. Leftover trash from earlier runs is
+        swept by the same thread.
+        """
+        if self.venv_path.exists():
+            trash = self.venv_path.with_name(
+                f"{self.venv_path.name}.trash.{os.getpid()}.{time.time_ns()}"
+            )
+            try:
+                os.rename(self.venv_path, trash)
+            except OSError:
+                # e.g. files locked on Windows: delete in place
+                shutil.rmtree(self.venv_path)
+            else:
+                threading.Thread(
+                    target=_remove_trash,
+                    args=(self.agent_dir, f"{self.venv_path.name}.trash.*"),
+                    daemon=True,
+                ).start()
+            self._python_exe = None
             print(f"Removed virtual environment at {self.venv_path}")
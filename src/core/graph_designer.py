@@ -6,8 +6,12 @@ This module generates LangGraph structures using a three-step approach:
 3. Nodes & Edges - Design nodes and connections
 """
 
+import logging
+import re
+import threading
 import yaml
-from typing import Optional, List, Dict, Any
+from dataclasses import dataclass, field
+from typing import Callable, ClassVar, Optional, List, Dict, Any, Tuple
 from pathlib import Path
 
 from ..schemas import (
@@ -26,7 +30,286 @@ from ..schemas import (
     SimulationResult,
     SimulationIssue,
 )
-from ..llm import BuilderClient
+from ..llm import BuilderClient, LLMCache
+from ..tools import get_global_registry
+from .interface_guard import InterfaceGuard
+
+logger = logging.getLogger(__name__)
+
+# Optional faster JSON codec for graph save/load (output is byte-identical)
+try:
+    import orjson
+
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# libyaml-backed loader when PyYAML was built with it, pure-Python otherwise
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Keywords that signal an iterate/refine task (-> Reflection pattern)
+_ITER_KEYWORDS = (
+    "迭代",
+    "改进",
+    "优化",
+    "审核",
+    "修改",
+    "iterate",
+    "improve",
+    "refine",
+    "review",
+    "revise",
+)
+# All keywords in one case-insensitive alternation: a single pass, no lowered copy
+_ITER_KEYWORDS_PATTERN = re.compile("|".join(map(re.escape, _ITER_KEYWORDS)), re.IGNORECASE)
+
+
+# State field templates built once at import; each schema gets its own copies
+# (see _copy_fields), so mutable defaults like {} / [] are never shared
+_BASE_STATE_FIELDS = (
+    StateField(
+        name="messages",
+        type=StateFieldType.LIST_MESSAGE,
+        description="对话历史",
+        reducer="add_messages",
+    ),
+    StateField(
+        name="is_finished",
+        type=StateFieldType.BOOL,
+        description="是否完成任务",
+        default=False,
+    ),
+)
+
+_PATTERN_STATE_FIELDS: Dict[PatternType, Tuple[StateField, ...]] = {
+    PatternType.REFLECTION: (
+        StateField(name="draft", type=StateFieldType.STRING, default=""),
+        StateField(name="feedback", type=StateFieldType.STRING, default=""),
+        StateField(name="iteration_count", type=StateFieldType.INT, default=0),
+    ),
+    PatternType.SUPERVISOR: (
+        StateField(name="next_action", type=StateFieldType.STRING, default=""),
+        StateField(name="tool_results", type=StateFieldType.DICT, default={}),
+    ),
+    PatternType.PLAN_EXECUTE: (
+        StateField(name="plan", type=StateFieldType.LIST_STR, default=[]),
+        StateField(name="current_step", type=StateFieldType.INT, default=0),
+        StateField(name="execution_results", type=StateFieldType.LIST_STR, default=[]),
+        StateField(name="need_replan", type=StateFieldType.BOOL, default=False),
+    ),
+}
+
+# Reflection's iteration cap; the default is filled in from PatternConfig.max_iterations
+_MAX_ITERATIONS_FIELD = StateField(name="max_iterations", type=StateFieldType.INT, default=3)
+
+# Nodes / conditional edges used when a pattern template is missing or empty,
+# with the pattern label used in log output
+_FALLBACK_NODES: Dict[PatternType, Tuple[str, List[Dict[str, Any]]]] = {
+    PatternType.SEQUENTIAL: (
+        "Sequential",
+        [{"id": "agent", "type": "llm", "role_description": "Primary Agent", "config": {}}],
+    ),
+    PatternType.PLAN_EXECUTE: (
+        "Plan-Execute",
+        [
+            {"id": "planner", "type": "llm", "role_description": "Planner"},
+            {"id": "executor", "type": "llm", "role_description": "Executor"},
+            {"id": "replanner", "type": "llm", "role_description": "Replanner"},
+        ],
+    ),
+}
+
+_FALLBACK_CONDITIONAL_EDGES: Dict[PatternType, Tuple[str, List[Dict[str, Any]]]] = {
+    PatternType.SEQUENTIAL: (
+        "Sequential",
+        [
+            {
+                "source": "agent",
+                "condition": "should_continue",
+                # ✅ Fixed: Correct logic to check tool_calls and return tool name
+                "condition_logic": """
+last_msg = state.get("messages", [])[-1] if state.get("messages") else None
+if last_msg and hasattr(last_msg, "tool_calls") and last_msg.tool_calls:
+    return last_msg.tool_calls[0]["name"]
+return "end"
+""",
+                "branches": {
+                    "continue": "tools",  # Placeholder, replaced by _resolve_tools_placeholder
+                    "end": "END",
+                },
+            }
+        ],
+    ),
+    PatternType.PLAN_EXECUTE: (
+        "Plan-Execute",
+        [
+            {
+                "source": "replanner",
+                "condition": "should_end_or_replan",
+                "condition_logic": "return 'end' if state.get('is_finished') else 'continue'",
+                "branches": {"end": "END", "continue": "executor"},
+            }
+        ],
+    ),
+}
+
+# Where a tool node returns to, per pattern (None: no return edge).
+# Supervisor tool output is handled by graph state / worker logic instead.
+_TOOL_RETURN_TARGETS: Dict[PatternType, Callable[["_NodeIndex"], Optional[str]]] = {
+    # Sequential: Tool -> first LLM agent
+    PatternType.SEQUENTIAL: lambda index: index.primary_llm_id,
+    # Plan-Execute: tool results go back to the executor
+    PatternType.PLAN_EXECUTE: lambda index: "executor",
+}
+
+# Spellings of the end node that LLM output is normalized from (-> 'END')
+_END_VARIANTS = frozenset({"__end__", "end", "__END__", "_end_", "End", "__end", "end__"})
+
+# Invariant instructions appended to every fix_logic prompt
+_FIX_LOGIC_RULES = """## Requirement
+Please fix the graph structure based on the issues above.
+Focus on:
+1. Breaking infinite loops (e.g., adding iteration limits)
+2. Connecting unreachable nodes
+3. Fixing logic errors in conditional edges
+
+## CRITICAL CONSTRAINTS
+
+### 1. Node Targets - Use 'END' for termination
+All edge targets MUST be either:
+- Actual node IDs from the nodes list above
+- The special node "END" (all caps) to terminate the workflow
+
+DO NOT use variants like '__end__', 'end', '__start__', or 'START'.
+If you need to end the workflow, use "END" (all caps).
+
+### 2. State Field Types - MUST use exact enum values
+type MUST be one of: "str", "int", "bool", "float", "List[BaseMessage]", "List[str]", "Dict[str, Any]", "Optional[str]", "Optional[int]", "Any"
+FORBIDDEN: "Optional[List[str]]", "List[Dict]", or custom strings
+
+### 3. Condition Logic - Define all variables first
+All variables in condition_logic MUST be defined in state_schema.fields.
+Use: state['variable_name'] syntax.
+
+### 4. Prevent Infinite Loops
+Add iteration counters with max limits for any loops.
+
+Return the full updated GraphStructure JSON.
+"""
+
+# 🆕 v7.2: LLM intent router prompt and routing logic (RAG integration)
+_ROUTER_ROLE_DESC = """你是一个路由助手。分析用户输入,判断是否需要查询知识库。
+
+规则:
+- 如果用户在询问事实性问题、请求文档信息、或需要查找资料,输出 'SEARCH'
+- 如果用户只是打招呼、闲聊、或进行简单对话,输出 'CHAT'
+- 只输出 'SEARCH' 或 'CHAT',不要输出其他内容
+
+示例:
+- "IteraAgent 的核心特性是什么?" -> SEARCH
+- "具体步骤?" -> SEARCH  
+- "你好" -> CHAT
+- "谢谢" -> CHAT"""
+
+_ROUTER_CONDITION_LOGIC = """# LLM 语义路由 (v7.2)
+# 检查 Router 节点的输出决策
+messages = state.get("messages", [])
+
+if not messages:
+    return "chat"
+
+# 获取 Router 的输出 (最后一条 AI 消息)
+last_message = messages[-1]
+decision = ""
+
+if hasattr(last_message, 'content'):
+    decision = last_message.content.strip().upper()
+elif isinstance(last_message, dict):
+    decision = last_message.get("content", "").strip().upper()
+
+# 根据 Router 的决策路由
+if "SEARCH" in decision:
+    return "search"
+else:
+    return "chat"
+"""
+
+# Routing logic for edges that dispatch to the tool named by the last tool call
+_TOOL_ROUTING_LOGIC = """
+# Tool Routing Logic
+# Returns the name of the tool to call
+
+last_msg = state["messages"][-1]
+if hasattr(last_msg, "tool_calls") and last_msg.tool_calls:
+    return last_msg.tool_calls[0]["name"]
+return "end"
+"""
+
+_EXECUTOR_ROUTING_LOGIC = """
+# Executor Routing
+last_msg = state["messages"][-1]
+if hasattr(last_msg, "tool_calls") and last_msg.tool_calls:
+    return last_msg.tool_calls[0]["name"]
+return "evaluator"
+"""
+
+# Sample value per JSON schema type, used to exercise tool parameter validation
+_JSON_TYPE_SAMPLES: Dict[str, Callable[[str], Any]] = {
+    "string": lambda name: f"sample_{name}",
+    "integer": lambda name: 1,
+    "number": lambda name: 1.0,
+    "boolean": lambda name: True,
+    "array": lambda name: [],
+    "object": lambda name: {},
+}
+
+_RAG_STATE_FIELDS = (
+    StateField(
+        name="retrieved_docs",
+        type=StateFieldType.LIST_STR,
+        description="检索到的文档",
+        default=[],
+    ),
+    StateField(name="context", type=StateFieldType.STRING, description="RAG上下文", default=""),
+    # 🆕 v7.2: LLM 语义路由字段
+    StateField(
+        name="router_decision",
+        type=StateFieldType.OPTIONAL_STR,
+        description="路由决策结果: 'SEARCH' 或 'CHAT'",
+        default=None,
+    ),
+)
+
+
+def _copy_fields(fields: Tuple[StateField, ...]) -> List[StateField]:
+    """Fresh copies of template state fields, so no two schemas share a default value."""
+    return [state_field.model_copy(deep=True) for state_field in fields]
+
+
+@dataclass(slots=True)
+class _NodeIndex:
+    """Lookup structures over the nodes of a graph under construction."""
+
+    by_id: Dict[str, NodeDef] = field(default_factory=dict)
+    llm_nodes: List[NodeDef] = field(default_factory=list)
+
+    @classmethod
+    def build(cls, nodes: List[NodeDef]) -> "_NodeIndex":
+        index = cls()
+        index.add(nodes)
+        return index
+
+    def add(self, nodes: List[NodeDef]) -> None:
+        """Index nodes appended to the graph (order of llm_nodes follows the graph)."""
+        for node in nodes:
+            self.by_id[node.id] = node
+            if node.type == "llm":
+                self.llm_nodes.append(node)
+
+    @property
+    def primary_llm_id(self) -> Optional[str]:
+        """ID of the main agent node (first LLM node), if any."""
+        return self.llm_nodes[0].id if self.llm_nodes else None
 
 
 class GraphDesigner:
@@ -38,6 +321,21 @@ class GraphDesigner:
     3. Design Graph - Generate nodes and edges
     """
 
+    # Pattern templates parsed once per process and shared by all designers
+    _TEMPLATE_CACHE: ClassVar[Optional[Dict[PatternType, Dict[str, Any]]]] = None
+    _TEMPLATE_LOCK: ClassVar[threading.Lock] = threading.Lock()
+
+    # Method that wires tool nodes into each pattern's conditional edges
+    _TOOL_ROUTERS: ClassVar[Dict[PatternType, str]] = {
+        PatternType.SUPERVISOR: "_update_supervisor_edges",
+        # 🔗 Fix Sequential Pattern Routing
+        PatternType.SEQUENTIAL: "_resolve_tools_placeholder",
+        # 🔗 Fix Plan-Execute Pattern Routing (Executor -> Tools)
+        # Plan-Execute template usually doesn't have default cond edge for tools,
+        # so it is injected dynamically.
+        PatternType.PLAN_EXECUTE: "_inject_executor_tool_routing",
+    }
+
     def __init__(self, builder_client: BuilderClient):
         """Initialize Graph Designer with a builder client.
 
@@ -45,11 +343,33 @@ class GraphDesigner:
             builder_client: LLM client for graph design
         """
         self.builder = builder_client
-        self.pattern_templates = self._load_pattern_templates()
+        # Shallow copy: callers may swap entries without touching the shared cache
+        self.pattern_templates = dict(self._load_pattern_templates())
+        # fix_logic results keyed by (graph, issues); identical repair requests skip the LLM
+        self.fix_cache = LLMCache(maxsize=64)
 
-    def _load_pattern_templates(self) -> Dict[PatternType, Dict[str, Any]]:
+    @classmethod
+    def _load_pattern_templates(cls) -> Dict[PatternType, Dict[str, Any]]:
         """Load pattern templates from YAML files.
 
+        The files are read on first use only; later calls return the cached
+        result.
+
+        Returns:
+            Dict mapping PatternType to template configuration
+        """
+        if cls._TEMPLATE_CACHE is not None:
+            return cls._TEMPLATE_CACHE
+
+        with cls._TEMPLATE_LOCK:
+            if cls._TEMPLATE_CACHE is None:
+                cls._TEMPLATE_CACHE = cls._read_pattern_templates()
+            return cls._TEMPLATE_CACHE
+
+    @staticmethod
+    def _read_pattern_templates() -> Dict[PatternType, Dict[str, Any]]:
+        """Read and parse the pattern template YAML files.
+
         Returns:
             Dict mapping PatternType to template configuration
         """
@@ -57,7 +377,7 @@ class GraphDesigner:
         patterns_dir = Path(__file__).parent.parent.parent / "config" / "patterns"
 
         if not patterns_dir.exists():
-            print(f"Warning: Patterns directory not found: {patterns_dir}")
+            logger.warning("Patterns directory not found: %s", patterns_dir)
             return templates
 
         pattern_files = {
@@ -72,9 +392,9 @@ class GraphDesigner:
             if file_path.exists():
                 try:
                     with open(file_path, "r", encoding="utf-8") as f:
-                        templates[pattern_type] = yaml.safe_load(f)
+                        templates[pattern_type] = yaml.load(f, Loader=_YAML_LOADER)
                 except Exception as e:
-                    print(f"Warning: Failed to load {filename}: {e}")
+                    logger.warning("Failed to load %s: %s", filename, e)
 
         return templates
 
@@ -118,26 +438,13 @@ class GraphDesigner:
             # Complex multi-step task -> Plan-Execute
             return PatternType.PLAN_EXECUTE
 
-        # Check for iteration/refinement keywords
-        desc_lower = (project_meta.description + project_meta.user_intent_summary).lower()
-
-        if any(
-            word in desc_lower
-            for word in [
-                "迭代",
-                "改进",
-                "优化",
-                "审核",
-                "修改",
-                "iterate",
-                "improve",
-                "refine",
-                "review",
-                "revise",
-            ]
-        ):
-            # Needs iteration -> Reflection
-            return PatternType.REFLECTION
+        # Check for iteration/refinement keywords (description first; intent only if needed).
+        # This must precede the complexity check: iterative tasks get Reflection
+        # even when complex enough for Supervisor.
+        for text in (project_meta.description, project_meta.user_intent_summary):
+            if _ITER_KEYWORDS_PATTERN.search(text):
+                # Needs iteration -> Reflection
+                return PatternType.REFLECTION
 
         # Check for multiple tools
         if project_meta.complexity_score >= 6:
@@ -176,79 +483,23 @@ class GraphDesigner:
 
     def _get_base_state_fields(self) -> List[StateField]:
         """Get base state fields required for all patterns."""
-        return [
-            StateField(
-                name="messages",
-                type=StateFieldType.LIST_MESSAGE,
-                description="对话历史",
-                reducer="add_messages",
-            ),
-            StateField(
-                name="is_finished",
-                type=StateFieldType.BOOL,
-                description="是否完成任务",
-                default=False,
-            ),
-        ]
+        return _copy_fields(_BASE_STATE_FIELDS)
 
     def _get_pattern_state_fields(self, pattern: PatternConfig) -> List[StateField]:
         """Get pattern-specific state fields."""
-        fields = []
+        fields = _copy_fields(_PATTERN_STATE_FIELDS.get(pattern.pattern_type, ()))
 
         if pattern.pattern_type == PatternType.REFLECTION:
-            fields.extend(
-                [
-                    StateField(name="draft", type=StateFieldType.STRING, default=""),
-                    StateField(name="feedback", type=StateFieldType.STRING, default=""),
-                    StateField(name="iteration_count", type=StateFieldType.INT, default=0),
-                    StateField(
-                        name="max_iterations",
-                        type=StateFieldType.INT,
-                        default=pattern.max_iterations,
-                    ),
-                ]
-            )
-
-        elif pattern.pattern_type == PatternType.SUPERVISOR:
-            fields.extend(
-                [
-                    StateField(name="next_action", type=StateFieldType.STRING, default=""),
-                    StateField(name="tool_results", type=StateFieldType.DICT, default={}),
-                ]
-            )
-
-        elif pattern.pattern_type == PatternType.PLAN_EXECUTE:
-            fields.extend(
-                [
-                    StateField(name="plan", type=StateFieldType.LIST_STR, default=[]),
-                    StateField(name="current_step", type=StateFieldType.INT, default=0),
-                    StateField(name="execution_results", type=StateFieldType.LIST_STR, default=[]),
-                    StateField(name="need_replan", type=StateFieldType.BOOL, default=False),
-                ]
+            # The only field whose default depends on the pattern config
+            fields.append(
+                _MAX_ITERATIONS_FIELD.model_copy(update={"default": pattern.max_iterations})
             )
 
         return fields
 
     def _get_rag_state_fields(self) -> List[StateField]:
         """Get RAG-specific state fields."""
-        return [
-            StateField(
-                name="retrieved_docs",
-                type=StateFieldType.LIST_STR,
-                description="检索到的文档",
-                default=[],
-            ),
-            StateField(
-                name="context", type=StateFieldType.STRING, description="RAG上下文", default=""
-            ),
-            # 🆕 v7.2: LLM 语义路由字段
-            StateField(
-                name="router_decision",
-                type=StateFieldType.OPTIONAL_STR,
-                description="路由决策结果: 'SEARCH' 或 'CHAT'",
-                default=None,
-            ),
-        ]
+        return _copy_fields(_RAG_STATE_FIELDS)
 
     # ==================== Step 3: Nodes & Edges Design ====================
 
@@ -278,54 +529,37 @@ class GraphDesigner:
         nodes = self._create_nodes_from_template(template, pattern)
         edges = self._create_edges_from_template(template)
         conditional_edges = self._create_conditional_edges_from_template(template, pattern)
+        node_index = _NodeIndex.build(nodes)
 
         # Add RAG node if needed (Router Pattern)
         if project_meta.has_rag and rag_config:
-            rag_nodes, rag_edges, rag_cond_edges = self._add_rag_integration(nodes, rag_config)
-            nodes.extend(rag_nodes)  # 🆕 v7.2: 添加 Router 和 RAG 节点
-            edges.extend(rag_edges)
-            conditional_edges.extend(rag_cond_edges)
+            rag_nodes, rag_edges, rag_cond_edges = self._add_rag_integration(node_index, rag_config)
+            nodes += rag_nodes  # 🆕 v7.2: 添加 Router 和 RAG 节点
+            node_index.add(rag_nodes)
+            edges += rag_edges
+            conditional_edges += rag_cond_edges
 
         # Add tool nodes if needed
         if tools_config and tools_config.enabled_tools:
-            tool_nodes, tool_edges = self._add_tool_integration(nodes, tools_config, pattern)
-            nodes.extend(tool_nodes)
-            edges.extend(tool_edges)
+            tool_nodes, tool_edges = self._add_tool_integration(node_index, tools_config, pattern)
+            nodes += tool_nodes
+            edges += tool_edges
 
             # Update conditional edges for tools
-            if pattern.pattern_type == PatternType.SUPERVISOR:
-                conditional_edges = self._update_supervisor_edges(conditional_edges, tools_config)
-            # 🔗 Fix Sequential Pattern Routing
-            elif pattern.pattern_type == PatternType.SEQUENTIAL:
-                conditional_edges = self._resolve_tools_placeholder(conditional_edges, tools_config)
-
-            # 🔗 Fix Plan-Execute Pattern Routing (Executor -> Tools)
-            # We need to ADD a conditional edge from executor -> tools if it doesn't exist?
-            # Or assume Executor has it?
-            # Plan-Execute template usually doesn't have default cond edge for tools.
-            # We must injecting it dynamically here.
-            elif pattern.pattern_type == PatternType.PLAN_EXECUTE:
-                conditional_edges = self._inject_executor_tool_routing(
-                    conditional_edges, tools_config
-                )
+            router = self._TOOL_ROUTERS.get(pattern.pattern_type)
+            if router:
+                conditional_edges = getattr(self, router)(conditional_edges, tools_config)
         else:
             # 🆕 No tools - clean up any tool-related conditional edges
             # Remove branches pointing to 'tools' placeholder
             for edge in conditional_edges:
-                branches_to_remove = []
-                for key, target in edge.branches.items():
-                    if target == "tools":
-                        branches_to_remove.append(key)
-
-                for key in branches_to_remove:
-                    del edge.branches[key]
+                edge.branches = {k: v for k, v in edge.branches.items() if v != "tools"}
 
-        # 🆕 v7.2: 如果有 RAG,Entry Point 应该是 intent_router
-        entry_point = template.get("entry_point", nodes[0].id if nodes else "agent")
+        # 🆕 v7.2: 如果有 RAG,Entry Point 应该是 intent_router (_add_rag_integration 总会创建该节点)
         if project_meta.has_rag and rag_config:
-            # 检查是否有 intent_router 节点
-            if any(n.id == "intent_router" for n in nodes):
-                entry_point = "intent_router"
+            entry_point = "intent_router"
+        else:
+            entry_point = template.get("entry_point", nodes[0].id if nodes else "agent")
 
         return GraphStructure(
             pattern=pattern,
@@ -336,31 +570,20 @@ class GraphDesigner:
             entry_point=entry_point,
         )
 
-        return nodes
-
     def _create_nodes_from_template(
         self, template: Dict[str, Any], pattern: PatternConfig
     ) -> List[NodeDef]:
         """Create nodes from pattern template."""
         nodes = []
         default_nodes = template.get("default_nodes", [])
-        print(f"🔍 [GraphDesigner] Template nodes for {pattern.pattern_type}: {default_nodes}")
-
-        # 🔗 Fallback for Sequential Pattern (if template empty)
-        if not default_nodes and pattern.pattern_type == PatternType.SEQUENTIAL:
-            print("🔧 [GraphDesigner] Using hardcoded fallback for Sequential Nodes")
-            default_nodes = [
-                {"id": "agent", "type": "llm", "role_description": "Primary Agent", "config": {}}
-            ]
-
-        # 🔗 Fallback for Plan-Execute Pattern
-        elif not default_nodes and pattern.pattern_type == PatternType.PLAN_EXECUTE:
-            print("🔧 [GraphDesigner] Using hardcoded fallback for Plan-Execute Nodes")
-            default_nodes = [
-                {"id": "planner", "type": "llm", "role_description": "Planner"},
-                {"id": "executor", "type": "llm", "role_description": "Executor"},
-                {"id": "replanner", "type": "llm", "role_description": "Replanner"},
-            ]
+        logger.debug(
+            "🔍 [GraphDesigner] Template nodes for %s: %s", pattern.pattern_type, default_nodes
+        )
+
+        # 🔗 Hardcoded fallback when the template is empty (Sequential, Plan-Execute)
+        if not default_nodes and pattern.pattern_type in _FALLBACK_NODES:
+            label, default_nodes = _FALLBACK_NODES[pattern.pattern_type]
+            logger.debug("🔧 [GraphDesigner] Using hardcoded fallback for %s Nodes", label)
 
         for node_def in default_nodes:
             nodes.append(
@@ -391,38 +614,12 @@ class GraphDesigner:
         conditional_edges = []
         default_cond_edges = template.get("default_conditional_edges", [])
 
-        # 🔗 Fallback for Sequential Pattern
-        if not default_cond_edges and pattern.pattern_type == PatternType.SEQUENTIAL:
-            print("🔧 [GraphDesigner] Using hardcoded fallback for Sequential Conditional Edges")
-            default_cond_edges = [
-                {
-                    "source": "agent",
-                    "condition": "should_continue",
-                    # ✅ Fixed: Correct logic to check tool_calls and return tool name
-                    "condition_logic": """
-last_msg = state.get("messages", [])[-1] if state.get("messages") else None
-if last_msg and hasattr(last_msg, "tool_calls") and last_msg.tool_calls:
-    return last_msg.tool_calls[0]["name"]
-return "end"
-""",
-                    "branches": {
-                        "continue": "tools",  # Placeholder, replaced by _resolve_tools_placeholder
-                        "end": "END",
-                    },
-                }
-            ]
-
-        # 🔗 Fallback for Plan-Execute Pattern
-        elif not default_cond_edges and pattern.pattern_type == PatternType.PLAN_EXECUTE:
-            print("🔧 [GraphDesigner] Using hardcoded fallback for Plan-Execute Conditional Edges")
-            default_cond_edges = [
-                {
-                    "source": "replanner",
-                    "condition": "should_end_or_replan",
-                    "condition_logic": "return 'end' if state.get('is_finished') else 'continue'",
-                    "branches": {"end": "END", "continue": "executor"},
-                }
-            ]
+        # 🔗 Hardcoded fallback when the template is empty (Sequential, Plan-Execute)
+        if not default_cond_edges and pattern.pattern_type in _FALLBACK_CONDITIONAL_EDGES:
+            label, default_cond_edges = _FALLBACK_CONDITIONAL_EDGES[pattern.pattern_type]
+            logger.debug(
+                "🔧 [GraphDesigner] Using hardcoded fallback for %s Conditional Edges", label
+            )
 
         for edge_def in default_cond_edges:
             conditional_edges.append(
@@ -437,7 +634,7 @@ return "end"
         return conditional_edges
 
     def _add_rag_integration(
-        self, existing_nodes: List[NodeDef], rag_config: RAGConfig
+        self, node_index: _NodeIndex, rag_config: RAGConfig
     ) -> tuple[List[NodeDef], List[EdgeDef], List[ConditionalEdgeDef]]:
         """Add RAG node with LLM-based Intent Router Pattern (v7.2).
 
@@ -453,18 +650,7 @@ return "end"
         router_node = NodeDef(
             id="intent_router",
             type="llm",
-            role_description="""你是一个路由助手。分析用户输入,判断是否需要查询知识库。
-
-规则:
-- 如果用户在询问事实性问题、请求文档信息、或需要查找资料,输出 'SEARCH'
-- 如果用户只是打招呼、闲聊、或进行简单对话,输出 'CHAT'
-- 只输出 'SEARCH' 或 'CHAT',不要输出其他内容
-
-示例:
-- "IteraAgent 的核心特性是什么?" -> SEARCH
-- "具体步骤?" -> SEARCH  
-- "你好" -> CHAT
-- "谢谢" -> CHAT""",
+            role_description=_ROUTER_ROLE_DESC,
             config={"is_router": True},  # 标记为路由节点
         )
 
@@ -481,12 +667,10 @@ return "end"
         )
 
         # 找到主 Agent 节点
-        llm_nodes = [n for n in existing_nodes if n.type == "llm"]
-        if not llm_nodes:
+        agent_id = node_index.primary_llm_id
+        if agent_id is None:
             return [router_node, rag_node], [], []
 
-        agent_id = llm_nodes[0].id
-
         # 3. 构建边
         edges = [
             EdgeDef(
@@ -500,28 +684,7 @@ return "end"
             ConditionalEdgeDef(
                 source="intent_router",
                 condition="route_by_intent",
-                condition_logic="""# LLM 语义路由 (v7.2)
-# 检查 Router 节点的输出决策
-messages = state.get("messages", [])
-
-if not messages:
-    return "chat"
-
-# 获取 Router 的输出 (最后一条 AI 消息)
-last_message = messages[-1]
-decision = ""
-
-if hasattr(last_message, 'content'):
-    decision = last_message.content.strip().upper()
-elif isinstance(last_message, dict):
-    decision = last_message.get("content", "").strip().upper()
-
-# 根据 Router 的决策路由
-if "SEARCH" in decision:
-    return "search"
-else:
-    return "chat"
-""",
+                condition_logic=_ROUTER_CONDITION_LOGIC,
                 branches={"search": "rag_retriever", "chat": agent_id},  # 需要检索  # 直接对话
             )
         ]
@@ -530,36 +693,29 @@ else:
         return [router_node, rag_node], edges, conditional_edges
 
     def _add_tool_integration(
-        self, existing_nodes: List[NodeDef], tools_config: ToolsConfig, pattern: PatternConfig
+        self, node_index: _NodeIndex, tools_config: ToolsConfig, pattern: PatternConfig
     ) -> tuple[List[NodeDef], List[EdgeDef]]:
         """Add tool nodes and edges."""
-        tool_nodes = []
-        tool_edges = []
+        enabled_tools = tools_config.enabled_tools
 
-        for tool_name in tools_config.enabled_tools:
-            tool_node = NodeDef(
+        tool_nodes = [
+            NodeDef(
                 id=f"tool_{tool_name}",
                 type="tool",
                 role_description=f"执行{tool_name}工具",
                 config={"tool_name": tool_name},
             )
-            tool_nodes.append(tool_node)
-
-            # Logic for Return Edges
-
-            # 1. Sequential: Tool -> Agent
-            if pattern.pattern_type == PatternType.SEQUENTIAL:
-                agent_nodes = [n for n in existing_nodes if n.type == "llm"]
-                if agent_nodes:
-                    tool_edges.append(EdgeDef(source=f"tool_{tool_name}", target=agent_nodes[0].id))
-
-            # 2. Plan-Execute: Tool -> Executor
-            elif pattern.pattern_type == PatternType.PLAN_EXECUTE:
-                # Tools used by executor should return execution result to executor
-                tool_edges.append(EdgeDef(source=f"tool_{tool_name}", target="executor"))
+            for tool_name in enabled_tools
+        ]
 
-            # 3. Supervisor: Tool output handled by graph state or specific worker logic
-            # (Usually Supervisor pattern uses workers that call tools)
+        # Logic for Return Edges (same target for every tool)
+        return_target_for = _TOOL_RETURN_TARGETS.get(pattern.pattern_type)
+        return_target = return_target_for(node_index) if return_target_for else None
+        tool_edges = (
+            [EdgeDef(source=f"tool_{t}", target=return_target) for t in enabled_tools]
+            if return_target
+            else []
+        )
 
         return tool_nodes, tool_edges
 
@@ -591,37 +747,22 @@ else:
 
         And updates condition logic to return tool name.
         """
+        # branch key = tool_name (what logic returns), branch target = node_id (where to go)
+        tool_branches = {t: f"tool_{t}" for t in tools_config.enabled_tools}
+
         for edge in conditional_edges:
             # Check for 'tools' placeholder
-            placeholder_key = None
-            for key, target in edge.branches.items():
-                if target == "tools":
-                    placeholder_key = key
-                    break
-
-            if placeholder_key:
-                # Remove placeholder
-                del edge.branches[placeholder_key]
-
-                # Add actual tool nodes
-                for tool_name in tools_config.enabled_tools:
-                    # branch key = tool_name (what logic returns)
-                    # branch target = node_id (where to go)
-                    edge.branches[tool_name] = f"tool_{tool_name}"
+            if "tools" in edge.branches.values():
+                # Replace placeholder with actual tool nodes in one rebuild
+                edge.branches = {
+                    k: v for k, v in edge.branches.items() if v != "tools"
+                } | tool_branches
 
                 # Update condition logic description to reflect this
                 # (Actual logic generation happens in Compiler, this is for graph structure validity)
                 if not edge.condition_logic or "tools" in edge.condition_logic:
                     # Generic logic description
-                    edge.condition_logic = f"""
-# Tool Routing Logic
-# Returns the name of the tool to call
-
-last_msg = state["messages"][-1]
-if hasattr(last_msg, "tool_calls") and last_msg.tool_calls:
-    return last_msg.tool_calls[0]["name"]
-return "end"
-"""
+                    edge.condition_logic = _TOOL_ROUTING_LOGIC
         return conditional_edges
 
     def _inject_executor_tool_routing(
@@ -644,17 +785,11 @@ return "end"
             new_edge = ConditionalEdgeDef(
                 source="executor",
                 condition="execute_step",
-                condition_logic="""
-# Executor Routing
-last_msg = state["messages"][-1]
-if hasattr(last_msg, "tool_calls") and last_msg.tool_calls:
-    return last_msg.tool_calls[0]["name"]
-return "evaluator"
-""",
+                condition_logic=_EXECUTOR_ROUTING_LOGIC,
                 branches=branches,
             )
             conditional_edges.append(new_edge)
-            print(f"🔧 [GraphDesigner] Injected Executor -> Tools routing edge")
+            logger.debug("🔧 [GraphDesigner] Injected Executor -> Tools routing edge")
 
         return conditional_edges
 
@@ -701,9 +836,6 @@ return "evaluator"
         Args:
             tools_config: 工具配置
         """
-        from .interface_guard import InterfaceGuard
-        from ..tools import get_global_registry
-
         print("🛡️ [Interface Guard] 开始验证工具参数...")
 
         guard = InterfaceGuard(self.builder, max_retries=3)
@@ -752,25 +884,16 @@ return "evaluator"
         sample_args = {}
 
         properties = schema.get("properties", {})
-        required = schema.get("required", [])
+        required = set(schema.get("required", ()))
 
         for field_name, field_schema in properties.items():
-            field_type = field_schema.get("type", "string")
-
             # 只为必填字段生成默认值
-            if field_name in required:
-                if field_type == "string":
-                    sample_args[field_name] = f"sample_{field_name}"
-                elif field_type == "integer":
-                    sample_args[field_name] = 1
-                elif field_type == "number":
-                    sample_args[field_name] = 1.0
-                elif field_type == "boolean":
-                    sample_args[field_name] = True
-                elif field_type == "array":
-                    sample_args[field_name] = []
-                elif field_type == "object":
-                    sample_args[field_name] = {}
+            if field_name not in required:
+                continue
+
+            factory = _JSON_TYPE_SAMPLES.get(field_schema.get("type", "string"))
+            if factory:
+                sample_args[field_name] = factory(field_name)
 
         return sample_args
 
@@ -781,15 +904,21 @@ return "evaluator"
         output_path = Path(output_path)
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(graph.model_dump_json(indent=2))
+        if HAS_ORJSON:
+            output_path.write_bytes(
+                orjson.dumps(graph.model_dump(mode="json"), option=orjson.OPT_INDENT_2)
+            )
+        else:
+            output_path.write_text(graph.model_dump_json(indent=2), encoding="utf-8")
 
     def load_graph(self, input_path) -> GraphStructure:
         """Load graph structure from JSON file."""
         input_path = Path(input_path)
 
-        with open(input_path, "r", encoding="utf-8") as f:
-            return GraphStructure.model_validate_json(f.read())
+        data = input_path.read_bytes()
+        if HAS_ORJSON:
+            return GraphStructure.model_validate(orjson.loads(data))
+        return GraphStructure.model_validate_json(data)
 
     async def fix_logic(
         self,
@@ -808,20 +937,28 @@ return "evaluator"
             修复后的图结构
         """
         # 构建 Prompt
-        issues_desc = ""
+        parts = []
         if simulation_result and simulation_result.issues:
-            issues_desc += "Simulation Issues:\n"
+            parts.append("Simulation Issues:\n")
             for issue in simulation_result.issues:
-                issues_desc += f"- [{issue.severity}] {issue.issue_type}: {issue.description}\n"
+                parts.append(f"- [{issue.severity}] {issue.issue_type}: {issue.description}\n")
                 if issue.suggestion:
-                    issues_desc += f"  Suggestion: {issue.suggestion}\n"
+                    parts.append(f"  Suggestion: {issue.suggestion}\n")
 
         if feedback:
-            issues_desc += f"\nExternal Feedback:\n{feedback}\n"
+            parts.append(f"\nExternal Feedback:\n{feedback}\n")
+
+        issues_desc = "".join(parts)
 
         if not issues_desc:
             return current_graph
 
+        cache_key = LLMCache.make_key(current_graph.model_dump(mode="json"), issues_desc)
+        cached = self.fix_cache.get(cache_key)
+        if cached is not None:
+            logger.debug("🔧 [GraphDesigner] fix_logic 命中缓存")
+            return cached.model_copy(deep=True)
+
         prompt = f"""# Graph Repair Task
 
 ## Current Graph
@@ -831,36 +968,7 @@ Nodes: {', '.join(n.id for n in current_graph.nodes)}
 ## Issues Detected
 {issues_desc}
 
-## Requirement
-Please fix the graph structure based on the issues above.
-Focus on:
-1. Breaking infinite loops (e.g., adding iteration limits)
-2. Connecting unreachable nodes
-3. Fixing logic errors in conditional edges
-
-## CRITICAL CONSTRAINTS
-
-### 1. Node Targets - Use 'END' for termination
-All edge targets MUST be either:
-- Actual node IDs from the nodes list above
-- The special node "END" (all caps) to terminate the workflow
-
-DO NOT use variants like '__end__', 'end', '__start__', or 'START'.
-If you need to end the workflow, use "END" (all caps).
-
-### 2. State Field Types - MUST use exact enum values
-type MUST be one of: "str", "int", "bool", "float", "List[BaseMessage]", "List[str]", "Dict[str, Any]", "Optional[str]", "Optional[int]", "Any"
-FORBIDDEN: "Optional[List[str]]", "List[Dict]", or custom strings
-
-### 3. Condition Logic - Define all variables first
-All variables in condition_logic MUST be defined in state_schema.fields.
-Use: state['variable_name'] syntax.
-
-### 4. Prevent Infinite Loops
-Add iteration counters with max limits for any loops.
-
-Return the full updated GraphStructure JSON.
-"""
+{_FIX_LOGIC_RULES}"""
 
         # 调用 LLM 修复
         response = await self.builder.call(prompt, schema=GraphStructure)
@@ -868,7 +976,9 @@ Return the full updated GraphStructure JSON.
         # 🔧 后处理: 统一特殊节点为 "END"
         if isinstance(response, dict):
             response = self._normalize_special_nodes(response)
-            return GraphStructure(**response)
+            response = GraphStructure(**response)
+        if isinstance(response, GraphStructure):
+            self.fix_cache.put(cache_key, response.model_copy(deep=True))
         return response
 
     def _normalize_special_nodes(self, graph_dict: dict) -> dict:
@@ -883,20 +993,27 @@ Return the full updated GraphStructure JSON.
         Returns:
             规范化后的 Graph 字典
         """
-        END_VARIANTS = ["__end__", "end", "__END__", "_end_", "End", "__end", "end__"]
+        normalized = []
 
         # 处理 conditional_edges
         for edge in graph_dict.get("conditional_edges", []):
             branches = edge.get("branches", {})
-            for key, value in list(branches.items()):
-                if value in END_VARIANTS:
+            for key, value in branches.items():
+                if isinstance(value, str) and value in _END_VARIANTS:
                     branches[key] = "END"
-                    print(f"🔧 [GraphDesigner] 规范化节点: '{value}' → 'END'")
+                    normalized.append(value)
 
         # 处理 regular edges
         for edge in graph_dict.get("edges", []):
-            if edge.get("target") in END_VARIANTS:
-                print(f"🔧 [GraphDesigner] 规范化节点: '{edge['target']}' → 'END'")
+            target = edge.get("target")
+            if isinstance(target, str) and target in _END_VARIANTS:
                 edge["target"] = "END"
+                normalized.append(target)
+
+        if normalized:
+            logger.debug(
+                "🔧 [GraphDesigner] 规范化节点: %s → 'END'",
+                ", ".join(f"'{name}'" for name in normalized),
+            )
 
         return graph_dict
@@ -4,6 +4,8 @@ Phase 6 Task 6.5: Graph Optimizer
 Optimizes graph structure and re-validates with simulation.
 """
 
+import asyncio
+import logging
 from typing import Tuple, Optional
 from ..schemas.graph_structure import GraphStructure
 from ..schemas.analysis_result import AnalysisResult
@@ -12,6 +14,8 @@ from ..schemas.simulation import SimulationResult
 from .graph_designer import GraphDesigner
 from .simulator import Simulator
 
+logger = logging.getLogger(__name__)
+
 
 class GraphOptimizer:
     """Graph 结构优化器
@@ -19,15 +23,22 @@ class GraphOptimizer:
     修复 Graph 逻辑并重新仿真验证
     """
 
-    def __init__(self, graph_designer: GraphDesigner, simulator: Simulator):
+    # 最大尝试次数
+    MAX_ATTEMPTS = 3
+
+    def __init__(
+        self, graph_designer: GraphDesigner, simulator: Simulator, speculative: bool = False
+    ):
         """初始化优化器
 
         Args:
             graph_designer: Graph 设计器
             simulator: 仿真器
+            speculative: 是否在仿真期间预先发起下一次修复 (多消耗一次 LLM 调用换取延迟)
         """
         self.designer = graph_designer
         self.simulator = simulator
+        self.speculative = speculative
 
     async def optimize_graph(
         self, current_graph: GraphStructure, analysis: AnalysisResult, project_meta: ProjectMeta
@@ -39,6 +50,9 @@ class GraphOptimizer:
         2. **重新运行 Simulator 验证修复**
         3. 如果仍有问题,最多重试 2 次
 
+        speculative 模式下, 第 N 次仿真运行的同时, 假设其失败并预先发起第 N+1 次修复;
+        仿真通过则取消预修复, 否则直接使用预修复结果, 省去一次串行的 LLM 往返。
+
         Args:
             current_graph: 当前 Graph 结构
             analysis: 分析结果
@@ -47,37 +61,64 @@ class GraphOptimizer:
         Returns:
             (优化后的 Graph, 仿真结果)
         """
-        feedback = f"{analysis.primary_issue}\n{analysis.root_cause}"
-
-        for attempt in range(3):  # 最多 3 次尝试
-            print(f"🔧 Graph 优化尝试 {attempt + 1}/3...")
-
-            # 1. 修复 Graph
-            optimized_graph = await self.designer.fix_logic(current_graph, feedback=feedback)
-
-            # 2. 🔑 重新仿真验证
-            # 创建合适的样本输入
-            if project_meta.has_rag:
-                sample_input = "测试 RAG 检索功能"
-            elif project_meta.task_type == "search":
-                sample_input = "搜索测试"
-            else:
-                sample_input = "测试输入"
-
-            sim_result = await self.simulator.simulate(optimized_graph, sample_input)
+        base_feedback = f"{analysis.primary_issue}\n{analysis.root_cause}"
+        feedback = base_feedback
+
+        # 创建合适的样本输入
+        if project_meta.has_rag:
+            sample_input = "测试 RAG 检索功能"
+        elif project_meta.task_type == "search":
+            sample_input = "搜索测试"
+        else:
+            sample_input = "测试输入"
+
+        # speculative 模式下预先发起的下一次修复
+        next_fix: Optional[asyncio.Task] = None
+
+        for attempt in range(self.MAX_ATTEMPTS):
+            logger.info("🔧 Graph 优化尝试 %d/%d...", attempt + 1, self.MAX_ATTEMPTS)
+
+            # 1. 修复 Graph (优先使用预修复结果, 失败则按真实 feedback 重新修复)
+            optimized_graph = None
+            if next_fix is not None:
+                try:
+                    optimized_graph = await next_fix
+                except Exception as e:
+                    logger.warning("⚠️ 预修复失败,改为串行修复: %s", e)
+                next_fix = None
+            if optimized_graph is None:
+                optimized_graph = await self.designer.fix_logic(current_graph, feedback=feedback)
+
+            # 2. 🔑 重新仿真验证 (speculative: 同时假设失败, 预先发起下一次修复)
+            if self.speculative and attempt + 1 < self.MAX_ATTEMPTS:
+                next_fix = asyncio.create_task(
+                    self.designer.fix_logic(
+                        optimized_graph,
+                        feedback=f"Previous fix may not have resolved the issue.\n{base_feedback}",
+                    )
+                )
+
+            try:
+                sim_result = await self.simulator.simulate(optimized_graph, sample_input)
+            except BaseException:
+                if next_fix is not None:
+                    next_fix.cancel()
+                raise
 
             # 3. 检查仿真结果
             if not sim_result.has_errors():
-                # 仿真通过,返回优化后的 Graph
-                print(f"✅ Graph 优化成功,仿真通过")
+                # 仿真通过,取消预修复,返回优化后的 Graph
+                if next_fix is not None:
+                    next_fix.cancel()
+                logger.info("✅ Graph 优化成功,仿真通过")
                 return optimized_graph, sim_result
             else:
                 # 仿真仍有问题,更新 feedback 继续尝试
                 issues_desc = [i.description for i in sim_result.issues[:3]]
                 feedback = f"Previous fix failed. Issues: {issues_desc}"
                 current_graph = optimized_graph  # 使用修复后的作为基础
-                print(f"⚠️ 仿真仍有问题: {issues_desc}")
+                logger.warning("⚠️ 仿真仍有问题: %s", issues_desc)
 
         # 3 次尝试后仍失败,返回最后一次的结果
-        print(f"⚠️ Graph 优化未完全成功,返回最后一次结果")
+        logger.warning("⚠️ Graph 优化未完全成功,返回最后一次结果")
         return optimized_graph, sim_result
@@ -4,13 +4,61 @@ This module implements the Interface Guard system that validates tool parameters
 against their schemas and automatically corrects errors using LLM.
 """
 
+import asyncio
 import json
-import re
-from typing import Dict, Any, Tuple, Optional, List, Type
-from pydantic import BaseModel, ValidationError, create_model, Field
+import logging
+from typing import ClassVar, Dict, Any, Tuple, Optional, List, Type
+from pydantic import BaseModel, TypeAdapter, ValidationError, create_model, Field
 
-from ..llm import BuilderClient
+from ..llm import BuilderClient, LLMCache
 from ..schemas.tool_schema import ToolValidationResult, ToolValidationError
+from ..utils.json_utils import find_json_span
+from ..utils.lru_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# orjson.JSONDecodeError 是 json.JSONDecodeError 的子类, 两种解析器可共用同一异常处理
+_json_loads = orjson.loads if HAS_ORJSON else json.loads
+
+
+def _dumps_pretty(obj: Any) -> str:
+    """缩进 2 格的 JSON 文本 (保留非 ASCII 字符), 有 orjson 时使用 orjson"""
+    if HAS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(obj, indent=2, ensure_ascii=False)
+
+
+# JSON Schema 类型 -> Python 类型, 未知类型按 str 处理
+_JSON_TYPE_MAP: Dict[str, type] = {
+    "string": str,
+    "integer": int,
+    "number": float,
+    "boolean": bool,
+    "array": list,
+    "object": dict,
+}
+
+
+def _extract_first_json(text: str) -> Optional[str]:
+    """提取文本中第一个括号平衡的 {...} 片段 (字符串内的花括号不计入深度)
+
+    Args:
+        text: LLM 返回的原始文本
+
+    Returns:
+        第一个完整的 JSON 对象片段; 不存在时返回 None
+    """
+    span = find_json_span(text)
+    if span is None:
+        return None
+    return text[span[0] : span[1]]
 
 
 class InterfaceGuard:
@@ -24,6 +72,15 @@ class InterfaceGuard:
     如果验证失败,会使用 LLM 自动修复参数 (最多重试 3 次)。
     """
 
+    # 参数模型缓存 (按 Schema 的规范 JSON 文本, LRU 有界), 所有 Guard 实例共享
+    _MODEL_CACHE: ClassVar[LRUCache] = LRUCache(maxsize=256)
+
+    # 批量验证用的 List[Model] 适配器 (按参数模型类, LRU 有界), 所有 Guard 实例共享
+    _BATCH_ADAPTER_CACHE: ClassVar[LRUCache] = LRUCache(maxsize=64)
+
+    # 已验证通过的 LLM 修复结果 (按 模型 + 工具名 + Schema + 参数 + 错误 摘要), 所有 Guard 实例共享
+    _FIX_CACHE: ClassVar[LLMCache] = LLMCache(maxsize=256)
+
     def __init__(self, builder_client: BuilderClient, max_retries: int = 3):
         """初始化 Interface Guard
 
@@ -34,6 +91,78 @@ class InterfaceGuard:
         self.builder = builder_client
         self.max_retries = max_retries
 
+    def try_validate(
+        self, tool_name: str, args: Dict[str, Any], schema: Dict[str, Any]
+    ) -> Optional[ToolValidationResult]:
+        """同步快速验证, 参数有效时直接返回结果
+
+        验证通过时无需进入事件循环; 调用方仅在返回 None 时再 await validate_and_fix。
+
+        Args:
+            tool_name: 工具名称
+            args: 待验证的参数
+            schema: OpenAPI/JSON Schema
+
+        Returns:
+            验证通过时返回 ToolValidationResult, 否则返回 None
+        """
+        is_valid, _ = self._validate_with_pydantic(args, schema)
+        if not is_valid:
+            return None
+        return self._valid_result(tool_name, args)
+
+    async def validate_batch(
+        self, tool_name: str, args_list: List[Dict[str, Any]], schema: Dict[str, Any]
+    ) -> List[ToolValidationResult]:
+        """批量验证同一工具的多组参数, 失败项再逐个修复
+
+        整批参数通过一次 List[Model] 校验完成; 只有出错的条目走 validate_and_fix。
+
+        Args:
+            tool_name: 工具名称
+            args_list: 多组待验证参数
+            schema: OpenAPI/JSON Schema
+
+        Returns:
+            与 args_list 顺序一致的验证结果列表
+        """
+        try:
+            # 相同 Schema 复用同一个模型类, 以类为键无需再次序列化 Schema
+            model = self._create_pydantic_model(schema)
+            adapter = self._BATCH_ADAPTER_CACHE.get(model)
+            if adapter is None:
+                adapter = TypeAdapter(List[model])
+                self._BATCH_ADAPTER_CACHE.put(model, adapter)
+            adapter.validate_python(args_list)
+            failed = set()
+        except ValidationError as e:
+            # 错误位置的第一段是条目下标
+            failed = {error["loc"][0] for error in e.errors() if error["loc"]}
+        except Exception:
+            failed = set(range(len(args_list)))
+
+        fixes = await asyncio.gather(
+            *(self.validate_and_fix(tool_name, args_list[i], schema) for i in sorted(failed))
+        )
+        fixed = dict(zip(sorted(failed), fixes, strict=True))
+
+        return [
+            fixed[i] if i in fixed else self._valid_result(tool_name, args)
+            for i, args in enumerate(args_list)
+        ]
+
+    @staticmethod
+    def _valid_result(tool_name: str, args: Dict[str, Any]) -> ToolValidationResult:
+        """构造首次即验证通过的结果"""
+        return ToolValidationResult.model_construct(
+            is_valid=True,
+            tool_name=tool_name,
+            original_args=args,
+            corrected_args=dict(args),
+            errors=[],
+            retry_count=0,
+        )
+
     async def validate_and_fix(
         self, tool_name: str, args: Dict[str, Any], schema: Dict[str, Any]
     ) -> ToolValidationResult:
@@ -47,34 +176,54 @@ class InterfaceGuard:
         Returns:
             ToolValidationResult 包含验证结果和修正后的参数
         """
+        # 结果对象由 Guard 内部构造 (字段均已可信), 使用 model_construct 跳过重复校验
+
         # 1. 首次验证
         is_valid, errors = self._validate_with_pydantic(args, schema)
         if is_valid:
-            return ToolValidationResult(
-                is_valid=True,
-                tool_name=tool_name,
-                original_args=args,
-                corrected_args=args,
-                errors=[],
-                retry_count=0,
-            )
+            return self._valid_result(tool_name, args)
 
         # 2. 自动修复循环
-        current_args = args.copy()
-        all_errors = errors.copy()
+        # 参数与错误列表均不会被原地修改, 无需预先复制
+        current_args = args
+        all_errors = errors
+        # Schema 在重试间不变, 只序列化一次
+        schema_json = _dumps_pretty(schema)
 
+        builder_config = getattr(self.builder, "config", None)
         for attempt in range(self.max_retries):
-            print(f"🔧 [Guard] 尝试修复 {tool_name} 参数 (第 {attempt + 1}/{self.max_retries} 次)")
-            print(f"   错误: {errors[0].error_message if errors else 'Unknown'}")
+            logger.debug(
+                "🔧 [Guard] 尝试修复 %s 参数 (第 %d/%d 次), 错误: %s",
+                tool_name,
+                attempt + 1,
+                self.max_retries,
+                errors[0].error_message if errors else "Unknown",
+            )
 
-            # 调用 LLM 修复
-            corrected_args = await self._auto_correct(tool_name, current_args, schema, errors)
+            # 相同输入 (含 Builder 模型与温度) 曾修复成功则直接复用, 否则调用 LLM 修复
+            cache_key = LLMCache.make_key(
+                getattr(builder_config, "model", None),
+                getattr(builder_config, "temperature", None),
+                tool_name,
+                schema,
+                current_args,
+                [(err.error_type, err.field_name) for err in errors],
+            )
+            cached_args = self._FIX_CACHE.get(cache_key)
+            if cached_args is not None:
+                corrected_args = dict(cached_args)
+            else:
+                corrected_args = await self._auto_correct(
+                    tool_name, current_args, schema, errors, schema_json
+                )
 
             # 验证修复结果
             is_valid, errors = self._validate_with_pydantic(corrected_args, schema)
             if is_valid:
-                print(f"✅ [Guard] 参数修复成功")
-                return ToolValidationResult(
+                # 只缓存验证通过的修复, 失败的结果不会被重复使用
+                self._FIX_CACHE.put(cache_key, dict(corrected_args))
+                logger.info("✅ [Guard] %s 参数修复成功", tool_name)
+                return ToolValidationResult.model_construct(
                     is_valid=True,
                     tool_name=tool_name,
                     original_args=args,
@@ -87,12 +236,13 @@ class InterfaceGuard:
             all_errors.extend(errors)
 
         # 3. 修复失败
-        print(f"❌ [Guard] 参数修复失败,已达最大重试次数")
-        return ToolValidationResult(
+        logger.warning("❌ [Guard] %s 参数修复失败,已达最大重试次数", tool_name)
+        return ToolValidationResult.model_construct(
             is_valid=False,
             tool_name=tool_name,
             original_args=args,
-            corrected_args=current_args,
+            # 修复全部失败时可能仍是 args 本身, 此时返回独立副本
+            corrected_args=dict(args) if current_args is args else current_args,
             errors=all_errors,
             retry_count=self.max_retries,
         )
@@ -110,6 +260,11 @@ class InterfaceGuard:
             (是否有效, 错误列表)
         """
         try:
+            # 快速判定: 类型明确且至多缺少必填字段时, 无需经过 Pydantic
+            fast_errors = self._fast_check(args, schema)
+            if fast_errors is not None:
+                return not fast_errors, fast_errors
+
             # 动态创建 Pydantic 模型
             model = self._create_pydantic_model(schema)
             model(**args)
@@ -120,7 +275,7 @@ class InterfaceGuard:
             for error in e.errors():
                 field_name = ".".join(str(loc) for loc in error["loc"])
                 errors.append(
-                    ToolValidationError(
+                    ToolValidationError.model_construct(
                         tool_name="",  # 会在外层填充
                         error_type=error["type"],
                         error_message=error["msg"],
@@ -133,7 +288,7 @@ class InterfaceGuard:
         except Exception as e:
             # 其他错误
             return False, [
-                ToolValidationError(
+                ToolValidationError.model_construct(
                     tool_name="",
                     error_type="validation_error",
                     error_message=str(e),
@@ -143,9 +298,77 @@ class InterfaceGuard:
                 )
             ]
 
+    def _fast_check(
+        self, args: Dict[str, Any], schema: Dict[str, Any]
+    ) -> Optional[List[ToolValidationError]]:
+        """不经 Pydantic 的快速验证
+
+        只处理结果确定的情况: 已提供的字段值与声明类型严格一致 (无需类型转换),
+        此时唯一可能的错误是缺少必填字段, 错误内容与 Pydantic 的 "missing" 错误一致。
+
+        Args:
+            args: 参数字典
+            schema: JSON Schema
+
+        Returns:
+            错误列表 (空列表表示验证通过); 需要 Pydantic 判定时返回 None
+        """
+        if not isinstance(args, dict):
+            return None
+
+        required = set(schema.get("required", []))
+        missing = []
+        for field_name, field_schema in schema.get("properties", {}).items():
+            if field_name not in args:
+                if field_name in required:
+                    missing.append(field_name)
+                continue
+
+            value = args[field_name]
+            if value is None:
+                if field_name in required:
+                    return None
+                continue
+
+            # bool 是 int 的子类, 需单独区分; float 字段同时接受 int
+            field_type = _JSON_TYPE_MAP.get(field_schema.get("type"), str)
+            if isinstance(value, bool) != (field_type is bool):
+                return None
+            if not isinstance(value, (int, float) if field_type is float else field_type):
+                return None
+
+        return [
+            ToolValidationError.model_construct(
+                tool_name="",  # 会在外层填充
+                error_type="missing",
+                error_message="Field required",
+                field_name=field_name,
+                expected="{}",
+                actual="missing",
+            )
+            for field_name in missing
+        ]
+
     def _create_pydantic_model(self, schema: Dict[str, Any]) -> Type[BaseModel]:
         """从 JSON Schema 创建 Pydantic 模型
 
+        Args:
+            schema: JSON Schema 定义
+
+        Returns:
+            动态创建的 Pydantic 模型类 (相同 Schema 复用同一个类)
+        """
+        # 规范 JSON 文本即可作键, 省去摘要计算
+        key = json.dumps(schema, sort_keys=True, default=str)
+        model = self._MODEL_CACHE.get(key)
+        if model is None:
+            model = self._build_pydantic_model(schema)
+            self._MODEL_CACHE.put(key, model)
+        return model
+
+    def _build_pydantic_model(self, schema: Dict[str, Any]) -> Type[BaseModel]:
+        """按 JSON Schema 构建 Pydantic 模型 (未缓存)
+
         Args:
             schema: JSON Schema 定义
 
@@ -157,7 +380,7 @@ class InterfaceGuard:
         required = schema.get("required", [])
 
         for field_name, field_schema in properties.items():
-            field_type = self._json_type_to_python(field_schema.get("type", "string"))
+            field_type = _JSON_TYPE_MAP.get(field_schema.get("type"), str)
             description = field_schema.get("description", "")
             is_required = field_name in required
 
@@ -177,15 +400,7 @@ class InterfaceGuard:
         Returns:
             对应的 Python 类型
         """
-        type_mapping = {
-            "string": str,
-            "integer": int,
-            "number": float,
-            "boolean": bool,
-            "array": list,
-            "object": dict,
-        }
-        return type_mapping.get(json_type, str)
+        return _JSON_TYPE_MAP.get(json_type, str)
 
     async def _auto_correct(
         self,
@@ -193,6 +408,7 @@ class InterfaceGuard:
         args: Dict[str, Any],
         schema: Dict[str, Any],
         errors: List[ToolValidationError],
+        schema_json: Optional[str] = None,
     ) -> Dict[str, Any]:
         """使用 LLM 自动修复参数
 
@@ -201,6 +417,7 @@ class InterfaceGuard:
             args: 当前参数
             schema: 参数 Schema
             errors: 验证错误列表
+            schema_json: 预先序列化的 Schema 文本 (可选, 缺省时现场生成)
 
         Returns:
             修正后的参数
@@ -216,12 +433,12 @@ class InterfaceGuard:
 
 参数 Schema:
 ```json
-{json.dumps(schema, indent=2, ensure_ascii=False)}
+{schema_json or _dumps_pretty(schema)}
 ```
 
 当前参数:
 ```json
-{json.dumps(args, indent=2, ensure_ascii=False)}
+{_dumps_pretty(args)}
 ```
 
 验证错误:
@@ -239,19 +456,19 @@ class InterfaceGuard:
 
         # 解析 LLM 返回的 JSON
         try:
-            corrected_args = json.loads(response)
+            corrected_args = _json_loads(response)
             return corrected_args
         except json.JSONDecodeError:
-            # 如果解析失败,尝试提取 JSON
-            json_match = re.search(r"\{.*\}", response, re.DOTALL)
-            if json_match:
+            # 如果解析失败,尝试提取第一个完整的 JSON 对象
+            json_span = _extract_first_json(response)
+            if json_span is not None:
                 try:
-                    return json.loads(json_match.group())
+                    return _json_loads(json_span)
                 except json.JSONDecodeError:
                     pass
 
             # 如果仍然失败,返回原参数
-            print(f"⚠️ [Guard] 无法解析 LLM 返回的 JSON: {response[:100]}")
+            logger.warning("⚠️ [Guard] 无法解析 LLM 返回的 JSON: %s", response[:100])
             return args
 
     def validate_sync(
@@ -8,10 +8,82 @@ Judge - DeepEval 结果分析器
 4. 确定修复目标 (Compiler 或 Graph Designer)
 """
 
-from typing import Optional, List, Dict, Any
-from src.schemas.execution_result import ExecutionResult, ExecutionStatus
+import operator
+import re
+from typing import NamedTuple, Optional, List, Dict, Any, Sequence
+from src.schemas.execution_result import ExecutionResult, ExecutionStatus, TestResult
 from src.schemas.judge_result import JudgeResult, ErrorType, FixTarget
 
+# 视为失败的测试状态
+_FAIL_STATUSES = frozenset({ExecutionStatus.FAIL, ExecutionStatus.FAILED})
+# 一次取出 TestResult 的各列字段
+_TEST_FIELDS = operator.attrgetter("test_id", "status", "error_message", "duration_ms")
+
+# API / 运行时错误关键词合并为一个正则, 按分组区分类别 (一次扫描, 忽略大小写)
+_ERROR_KEYWORDS_RE = re.compile(
+    r"(?P<api>api key|rate limit|connection error|timeout|network|http error)"
+    r"|(?P<runtime>syntaxerror|importerror|modulenotfounderror|nameerror|attributeerror"
+    r"|typeerror)",
+    re.IGNORECASE,
+)
+# RAG 失败信号, 每个分组对应一类信号 (忽略大小写, 无需 lower())
+_RAG_RE = re.compile(
+    r"(?P<recall>contextual ?recall)|(?P<faithfulness>faithfulness)"
+    r"|(?P<retrieval>retrieval)|(?P<empty>empty)|(?P<context>context)",
+    re.IGNORECASE,
+)
+# 逻辑错误提示: test_id 与错误信息拼接后一次扫描 ("tool" 只看 test_id)
+_LOGIC_HINT_RE = re.compile(r"(?P<faith>faithfulness)|(?P<recall>recall)|(?P<tool>tool)", re.I)
+
+# 固定的反馈建议 (JudgeResult 校验时会转换为 list)
+_RUNTIME_SUGGESTIONS = (
+    "检查生成的 agent.py 是否有语法错误",
+    "检查导入语句是否正确",
+    "检查 requirements.txt 中的依赖是否完整",
+    "建议: 让 Compiler 重新生成代码",
+)
+_LOGIC_SUGGESTIONS = (
+    "检查 Graph 结构是否合理",
+    "检查节点之间的连接是否正确",
+    "检查条件边的逻辑是否正确",
+    "建议: 让 Graph Designer 重新设计图结构",
+)
+_TIMEOUT_SUGGESTIONS = (
+    "检查是否有死循环或无限递归",
+    "检查 LLM 调用是否卡住",
+    "考虑增加超时时间",
+    "检查网络连接是否正常",
+)
+_API_SUGGESTIONS = ("检查 API 配置是否正确", "检查网络连接", "稍后重试")
+
+
+class _TestColumns(NamedTuple):
+    """test_results 的列式视图 (一次遍历构建, 分类与反馈共用)"""
+
+    test_ids: List[str]
+    statuses: List[ExecutionStatus]
+    messages: List[str]  # 已 lower(), 无错误信息时为 ""
+    durations: List[int]
+
+
+def _extract_fields(results: Optional[List[TestResult]]) -> _TestColumns:
+    """单次遍历 test_results, 拆成并行的字段列表
+
+    Args:
+        results: 测试结果列表
+
+    Returns:
+        _TestColumns
+    """
+    columns = _TestColumns([], [], [], [])
+    for test in results or []:
+        test_id, status, error_message, duration_ms = _TEST_FIELDS(test)
+        columns.test_ids.append(test_id)
+        columns.statuses.append(status)
+        columns.messages.append((error_message or "").lower())
+        columns.durations.append(duration_ms)
+    return columns
+
 
 class Judge:
     """DeepEval 结果分析器
@@ -42,14 +114,17 @@ class Judge:
                 should_retry=False,
             )
 
+        # 测试结果只遍历一次, 后续分类与反馈复用这些列
+        columns = _extract_fields(execution_result.test_results)
+
         # 2. 分类错误
-        error_type = self._classify_error(execution_result)
+        error_type = self._classify_error(execution_result, columns)
 
         # 3. 确定修复目标
         fix_target = self._determine_fix_target(error_type, execution_result)
 
         # 4. 生成反馈和建议
-        feedback, suggestions = self._generate_feedback(error_type, execution_result)
+        feedback, suggestions = self._generate_feedback(error_type, execution_result, columns)
 
         # 5. 判断是否应该重试
         should_retry = error_type in [ErrorType.TIMEOUT, ErrorType.API]
@@ -62,17 +137,18 @@ class Judge:
             should_retry=should_retry,
         )
 
-    def _classify_error(self, result: ExecutionResult) -> ErrorType:
+    def _classify_error(self, result: ExecutionResult, columns: _TestColumns) -> ErrorType:
         """分类错误类型
 
         Args:
             result: 执行结果
+            columns: test_results 的列式视图
 
         Returns:
             ErrorType
         """
         # 🆕 Phase 6: 先尝试 RAG 错误分类
-        rag_error = self._classify_rag_error(result)
+        rag_error = self._classify_rag_error(columns)
         if rag_error:
             return rag_error
 
@@ -81,43 +157,18 @@ class Judge:
             return ErrorType.TIMEOUT
 
         # 检查错误信息 (使用 stderr 和 test_results)
-        error_msg = (result.stderr or "").lower()
-
-        # 从 test_results 中提取错误信息
-        test_errors = ""
-        if result.test_results:
-            for test in result.test_results:
-                if hasattr(test, "error_message") and test.error_message:
-                    test_errors += test.error_message.lower() + " "
-
-        combined = error_msg + test_errors
-
-        # API 错误
-        if any(
-            keyword in combined
-            for keyword in [
-                "api key",
-                "rate limit",
-                "connection error",
-                "timeout",
-                "network",
-                "http error",
-            ]
-        ):
-            return ErrorType.API
+        test_errors = " ".join(message for message in columns.messages if message)
+        combined = (result.stderr or "") + " " + test_errors
+
+        # API 错误优先于运行时错误: 命中 API 关键词即返回, 否则记录是否出现运行时关键词
+        has_runtime_error = False
+        for match in _ERROR_KEYWORDS_RE.finditer(combined):
+            if match.lastgroup == "api":
+                return ErrorType.API
+            has_runtime_error = True
 
         # 运行时错误
-        if any(
-            keyword in combined
-            for keyword in [
-                "syntaxerror",
-                "importerror",
-                "modulenotfounderror",
-                "nameerror",
-                "attributeerror",
-                "typeerror",
-            ]
-        ):
+        if has_runtime_error:
             return ErrorType.RUNTIME
 
         # DeepEval 特定错误
@@ -127,7 +178,7 @@ class Judge:
         # 默认为逻辑错误
         return ErrorType.LOGIC
 
-    def _classify_rag_error(self, result: ExecutionResult) -> Optional[ErrorType]:
+    def _classify_rag_error(self, columns: _TestColumns) -> Optional[ErrorType]:
         """🆕 Phase 6: 识别 RAG 相关错误
 
         启发式规则:
@@ -136,25 +187,26 @@ class Judge:
         - 如果 "faithfulness" 失败 → RAG_QUALITY
 
         Args:
-            result: 执行结果
+            columns: test_results 的列式视图
 
         Returns:
             RAG 错误类型或 None
         """
         rag_failures = []
 
-        for test in result.test_results:
-            if test.status in [ExecutionStatus.FAIL, ExecutionStatus.FAILED]:
-                error_msg = (test.error_message or "").lower()
+        for status, message in zip(columns.statuses, columns.messages, strict=True):
+            if status in _FAIL_STATUSES:
+                # 一次扫描收集命中的信号, 再按优先级判定
+                signals = {match.lastgroup for match in _RAG_RE.finditer(message)}
 
                 # 检测 RAG 相关失败
-                if "contextual recall" in error_msg or "contextualrecall" in error_msg:
+                if "recall" in signals:
                     rag_failures.append("low_recall")
-                elif "faithfulness" in error_msg:
+                elif "faithfulness" in signals:
                     rag_failures.append("low_faithfulness")
-                elif "empty" in error_msg and "context" in error_msg:
+                elif "empty" in signals and "context" in signals:
                     rag_failures.append("empty_context")
-                elif "retrieval" in error_msg:
+                elif "retrieval" in signals:
                     rag_failures.append("retrieval_issue")
 
         # 如果有 3+ 个 RAG 相关失败
@@ -199,13 +251,14 @@ class Judge:
         return FixTarget.NONE
 
     def _generate_feedback(
-        self, error_type: ErrorType, result: ExecutionResult
-    ) -> tuple[str, List[str]]:
+        self, error_type: ErrorType, result: ExecutionResult, columns: _TestColumns
+    ) -> tuple[str, Sequence[str]]:
         """生成反馈和建议
 
         Args:
             error_type: 错误类型
             result: 执行结果
+            columns: test_results 的列式视图
 
         Returns:
             (feedback, suggestions)
@@ -213,83 +266,72 @@ class Judge:
         if error_type == ErrorType.RUNTIME:
             return self._feedback_runtime(result)
         elif error_type == ErrorType.LOGIC:
-            return self._feedback_logic(result)
+            return self._feedback_logic(columns)
         elif error_type == ErrorType.TIMEOUT:
-            return self._feedback_timeout(result)
+            return self._feedback_timeout(columns)
         elif error_type == ErrorType.API:
             return self._feedback_api(result)
         else:
-            return ("未知错误", [])
+            return ("未知错误", ())
 
-    def _feedback_runtime(self, result: ExecutionResult) -> tuple[str, List[str]]:
+    def _feedback_runtime(self, result: ExecutionResult) -> tuple[str, Sequence[str]]:
         """运行时错误反馈"""
         error_msg = result.stderr or ""
 
         feedback = f"❌ 运行时错误: 代码生成有问题\n\n{error_msg[:500]}"
 
-        suggestions = [
-            "检查生成的 agent.py 是否有语法错误",
-            "检查导入语句是否正确",
-            "检查 requirements.txt 中的依赖是否完整",
-            "建议: 让 Compiler 重新生成代码",
-        ]
+        suggestions = _RUNTIME_SUGGESTIONS
 
         # 具体错误类型的建议
         if "importerror" in error_msg.lower():
-            suggestions.insert(0, "缺少依赖包,检查 requirements.txt")
+            suggestions = ("缺少依赖包,检查 requirements.txt",) + suggestions
         elif "syntaxerror" in error_msg.lower():
-            suggestions.insert(0, "代码有语法错误,检查模板生成逻辑")
+            suggestions = ("代码有语法错误,检查模板生成逻辑",) + suggestions
 
         return feedback, suggestions
 
-    def _feedback_logic(self, result: ExecutionResult) -> tuple[str, List[str]]:
+    def _feedback_logic(self, columns: _TestColumns) -> tuple[str, Sequence[str]]:
         """逻辑错误反馈"""
         # 提取失败的测试
-        failed_tests = [test for test in result.test_results if test.status == ExecutionStatus.FAIL]
+        failed_tests = [
+            i for i, status in enumerate(columns.statuses) if status == ExecutionStatus.FAIL
+        ]
 
         feedback = f"❌ 逻辑错误: {len(failed_tests)} 个测试失败"
 
         suggestions = []
 
         # 分析失败的测试
-        for test in failed_tests[:3]:  # 只分析前3个
-            test_id = test.test_id
-            error = test.error_message or ""
-
-            if "faithfulness" in test_id.lower() or "faithfulness" in error.lower():
+        for i in failed_tests[:3]:  # 只分析前3个
+            test_id = columns.test_ids[i]
+            hints = {
+                match.lastgroup
+                for match in _LOGIC_HINT_RE.finditer(f"{test_id}\n{columns.messages[i]}")
+                if match.lastgroup != "tool" or match.start() < len(test_id)
+            }
+
+            if "faith" in hints:
                 suggestions.append("Faithfulness 失败: LLM 输出与检索文档不一致,检查 RAG 提示词")
-            elif "recall" in test_id.lower() or "recall" in error.lower():
+            elif "recall" in hints:
                 suggestions.append("Recall 失败: 检索到的文档不包含答案,检查检索策略")
-            elif "tool" in test_id.lower():
+            elif "tool" in hints:
                 suggestions.append("工具调用失败: 检查工具选择和调用逻辑")
 
         if not suggestions:
-            suggestions = [
-                "检查 Graph 结构是否合理",
-                "检查节点之间的连接是否正确",
-                "检查条件边的逻辑是否正确",
-                "建议: 让 Graph Designer 重新设计图结构",
-            ]
+            suggestions = _LOGIC_SUGGESTIONS
 
         return feedback, suggestions
 
-    def _feedback_timeout(self, result: ExecutionResult) -> tuple[str, List[str]]:
+    def _feedback_timeout(self, columns: _TestColumns) -> tuple[str, Sequence[str]]:
         """超时反馈"""
         # 计算总执行时间
-        total_duration = sum(test.duration_ms for test in result.test_results) / 1000.0
+        total_duration = sum(columns.durations) / 1000.0
 
         feedback = f"⏱️ 测试执行超时 ({total_duration:.1f}秒)"
 
-        suggestions = [
-            "检查是否有死循环或无限递归",
-            "检查 LLM 调用是否卡住",
-            "考虑增加超时时间",
-            "检查网络连接是否正常",
-        ]
-
-        return feedback, suggestions
+        return feedback, _TIMEOUT_SUGGESTIONS
 
-    def _feedback_api(self, result: ExecutionResult) -> tuple[str, List[str]]:
+    def _feedback_api(self, result: ExecutionResult) -> tuple[str, Sequence[str]]:
         """API 错误反馈"""
         error_msg = result.stderr or ""
 
@@ -305,7 +347,7 @@ class Judge:
             suggestions.append("网络连接问题,检查网络或代理设置")
 
         if not suggestions:
-            suggestions = ["检查 API 配置是否正确", "检查网络连接", "稍后重试"]
+            suggestions = _API_SUGGESTIONS
 
         return feedback, suggestions
 
@@ -4,13 +4,210 @@ This module serves as the system's "brain" for understanding user intent.
 It analyzes natural language requirements and outputs structured project metadata.
 """
 
+import asyncio
+import contextlib
+import copy
 import json
 import re
-from typing import Optional, List, Dict, Any, Tuple
+from collections import deque
+from functools import lru_cache
+from itertools import islice
+from typing import Deque, NamedTuple, Optional, List, Dict, Any, Sequence, Tuple
 from pathlib import Path
 
-from ..schemas import ProjectMeta, TaskType, ExecutionStep
-from ..llm import BuilderClient
+from pydantic import TypeAdapter
+
+from ..schemas import ProjectMeta, TaskType, ExecutionStep, FusedPMOutput
+from ..llm import BuilderClient, LLMCache
+from ..utils.json_utils import JsonObjectScanner, find_json_span
+
+try:
+    import orjson
+
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers handle both alike
+_json_loads = orjson.loads if HAS_ORJSON else json.loads
+
+_PROMPTS_DIR = Path(__file__).parent.parent / "prompts"
+
+
+@lru_cache(maxsize=None)
+def _load_prompt(name: str) -> Optional[str]:
+    """Read a prompt template from the prompts directory once.
+
+    Args:
+        name: Template file name (e.g. "pm_clarifier.txt")
+
+    Returns:
+        Template text, or None if the file does not exist
+    """
+    try:
+        return (_PROMPTS_DIR / name).read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return None
+
+
+# One question per line, with leading numbering like "1. " / "1) " and surrounding
+# whitespace stripped ([^\S\n] is whitespace other than the line break)
+_QUESTION_LINE_RE = re.compile(r"^[^\S\n]*(?:\d+[.)][^\S\n]*)?([^\n]*?)[^\S\n]*$", re.MULTILINE)
+
+# Heuristic fallback scans. Keyword patterns ignore case rather than lowering the
+# whole input first (CJK keywords are unaffected by IGNORECASE).
+_CJK_RE = re.compile(r"[\u4e00-\u9fff]")
+_RAG_KEYWORDS_RE = re.compile(r"文档|document|pdf|知识库|knowledge", re.IGNORECASE)
+_SEARCH_KEYWORDS_RE = re.compile(r"搜索|search", re.IGNORECASE)
+_ANALYSIS_KEYWORDS_RE = re.compile(r"分析|analysis", re.IGNORECASE)
+
+# estimate_complexity keyword buckets, scanned in a single pass. Each alternative sits
+# in a lookahead so matches don't consume text, so a keyword starting inside another
+# (e.g. "document" in "andocument") is still found.
+_COMPLEXITY_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    "multi": ("和", "and", "以及", "还要", "同时"),
+    "iter": ("迭代", "改进", "优化", "improve", "refine", "iterate"),
+    "tool": ("搜索", "search", "计算", "calculate", "分析", "analyze"),
+    "cond": ("如果", "if", "判断", "条件", "condition"),
+    "rag": ("文档", "document", "知识库"),
+}
+# Score added per bucket hit: multiple features, iteration/refinement, multiple tools,
+# complex logic, files/RAG. Long descriptions add _LONG_QUERY_WEIGHT.
+_COMPLEXITY_WEIGHTS: Dict[str, int] = {"multi": 2, "iter": 2, "tool": 1, "cond": 1, "rag": 2}
+_LONG_QUERY_CHARS = 200
+_LONG_QUERY_WEIGHT = 1
+_COMPLEXITY_RE = re.compile(
+    "(?="
+    + "|".join(
+        f"(?P<{bucket}>{'|'.join(map(re.escape, words))})"
+        for bucket, words in _COMPLEXITY_KEYWORDS.items()
+    )
+    + ")",
+    re.IGNORECASE,
+)
+
+# Static instruction blocks come first in each prompt and the per-request data
+# last, so consecutive calls share a byte-identical prefix (provider prompt caching).
+_ANALYSIS_PROMPT_PREFIX = """You are a Product Manager analyzing user requirements for building an AI agent.
+
+Your task is to analyze the user's requirement (given at the end) and output structured metadata in JSON format.
+
+Consider:
+1. What type of task is this? (chat, search, analysis, rag, custom)
+2. Does it need RAG (Retrieval-Augmented Generation)? 
+   - If user provides documents/files, likely needs RAG
+   - If user wants to query knowledge base, needs RAG
+3. What should the agent be named?
+4. Is the requirement clear enough, or do we need clarification?
+
+Output a JSON object with this structure:
+{
+    "agent_name": "descriptive_agent_name",
+    "description": "Clear description of what the agent does",
+    "has_rag": true/false,
+    "task_type": "chat/search/analysis/rag/custom",
+    "language": "zh-CN or en-US",
+    "user_intent_summary": "Summary of user's intent",
+    "file_paths": null,
+    "clarification_needed": true/false,
+    "clarification_questions": ["question1", "question2"] or null
+}
+
+Be concise and accurate. If the requirement is clear, set clarification_needed to false.
+"""
+
+# Everything in the analysis prompt before the user's requirement, built once
+_ANALYSIS_PROMPT_HEAD = _ANALYSIS_PROMPT_PREFIX + "\nUser's requirement:\n"
+
+_CLARIFICATION_PROMPT_PREFIX = """The requirement described by the project metadata below needs clarification.
+Generate 2-3 specific questions to clarify:
+- Exact functionality needed
+- Expected behavior (input/output format)
+- Any specific business rules
+
+IMPORTANT:
+- DO NOT ask about technology stack (we ALREADY use LangGraph + Python).
+- DO NOT ask about underlying LLM (we handle that).
+- Focus on BUSINESS LOGIC and USER EXPERIENCE.
+
+Output only the questions, one per line, numbered.
+"""
+
+_REFINEMENT_PROMPT_PREFIX = """Refine the project metadata below based on the clarification answers.
+Output the complete refined JSON object with the same structure.
+Set clarification_needed to false.
+
+IMPORTANT:
+1. If 'agent_name' is "pending", YOU MUST GENERATE A CREATIVE NAME based on the requirements.
+2. Ensure 'description' and 'user_intent_summary' incorporate the new details from clarification.
+"""
+
+# Appended to the clarifier template (after the analysis prefix) for the single-call flow
+_FUSED_OUTPUT_INSTRUCTIONS = """## Combined Output
+
+In ONE response, first check completeness as described above. If the requirement is
+ready, also perform the requirement analysis described above.
+
+Output a single JSON object with this structure:
+{
+    "is_ready": true/false,
+    "clarification_questions": ["question1", "question2"] or null,
+    "project_meta": { ...metadata object as above... } or null,
+    "execution_plan": [{"step": 1, "role": "Architect", "goal": "...", "expected_output": "..."}] or null
+}
+
+Rules:
+- If is_ready is false: fill clarification_questions, set project_meta and execution_plan to null.
+- If is_ready is true: fill project_meta, set clarification_questions to null.
+- Only fill execution_plan when the task below asks for one.
+"""
+
+
+def _has_validators(model: type) -> bool:
+    """Whether a Pydantic model defines validator hooks that model_construct would skip."""
+    decorators = model.__pydantic_decorators__
+    return bool(
+        decorators.validators
+        or decorators.field_validators
+        or decorators.root_validators
+        or decorators.model_validators
+    )
+
+
+# Data we produced ourselves (saved metadata, internally assembled metadata) skips
+# Pydantic re-validation, unless the schemas ever gain validator hooks.
+_CONSTRUCT_TRUSTED = not (_has_validators(ProjectMeta) or _has_validators(ExecutionStep))
+
+# ExecutionStep factory for internally built plans
+_trusted_step = ExecutionStep.model_construct if _CONSTRUCT_TRUSTED else ExecutionStep
+
+# Validates a whole LLM-produced plan in one pydantic-core call
+_EXECUTION_PLAN_ADAPTER = TypeAdapter(List[ExecutionStep])
+
+# Validates the clarifier's question list (LLM output)
+_QUESTIONS_ADAPTER = TypeAdapter(Optional[List[str]])
+
+
+def _meta_from_trusted(data: Dict[str, Any]) -> ProjectMeta:
+    """Build ProjectMeta from trusted field values without re-validating them.
+
+    LLM responses are untrusted and must keep going through model_validate_json.
+    """
+    if not _CONSTRUCT_TRUSTED:
+        return ProjectMeta.model_validate(data)
+    plan = data.get("execution_plan")
+    if plan is not None:
+        data = {**data, "execution_plan": [ExecutionStep.model_construct(**step) for step in plan]}
+    return ProjectMeta.model_construct(**data)
+
+
+class _AnalysisAttempt(NamedTuple):
+    """Outcome of an analysis request, before it is recorded in history and cache."""
+
+    cache_key: bytes
+    project_meta: Optional[ProjectMeta] = None
+    from_cache: bool = False
+    error: Optional[Exception] = None
 
 
 class PM:
@@ -24,14 +221,44 @@ class PM:
     5. Outputting structured ProjectMeta
     """
 
-    def __init__(self, builder_client: BuilderClient):
+    # Number of most recent conversation entries kept in conversation_history
+    HISTORY_LIMIT = 64
+
+    def __init__(
+        self, builder_client: BuilderClient, speculative: bool = False, stream_json: bool = False
+    ):
         """Initialize PM with a builder client.
 
         Args:
             builder_client: LLM client for requirement analysis
+            speculative: Run the analysis concurrently with the clarifier in
+                analyze_with_clarification_loop (spends an extra LLM call when
+                clarification turns out to be needed, saves a round trip otherwise)
+            stream_json: Stream JSON replies (clarifier / planner) and stop reading
+                as soon as a complete JSON object has arrived
         """
         self.builder = builder_client
-        self.conversation_history: List[Dict[str, str]] = []
+        self.speculative = speculative
+        self.stream_json = stream_json
+        self.conversation_history: Deque[Dict[str, str]] = deque(maxlen=self.HISTORY_LIMIT)
+        # LLM results for repeated requests (analysis / clarification), keyed by _cache_key
+        self.response_cache = LLMCache(maxsize=128)
+
+    def _cache_key(self, kind: str, user_input: str, *extra: Any) -> bytes:
+        """Build a response-cache key for an LLM request.
+
+        Whitespace in the user input is normalized, and the builder model and
+        temperature are part of the key so a reconfigured client never sees
+        stale answers.
+        """
+        config = getattr(self.builder, "config", None)
+        return LLMCache.make_key(
+            kind,
+            " ".join(user_input.split()),
+            getattr(config, "model", None),
+            getattr(config, "temperature", None),
+            *extra,
+        )
 
     async def analyze_requirements(
         self,
@@ -47,14 +274,38 @@ class PM:
         Returns:
             ProjectMeta: Structured project metadata
         """
-        # Add user input to conversation history
-        self.conversation_history.append({"role": "user", "content": user_input})
+        attempt = await self._request_analysis(user_input, file_paths)
+        return await self._record_analysis(user_input, file_paths, attempt)
+
+    async def _request_analysis(
+        self, user_input: str, file_paths: Optional[List[Path]]
+    ) -> _AnalysisAttempt:
+        """Run the analysis LLM call (or cache lookup) without side effects.
+
+        Nothing is written to the conversation history or the response cache
+        until :meth:`_record_analysis` accepts the attempt, so a speculative
+        analysis can be dropped without a trace.
+
+        Args:
+            user_input: User's natural language requirement description
+            file_paths: Optional list of file paths user wants to use
 
+        Returns:
+            _AnalysisAttempt holding the metadata, or the error if the call failed
+        """
         # Build analysis prompt
         prompt = self._build_analysis_prompt(user_input, file_paths)
 
-        # Call LLM with structured output
+        cache_key = self._cache_key(
+            "analyze", user_input, sorted(fp.name for fp in file_paths or [])
+        )
+
+        # Call LLM with structured output (repeated requests are served from cache)
         try:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                return _AnalysisAttempt(cache_key, cached.model_copy(deep=True), from_cache=True)
+
             response = await self.builder.call(prompt=prompt, schema=ProjectMeta)
 
             # Parse response as ProjectMeta
@@ -62,23 +313,50 @@ class PM:
                 project_meta = ProjectMeta.model_validate_json(response)
             else:
                 project_meta = response
+            return _AnalysisAttempt(cache_key, project_meta)
 
-            # Add file paths if provided
-            if file_paths:
-                project_meta.file_paths = [str(p) for p in file_paths]
+        except Exception as e:
+            return _AnalysisAttempt(cache_key, error=e)
 
-            # Add to conversation history
-            self.conversation_history.append(
-                {"role": "assistant", "content": f"Analysis complete: {project_meta.agent_name}"}
-            )
+    async def _record_analysis(
+        self,
+        user_input: str,
+        file_paths: Optional[List[Path]],
+        attempt: _AnalysisAttempt,
+    ) -> ProjectMeta:
+        """Accept an analysis attempt: update history and cache, or fall back.
 
-            return project_meta
+        Args:
+            user_input: User's natural language requirement description
+            file_paths: Optional list of file paths user wants to use
+            attempt: Result of :meth:`_request_analysis` for the same input
 
-        except Exception as e:
+        Returns:
+            ProjectMeta: Structured project metadata
+        """
+        # Add user input to conversation history
+        self.conversation_history.append({"role": "user", "content": user_input})
+
+        if attempt.error is not None:
             # Fallback to basic parsing if structured output fails
-            print(f"Warning: Structured output failed, using fallback: {e}")
+            print(f"Warning: Structured output failed, using fallback: {attempt.error}")
             return await self._fallback_analysis(user_input, file_paths)
 
+        project_meta = attempt.project_meta
+        if not attempt.from_cache:
+            self.response_cache.put(attempt.cache_key, project_meta.model_copy(deep=True))
+
+        # Add file paths if provided
+        if file_paths:
+            project_meta.file_paths = [str(p) for p in file_paths]
+
+        # Add to conversation history
+        self.conversation_history.append(
+            {"role": "assistant", "content": f"Analysis complete: {project_meta.agent_name}"}
+        )
+
+        return project_meta
+
     async def ask_clarification(self, project_meta: ProjectMeta) -> List[str]:
         """Generate clarification questions if requirements are ambiguous.
 
@@ -144,66 +422,38 @@ class PM:
     ) -> str:
         """Build prompt for requirement analysis."""
 
-        file_info = ""
-        if file_paths:
-            file_info = f"\n\nUser has provided {len(file_paths)} file(s):\n"
-            for fp in file_paths:
-                file_info += f"- {fp.name} ({fp.suffix})\n"
+        file_info = self._format_file_info(file_paths)
 
-        prompt = f"""You are a Product Manager analyzing user requirements for building an AI agent.
+        return "".join((_ANALYSIS_PROMPT_HEAD, user_input, "\n", file_info, "\n"))
 
-User's requirement:
-{user_input}
-{file_info}
-
-Your task is to analyze this requirement and output structured metadata in JSON format.
-
-Consider:
-1. What type of task is this? (chat, search, analysis, rag, custom)
-2. Does it need RAG (Retrieval-Augmented Generation)? 
-   - If user provides documents/files, likely needs RAG
-   - If user wants to query knowledge base, needs RAG
-3. What should the agent be named?
-4. Is the requirement clear enough, or do we need clarification?
-
-Output a JSON object with this structure:
-{{
-    "agent_name": "descriptive_agent_name",
-    "description": "Clear description of what the agent does",
-    "has_rag": true/false,
-    "task_type": "chat/search/analysis/rag/custom",
-    "language": "zh-CN or en-US",
-    "user_intent_summary": "Summary of user's intent",
-    "file_paths": null,
-    "clarification_needed": true/false,
-    "clarification_questions": ["question1", "question2"] or null
-}}
+    def _format_file_info(self, file_paths: Optional[List[Path]]) -> str:
+        """Describe uploaded files for a prompt (empty string if none)."""
+        if not file_paths:
+            return ""
+        return f"\n\nUser has provided {len(file_paths)} file(s):\n" + "".join(
+            f"- {fp.name} ({fp.suffix})\n" for fp in file_paths
+        )
 
-Be concise and accurate. If the requirement is clear, set clarification_needed to false.
-"""
-        return prompt
+    def _format_history(self, chat_history: Optional[Sequence[Dict]]) -> str:
+        """Render the last 3 conversation messages for a prompt (empty string if none)."""
+        if not chat_history:
+            return ""
+        # reversed() also works on a deque, which can't be sliced
+        recent = reversed(list(islice(reversed(chat_history), 3)))
+        return "\n\nConversation History:\n" + "".join(
+            f"{msg.get('role', 'unknown')}: {msg.get('content', '')}\n" for msg in recent
+        )
 
     def _build_clarification_prompt(self, project_meta: ProjectMeta) -> str:
         """Build prompt for generating clarification questions."""
 
-        prompt = f"""Based on this project metadata:
+        prompt = f"""{_CLARIFICATION_PROMPT_PREFIX}
+Project metadata:
 
 Agent Name: {project_meta.agent_name}
 Description: {project_meta.description}
 Task Type: {project_meta.task_type}
 Has RAG: {project_meta.has_rag}
-
-The requirement needs clarification. Generate 2-3 specific questions to clarify:
-- Exact functionality needed
-- Expected behavior (input/output format)
-- Any specific business rules
-
-IMPORTANT:
-- DO NOT ask about technology stack (we ALREADY use LangGraph + Python).
-- DO NOT ask about underlying LLM (we handle that).
-- Focus on BUSINESS LOGIC and USER EXPERIENCE.
-
-Output only the questions, one per line, numbered.
 """
         return prompt
 
@@ -214,40 +464,18 @@ Output only the questions, one per line, numbered.
 
         answers_text = "\n".join([f"Q: {q}\nA: {a}" for q, a in clarification_answers.items()])
 
-        prompt = f"""Original project metadata:
+        prompt = f"""{_REFINEMENT_PROMPT_PREFIX}
+Original project metadata:
 {project_meta.model_dump_json(indent=2)}
 
 Clarification Q&A:
 {answers_text}
-
-Based on the clarification answers, refine the project metadata.
-Output the complete refined JSON object with the same structure.
-Set clarification_needed to false.
-
-IMPORTANT:
-1. If 'agent_name' is "pending", YOU MUST GENERATE A CREATIVE NAME based on the requirements.
-2. Ensure 'description' and 'user_intent_summary' incorporate the new details from clarification.
 """
         return prompt
 
     def _parse_questions(self, response: str) -> List[str]:
         """Parse questions from LLM response."""
-        lines = response.strip().split("\n")
-        questions = []
-
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-
-            # Remove numbering like "1. ", "1) ", etc.
-            import re
-
-            cleaned = re.sub(r"^\d+[\.\)]\s*", "", line)
-            if cleaned:
-                questions.append(cleaned)
-
-        return questions
+        return [question for question in _QUESTION_LINE_RE.findall(response) if question]
 
     async def _fallback_analysis(
         self, user_input: str, file_paths: Optional[List[Path]] = None
@@ -255,23 +483,20 @@ IMPORTANT:
         """Fallback analysis if structured output fails."""
 
         # Simple heuristic-based analysis
-        has_rag = bool(file_paths) or any(
-            keyword in user_input.lower()
-            for keyword in ["文档", "document", "pdf", "知识库", "knowledge"]
-        )
+        has_rag = bool(file_paths) or _RAG_KEYWORDS_RE.search(user_input) is not None
 
         # Determine task type
         if has_rag:
             task_type = TaskType.RAG
-        elif any(keyword in user_input.lower() for keyword in ["搜索", "search"]):
+        elif _SEARCH_KEYWORDS_RE.search(user_input):
             task_type = TaskType.SEARCH
-        elif any(keyword in user_input.lower() for keyword in ["分析", "analysis"]):
+        elif _ANALYSIS_KEYWORDS_RE.search(user_input):
             task_type = TaskType.ANALYSIS
         else:
             task_type = TaskType.CHAT
 
         # Detect language
-        has_chinese = any("\u4e00" <= char <= "\u9fff" for char in user_input)
+        has_chinese = _CJK_RE.search(user_input) is not None
         language = "zh-CN" if has_chinese else "en-US"
 
         return ProjectMeta(
@@ -306,13 +531,33 @@ IMPORTANT:
         Returns:
             ProjectMeta object
         """
-        with open(input_path, "r", encoding="utf-8") as f:
-            return ProjectMeta.model_validate_json(f.read())
+        with open(input_path, "rb") as f:
+            return _meta_from_trusted(_json_loads(f.read()))
+
+    async def save_project_meta_async(self, project_meta: ProjectMeta, output_path: Path) -> None:
+        """Save project metadata without blocking the event loop.
+
+        Args:
+            project_meta: Project metadata to save
+            output_path: Path to save JSON file
+        """
+        await asyncio.to_thread(self.save_project_meta, project_meta, output_path)
+
+    async def load_project_meta_async(self, input_path: Path) -> ProjectMeta:
+        """Load project metadata without blocking the event loop.
+
+        Args:
+            input_path: Path to JSON file
+
+        Returns:
+            ProjectMeta object
+        """
+        return await asyncio.to_thread(self.load_project_meta, input_path)
 
     # ==================== PM Dual-Brain Mode Methods ====================
 
     async def clarify_requirements(
-        self, user_query: str, chat_history: Optional[List[Dict]] = None
+        self, user_query: str, chat_history: Optional[Sequence[Dict]] = None
     ) -> Tuple[bool, Optional[List[str]]]:
         """PM Clarifier: Check requirement completeness.
 
@@ -326,36 +571,32 @@ IMPORTANT:
             - clarification_questions: List of questions if not ready
         """
         # Load clarifier prompt
-        prompt_path = Path(__file__).parent.parent / "prompts" / "pm_clarifier.txt"
-
-        try:
-            with open(prompt_path, "r", encoding="utf-8") as f:
-                clarifier_prompt_template = f.read()
-        except FileNotFoundError:
+        clarifier_prompt_template = _load_prompt("pm_clarifier.txt")
+        if clarifier_prompt_template is None:
             # Fallback to inline prompt
             clarifier_prompt_template = self._get_default_clarifier_prompt()
 
         # Build context
-        history_text = ""
-        if chat_history:
-            history_text = "\n\nConversation History:\n"
-            for msg in chat_history[-3:]:  # Last 3 messages
-                role = msg.get("role", "unknown")
-                content = msg.get("content", "")
-                history_text += f"{role}: {content}\n"
+        history_text = self._format_history(chat_history)
 
         prompt = f'{clarifier_prompt_template}\n\n## Current Task\n\nUser Query: {user_query}{history_text}\n\nAnalyze the completeness and output JSON with: {{"is_ready": bool, "completeness_score": int, "clarification_questions": [...]}}'
 
-        try:
-            response = await self.builder.call(prompt=prompt)
+        cache_key = self._cache_key("clarify", user_query, history_text)
+        cached = self.response_cache.get(cache_key)
+        if cached is not None:
+            return copy.deepcopy(cached)
 
-            # Parse JSON response
-            result = self._extract_json(response)
+        try:
+            result = await self._call_json(prompt)
 
             is_ready = result.get("is_ready", False)
-            questions = result.get("clarification_questions", [])
+            questions = _QUESTIONS_ADAPTER.validate_python(
+                result.get("clarification_questions", [])
+            )
 
-            return (is_ready, questions if not is_ready else None)
+            outcome = (is_ready, questions if not is_ready else None)
+            self.response_cache.put(cache_key, copy.deepcopy(outcome))
+            return outcome
 
         except Exception as e:
             print(f"Warning: Clarifier failed, using heuristic: {e}")
@@ -372,34 +613,19 @@ IMPORTANT:
             List of ExecutionStep objects
         """
         # Load planner prompt
-        prompt_path = Path(__file__).parent.parent / "prompts" / "pm_planner.txt"
-
-        try:
-            with open(prompt_path, "r", encoding="utf-8") as f:
-                planner_prompt_template = f.read()
-        except FileNotFoundError:
+        planner_prompt_template = _load_prompt("pm_planner.txt")
+        if planner_prompt_template is None:
             planner_prompt_template = self._get_default_planner_prompt()
 
         prompt = f'{planner_prompt_template}\n\n## Task to Plan\n\nAgent Name: {project_meta.agent_name}\nDescription: {project_meta.description}\nTask Type: {project_meta.task_type}\nHas RAG: {project_meta.has_rag}\nUser Intent: {project_meta.user_intent_summary}\n\nGenerate execution plan as JSON: {{"complexity_score": int, "execution_plan": [...]}}'
 
         try:
-            response = await self.builder.call(prompt=prompt)
-
-            # Parse JSON response
-            result = self._extract_json(response)
+            result = await self._call_json(prompt)
 
             plan_data = result.get("execution_plan", [])
 
             # Convert to ExecutionStep objects
-            execution_plan = [
-                ExecutionStep(
-                    step=item["step"],
-                    role=item["role"],
-                    goal=item["goal"],
-                    expected_output=item.get("expected_output"),
-                )
-                for item in plan_data
-            ]
+            execution_plan = _EXECUTION_PLAN_ADAPTER.validate_python(plan_data)
 
             return execution_plan
 
@@ -408,7 +634,7 @@ IMPORTANT:
             # Fallback: simple plan
             return self._heuristic_plan(project_meta)
 
-    async def estimate_complexity(self, user_query: str, has_files: bool = False) -> int:
+    def estimate_complexity(self, user_query: str, has_files: bool = False) -> int:
         """Estimate task complexity (1-10).
 
         Args:
@@ -418,47 +644,21 @@ IMPORTANT:
         Returns:
             Complexity score (1-10)
         """
-        # Simple heuristic-based estimation
-        score = 1
-
-        # Check for complexity indicators
-        query_lower = user_query.lower()
-
-        # Multiple functions/features
-        if any(word in query_lower for word in ["和", "and", "以及", "还要", "同时"]):
-            score += 2
-
-        # Iteration/refinement
-        if any(
-            word in query_lower for word in ["迭代", "改进", "优化", "improve", "refine", "iterate"]
-        ):
-            score += 2
-
-        # Multiple tools
-        if any(
-            word in query_lower
-            for word in ["搜索", "search", "计算", "calculate", "分析", "analyze"]
-        ):
-            score += 1
+        # Simple heuristic-based estimation: one scan collects every keyword bucket hit
+        buckets = {match.lastgroup for match in _COMPLEXITY_RE.finditer(user_query)}
+        if has_files:
+            buckets.add("rag")  # Uploaded files count once, like a document mention
 
-        # Complex logic
-        if any(word in query_lower for word in ["如果", "if", "判断", "条件", "condition"]):
-            score += 1
-
-        # Files/RAG
-        if has_files or any(word in query_lower for word in ["文档", "document", "知识库"]):
-            score += 2
-
-        # Long description
-        if len(user_query) > 200:
-            score += 1
+        score = 1 + sum(_COMPLEXITY_WEIGHTS[bucket] for bucket in buckets)
+        if len(user_query) > _LONG_QUERY_CHARS:
+            score += _LONG_QUERY_WEIGHT
 
         return min(score, 10)  # Cap at 10
 
     async def analyze_with_clarification_loop(
         self,
         user_query: str,
-        chat_history: Optional[List[Dict]] = None,
+        chat_history: Optional[Sequence[Dict]] = None,
         file_paths: Optional[List[Path]] = None,
     ) -> ProjectMeta:
         """Complete dual-brain mode analysis.
@@ -473,8 +673,17 @@ IMPORTANT:
         Returns:
             ProjectMeta with status="ready" or "clarifying"
         """
-        # Step 1: Clarifier checks completeness
-        is_ready, questions = await self.clarify_requirements(user_query, chat_history)
+        # Step 1: Clarifier checks completeness. The analysis only needs the query, so in
+        # speculative mode it runs alongside and is discarded (leaving no history or cache
+        # entries) if clarification is needed.
+        speculation: Optional[_AnalysisAttempt] = None
+        if self.speculative:
+            (is_ready, questions), speculation = await asyncio.gather(
+                self.clarify_requirements(user_query, chat_history),
+                self._request_analysis(user_query, file_paths),
+            )
+        else:
+            is_ready, questions = await self.clarify_requirements(user_query, chat_history)
 
         if not is_ready:
             # Need clarification
@@ -490,10 +699,13 @@ IMPORTANT:
             )
 
         # Step 2: Requirements are clear, proceed with analysis
-        project_meta = await self.analyze_requirements(user_query, file_paths)
+        if speculation is not None:
+            project_meta = await self._record_analysis(user_query, file_paths, speculation)
+        else:
+            project_meta = await self.analyze_requirements(user_query, file_paths)
 
         # Step 3: Estimate complexity
-        complexity = await self.estimate_complexity(user_query, bool(file_paths))
+        complexity = self.estimate_complexity(user_query, bool(file_paths))
         project_meta.complexity_score = complexity
 
         # Step 4: Generate execution plan if complex enough
@@ -506,6 +718,104 @@ IMPORTANT:
 
         return project_meta
 
+    async def analyze_fused(
+        self,
+        user_query: str,
+        chat_history: Optional[Sequence[Dict]] = None,
+        file_paths: Optional[List[Path]] = None,
+    ) -> ProjectMeta:
+        """Single-call variant of analyze_with_clarification_loop.
+
+        Clarification, analysis and (for complex tasks) planning are requested in
+        one LLM call returning FusedPMOutput, instead of up to three round trips.
+        Falls back to analyze_with_clarification_loop if the fused call fails.
+
+        Args:
+            user_query: User's requirement
+            chat_history: Conversation history
+            file_paths: Optional file paths
+
+        Returns:
+            ProjectMeta with status="ready" or "clarifying"
+        """
+        # Complexity is a local heuristic, so it decides up front whether a plan is needed
+        complexity = self.estimate_complexity(user_query, bool(file_paths))
+        prompt = self._build_fused_prompt(user_query, file_paths, chat_history, complexity >= 4)
+
+        try:
+            response = await self.builder.call(prompt=prompt, schema=FusedPMOutput)
+            if isinstance(response, str):
+                fused = FusedPMOutput.model_validate_json(response)
+            else:
+                fused = response
+            if fused.is_ready and fused.project_meta is None:
+                raise ValueError("is_ready without project_meta")
+        except Exception as e:
+            print(f"Warning: Fused PM call failed, using separate calls: {e}")
+            return await self.analyze_with_clarification_loop(user_query, chat_history, file_paths)
+
+        if not fused.is_ready:
+            return ProjectMeta(
+                agent_name="pending",
+                description=user_query[:200],
+                user_intent_summary=user_query[:100],
+                status="clarifying",
+                clarification_needed=True,
+                clarification_questions=fused.clarification_questions,
+                has_rag=bool(file_paths),
+                file_paths=[str(p) for p in file_paths] if file_paths else None,
+            )
+
+        project_meta = fused.project_meta
+        self.conversation_history.append({"role": "user", "content": user_query})
+        self.conversation_history.append(
+            {"role": "assistant", "content": f"Analysis complete: {project_meta.agent_name}"}
+        )
+
+        if file_paths:
+            project_meta.file_paths = [str(p) for p in file_paths]
+        project_meta.complexity_score = complexity
+
+        # A plan the model left out is generated separately
+        if complexity >= 4:
+            project_meta.execution_plan = fused.execution_plan or (
+                await self.create_execution_plan(project_meta)
+            )
+
+        project_meta.status = "ready"
+
+        return project_meta
+
+    def _build_fused_prompt(
+        self,
+        user_query: str,
+        file_paths: Optional[List[Path]],
+        chat_history: Optional[Sequence[Dict]],
+        need_plan: bool,
+    ) -> str:
+        """Build the single-call prompt (static instructions first, request data last)."""
+        clarifier_prompt_template = _load_prompt("pm_clarifier.txt")
+        if clarifier_prompt_template is None:
+            clarifier_prompt_template = self._get_default_clarifier_prompt()
+
+        plan_request = (
+            "Also output execution_plan: a hierarchical task breakdown with roles "
+            "(Architect/Coder/Tester/etc) and goals."
+            if need_plan
+            else "Set execution_plan to null."
+        )
+
+        return f"""{clarifier_prompt_template}
+
+{_ANALYSIS_PROMPT_PREFIX}
+{_FUSED_OUTPUT_INSTRUCTIONS}
+## Current Task
+
+User Query: {user_query}{self._format_file_info(file_paths)}{self._format_history(chat_history)}
+
+{plan_request}
+"""
+
     async def analyze_with_inference(
         self, user_input: str, file_paths: Optional[List[Path]] = None
     ) -> ProjectMeta:
@@ -615,19 +925,40 @@ IMPORTANT:
 
     # ==================== Helper Methods ====================
 
+    async def _call_json(self, prompt: str) -> Dict[str, Any]:
+        """Call the LLM for a JSON object reply and parse it.
+
+        With stream_json the reply is scanned incrementally as it streams in, and
+        the request is closed once a complete object parses, so trailing
+        commentary is neither waited for nor scanned.
+        """
+        if not self.stream_json:
+            return self._extract_json(await self.builder.call(prompt=prompt))
+
+        chunks: List[str] = []
+        scanner = JsonObjectScanner()
+        async with contextlib.aclosing(self.builder.stream(prompt)) as stream:
+            async for chunk in stream:
+                chunks.append(chunk)
+                for candidate in scanner.feed(chunk):
+                    try:
+                        return _json_loads(candidate)
+                    except ValueError:
+                        pass  # Braces in prose, keep scanning
+
+        return self._extract_json("".join(chunks))
+
     def _extract_json(self, text: str) -> Dict[str, Any]:
         """Extract JSON from LLM response."""
-        # Try to find JSON block
-        json_match = re.search(r"```json\s*({.*?})\s*```", text, re.DOTALL)
-        if json_match:
-            return json.loads(json_match.group(1))
-
-        # Try to find raw JSON
-        json_match = re.search(r"{.*}", text, re.DOTALL)
-        if json_match:
-            return json.loads(json_match.group(0))
+        # Prefer the first balanced object inside a ```json block, else anywhere in the text
+        fence = text.find("```json")
+        span = find_json_span(text, fence + len("```json")) if fence != -1 else None
+        if span is None:
+            span = find_json_span(text)
+        if span is None:
+            raise ValueError("No JSON found in response")
 
-        raise ValueError("No JSON found in response")
+        return _json_loads(text[span[0] : span[1]])
 
     def _heuristic_clarify(self, user_query: str) -> Tuple[bool, Optional[List[str]]]:
         """Heuristic-based clarification check."""
@@ -651,12 +982,12 @@ IMPORTANT:
 
         if project_meta.has_rag:
             plan.append(
-                ExecutionStep(
+                _trusted_step(
                     step=1, role="Architect", goal="设计RAG系统架构", expected_output="RAG流程图"
                 )
             )
             plan.append(
-                ExecutionStep(
+                _trusted_step(
                     step=2,
                     role="Coder",
                     goal="实现文档加载和检索逻辑",
@@ -665,13 +996,13 @@ IMPORTANT:
             )
         else:
             plan.append(
-                ExecutionStep(
+                _trusted_step(
                     step=1, role="Coder", goal="实现Agent核心功能", expected_output="可执行代码"
                 )
             )
 
         plan.append(
-            ExecutionStep(
+            _trusted_step(
                 step=len(plan) + 1, role="Tester", goal="测试功能正确性", expected_output="测试报告"
             )
         )
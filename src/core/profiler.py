@@ -4,27 +4,81 @@ This module analyzes uploaded files and generates DataProfile metadata.
 """
 
 import hashlib
+import json
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
 from datetime import datetime
 
 from ..schemas import DataProfile, FileInfo
 
+try:
+    import blake3
+
+    HAS_BLAKE3 = True
+except ImportError:
+    HAS_BLAKE3 = False
+
+# Read size when hashing without blake3 (large reads keep syscall counts low on big files)
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Plain-text formats: their text is the file bytes, so one read serves hashing and analysis
+TEXT_EXTENSIONS = frozenset({".txt", ".md", ".py", ".js", ".json", ".yaml", ".yml"})
+
+# On-disk per-file result cache, created inside Profiler(cache_dir=...)
+CACHE_FILENAME = "profiler_cache.db"
+
+
+def _new_hasher() -> Tuple[str, Any]:
+    """Return (prefix, hasher) for the content hash algorithm in use."""
+    if HAS_BLAKE3:
+        return "b3:", blake3.blake3(max_threads=blake3.blake3.AUTO)
+    return "b2:", hashlib.blake2b(digest_size=32)
+
+
+class _FileProfile(NamedTuple):
+    """Per-file analysis result, aggregated by Profiler.analyze."""
+
+    file_info: FileInfo
+    text_length: int
+    language: Optional[str]
+    has_tables: bool
+    warnings: List[str]
+
+
+class _CacheKey(NamedTuple):
+    """A file's identity and state; a cached row is valid while mtime and size match."""
+
+    path: str
+    mtime_ns: int
+    size: int
+
 
 class Profiler:
     """Profiler analyzes files and generates data profiles.
 
     The Profiler is responsible for:
     1. File type detection
-    2. MD5 hash calculation (for incremental updates)
+    2. Content hash calculation (for incremental updates)
     3. Text density analysis
     4. Table detection
     5. Token count estimation
     """
 
-    def __init__(self):
-        """Initialize Profiler."""
-        pass
+    def __init__(self, max_workers: Optional[int] = None, cache_dir: Optional[Path] = None):
+        """Initialize Profiler.
+
+        Args:
+            max_workers: Threads used to profile files concurrently
+                (default: min(32, 4 x CPU count); the work is mostly file I/O)
+            cache_dir: Directory for a SQLite cache holding one result per resolved
+                path, valid while the file's mtime and size are unchanged; unchanged
+                files are then not re-read. Caching is disabled when omitted.
+        """
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) * 4)
+        self.cache_dir = cache_dir
 
     def analyze(self, file_paths: List[Path]) -> DataProfile:
         """Analyze files and return a DataProfile.
@@ -44,32 +98,61 @@ class Profiler:
         has_tables = False
         languages = set()
 
-        for file_path in file_paths:
-            if not file_path.exists():
+        results: List[Optional[_FileProfile]] = [None] * len(file_paths)
+        keys: List[Optional[_CacheKey]] = [None] * len(file_paths)
+        conn = self._open_cache()
+
+        try:
+            # Unchanged files (same path, mtime and size) are served from the cache
+            if conn is not None:
+                keys = [self._cache_key(file_path) for file_path in file_paths]
+                cached = self._cache_lookup(conn, [key for key in keys if key is not None])
+                for i, key in enumerate(keys):
+                    if key is not None and key in cached:
+                        results[i] = self._decode_cached(cached[key], file_paths[i])
+
+            # Files are independent and I/O bound, so profile them concurrently;
+            # results (and their warnings) are aggregated in input order
+            pending = [i for i, result in enumerate(results) if result is None]
+            if pending:
+                with ThreadPoolExecutor(
+                    max_workers=min(self.max_workers, len(pending))
+                ) as executor:
+                    profiled = executor.map(self._profile_one, [file_paths[i] for i in pending])
+                    for i, result in zip(pending, profiled, strict=True):
+                        results[i] = result
+
+            # Store new results in one transaction (failed extractions are retried next run)
+            if conn is not None:
+                # Keyed by path, so an edited file replaces its previous row
+                rows = [
+                    (*keys[i], self._encode_cached(results[i]))
+                    for i in pending
+                    if keys[i] is not None and results[i] is not None and not results[i].warnings
+                ]
+                with conn:
+                    conn.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)", rows)
+        finally:
+            if conn is not None:
+                conn.close()
+
+        for file_path, result in zip(file_paths, results, strict=True):
+            if result is None:
                 print(f"Warning: File not found: {file_path}")
                 continue
 
-            # Analyze individual file
-            file_info = self._analyze_file(file_path)
-            files_info.append(file_info)
-            total_size += file_info.size_bytes
-
-            # Accumulate text for density calculation
-            try:
-                text_content = self._extract_text(file_path)
-                total_text_length += len(text_content)
-
-                # Detect language
-                lang = self._detect_language(text_content)
-                if lang:
-                    languages.add(lang)
+            for warning in result.warnings:
+                print(warning)
 
-                # Check for tables (simple heuristic)
-                if self._has_tables(text_content, file_path):
-                    has_tables = True
+            files_info.append(result.file_info)
+            total_size += result.file_info.size_bytes
 
-            except Exception as e:
-                print(f"Warning: Could not extract text from {file_path}: {e}")
+            # Accumulate text for density calculation
+            total_text_length += result.text_length
+            if result.language:
+                languages.add(result.language)
+            if result.has_tables:
+                has_tables = True
 
         # Calculate text density (simplified)
         # Text density = ratio of text content to total file size
@@ -88,17 +171,133 @@ class Profiler:
             analysis_timestamp=datetime.now().isoformat(),
         )
 
-    def _analyze_file(self, file_path: Path) -> FileInfo:
+    def _open_cache(self) -> Optional[sqlite3.Connection]:
+        """Open the per-file result cache, or return None if caching is disabled."""
+        if self.cache_dir is None:
+            return None
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.cache_dir / CACHE_FILENAME)
+        with conn:
+            conn.execute("DROP TABLE IF EXISTS cache")  # Earlier layout, one row per file version
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS files "
+                "(path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, value BLOB)"
+            )
+        return conn
+
+    def _cache_key(self, file_path: Path) -> Optional[_CacheKey]:
+        """Cache key for a file's current state, or None if it cannot be stat'ed."""
+        try:
+            stat = file_path.stat()
+        except OSError:
+            return None
+        return _CacheKey(str(file_path.resolve()), stat.st_mtime_ns, stat.st_size)
+
+    def _cache_lookup(
+        self, conn: sqlite3.Connection, keys: List[_CacheKey]
+    ) -> Dict[_CacheKey, bytes]:
+        """Fetch cached values still valid for the given keys (others are omitted)."""
+        found: Dict[_CacheKey, bytes] = {}
+        paths = [key.path for key in keys]
+        # Stay well below SQLite's bound-parameter limit
+        for start in range(0, len(paths), 500):
+            batch = paths[start : start + 500]
+            placeholders = ",".join("?" * len(batch))
+            rows = conn.execute(
+                f"SELECT path, mtime_ns, size, value FROM files WHERE path IN ({placeholders})",
+                batch,
+            )
+            for path, mtime_ns, size, value in rows:
+                found[_CacheKey(path, mtime_ns, size)] = value
+        return found
+
+    def _encode_cached(self, result: _FileProfile) -> bytes:
+        """Serialize a per-file result for the cache."""
+        return json.dumps(
+            {
+                "file_info": result.file_info.model_dump(mode="json"),
+                "text_length": result.text_length,
+                "language": result.language,
+                "has_tables": result.has_tables,
+            }
+        ).encode("utf-8")
+
+    def _decode_cached(self, value: bytes, file_path: Path) -> _FileProfile:
+        """Rebuild a per-file result from the cache, reported under the path as given."""
+        data = json.loads(value)
+        file_info = FileInfo.model_validate({**data["file_info"], "path": str(file_path)})
+        return _FileProfile(
+            file_info, data["text_length"], data["language"], data["has_tables"], []
+        )
+
+    def _profile_one(self, file_path: Path) -> Optional[_FileProfile]:
+        """Hash and extract one file (runs in a worker thread).
+
+        Args:
+            file_path: Path to file
+
+        Returns:
+            Per-file profile, or None if the file does not exist
+        """
+        if not file_path.exists():
+            return None
+
+        # Analyze individual file (text formats are hashed and decoded from one read)
+        file_hash, text_content = self._read_once(file_path)
+        file_info = self._analyze_file(file_path, file_hash)
+
+        try:
+            if text_content is None:
+                text_content = self._extract_text(file_path)
+            return _FileProfile(
+                file_info=file_info,
+                text_length=len(text_content),
+                # Detect language
+                language=self._detect_language(text_content),
+                # Check for tables (simple heuristic)
+                has_tables=self._has_tables(text_content, file_path),
+                warnings=[],
+            )
+        except Exception as e:
+            warning = f"Warning: Could not extract text from {file_path}: {e}"
+            return _FileProfile(file_info, 0, None, False, [warning])
+
+    def _read_once(self, file_path: Path) -> Tuple[str, Optional[str]]:
+        """Hash a file and, for plain-text formats, decode its text from the same read.
+
+        Args:
+            file_path: Path to file
+
+        Returns:
+            Tuple of (content hash, text or None for formats needing extraction)
+        """
+        if file_path.suffix.lower() not in TEXT_EXTENSIONS:
+            return self._calculate_hash(file_path), None
+
+        with open(file_path, "rb") as f:
+            data = f.read()
+
+        prefix, hasher = _new_hasher()
+        hasher.update(data)
+
+        # Same result as reading in text mode (universal newlines, undecodable bytes dropped)
+        text = data.decode("utf-8", errors="ignore").replace("\r\n", "\n").replace("\r", "\n")
+        return prefix + hasher.hexdigest(), text
+
+    def _analyze_file(self, file_path: Path, file_hash: Optional[str] = None) -> FileInfo:
         """Analyze a single file.
 
         Args:
             file_path: Path to file
+            file_hash: Precomputed content hash (calculated here if omitted)
 
         Returns:
             FileInfo with file metadata
         """
-        # Calculate MD5 hash
-        file_hash = self._calculate_hash(file_path)
+        # Calculate content hash
+        if file_hash is None:
+            file_hash = self._calculate_hash(file_path)
 
         # Get file type from extension
         file_type = file_path.suffix.lstrip(".").lower() or "unknown"
@@ -114,22 +313,29 @@ class Profiler:
         )
 
     def _calculate_hash(self, file_path: Path) -> str:
-        """Calculate MD5 hash of file.
+        """Calculate the content hash of a file.
+
+        Uses BLAKE3 (SIMD, multithreaded, memory-mapped) when available and
+        falls back to BLAKE2b. The algorithm is recorded as a prefix so hashes
+        from different algorithms never compare equal by accident.
 
         Args:
             file_path: Path to file
 
         Returns:
-            MD5 hash as hex string
+            Hex digest prefixed with "b3:" (BLAKE3) or "b2:" (BLAKE2b)
         """
-        md5_hash = hashlib.md5()
+        prefix, hasher = _new_hasher()
 
-        with open(file_path, "rb") as f:
-            # Read in chunks to handle large files
-            for chunk in iter(lambda: f.read(4096), b""):
-                md5_hash.update(chunk)
+        if HAS_BLAKE3:
+            hasher.update_mmap(str(file_path))
+        else:
+            with open(file_path, "rb") as f:
+                # Read in chunks to handle large files
+                for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                    hasher.update(chunk)
 
-        return md5_hash.hexdigest()
+        return prefix + hasher.hexdigest()
 
     def _extract_text(self, file_path: Path) -> str:
         """Extract text content from file.
@@ -143,7 +349,7 @@ class Profiler:
         file_type = file_path.suffix.lower()
 
         # Handle different file types
-        if file_type in [".txt", ".md", ".py", ".js", ".json", ".yaml", ".yml"]:
+        if file_type in TEXT_EXTENSIONS:
             # Plain text files
             with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
                 return f.read()
@@ -2,6 +2,7 @@
 
 from .builder_client import BuilderClient, BuilderAPIConfig
 from .runtime_client import RuntimeClient, RuntimeAPIConfig
+from .llm_cache import LLMCache
 from .health_check import (
     HealthStatus,
     HealthCheckResult,
@@ -15,6 +16,7 @@ __all__ = [
     "BuilderAPIConfig",
     "RuntimeClient",
     "RuntimeAPIConfig",
+    "LLMCache",
     "HealthStatus",
     "HealthCheckResult",
     "check_builder_api",
@@ -1,6 +1,7 @@
 """Builder API client for construction-time LLM calls."""
 
-from typing import Optional, Type, Any, TypeVar
+from functools import lru_cache
+from typing import AsyncIterator, Optional, Type, Any, TypeVar
 from pydantic import BaseModel, Field
 import httpx
 import os
@@ -21,11 +22,19 @@ try:
 except ImportError:
     HAS_ANTHROPIC = False
 
+from langchain_core.messages.ai import add_ai_message_chunks
+
 from src.utils.json_utils import extract_json_from_text
 
 T = TypeVar("T", bound=BaseModel)
 
 
+@lru_cache(maxsize=None)
+def _schema_json(response_model: Type[BaseModel]) -> str:
+    """Render a model's JSON Schema once per class (used by the prompt fallback)."""
+    return json.dumps(response_model.model_json_schema(), indent=2, ensure_ascii=False)
+
+
 class BuilderAPIConfig(BaseModel):
     """Configuration for Builder API."""
 
@@ -122,6 +131,29 @@ class BuilderClient:
             self._update_token_stats(response)
             return response.content
 
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        """Stream a plain-text response as it is generated.
+
+        Closing the generator early (e.g. once the caller has what it needs)
+        ends the request.
+
+        Args:
+            prompt: Input prompt
+
+        Yields:
+            Response text chunks
+        """
+        chunks = []
+        try:
+            async for chunk in self.client.astream(prompt):
+                chunks.append(chunk)
+                if chunk.content:
+                    yield chunk.content
+        finally:
+            # 🆕 Phase 5: 统计 Token (chunks merged once, not per chunk)
+            if chunks:
+                self._update_token_stats(add_ai_message_chunks(chunks[0], *chunks[1:]))
+
     async def generate_structured(
         self, prompt: str, response_model: Type[T], temperature: Optional[float] = None
     ) -> T:
@@ -139,10 +171,6 @@ class BuilderClient:
         """
         temp = temperature if temperature is not None else self.config.temperature
 
-        # 获取 Pydantic 的 Schema
-        schema = response_model.model_json_schema()
-        schema_str = json.dumps(schema, indent=2, ensure_ascii=False)
-
         # -------------------------------------------------------
         # 尝试 1: 原生支持模式 (LangChain with_structured_output)
         # -------------------------------------------------------
@@ -171,8 +199,9 @@ class BuilderClient:
                 ]
             ):
                 print(f"⚠️  API 不支持原生 JSON 模式，切换到 Prompt 增强模式...")
+                # Schema 字符串按模型类缓存, 仅在回退时生成
                 return await self._generate_structured_fallback(
-                    prompt, response_model, schema_str, temp
+                    prompt, response_model, _schema_json(response_model), temp
                 )
             else:
                 # 其他错误（如余额不足）直接抛出
@@ -0,0 +1,32 @@
+"""In-memory cache for repeated construction-time LLM results."""
+
+import hashlib
+import json
+from typing import Any
+
+from ..utils.lru_cache import LRUCache
+
+
+class LLMCache(LRUCache):
+    """Exact-match LRU cache for LLM results.
+
+    Keys are content digests built with :meth:`make_key`, so identical inputs
+    (same tool, schema, args and errors; same graph and feedback) map to the
+    same entry and skip the LLM round trip.
+    """
+
+    @staticmethod
+    def make_key(*parts: Any) -> bytes:
+        """Build a cache key from JSON-serializable parts.
+
+        Args:
+            *parts: Values identifying the request (dict keys are sorted)
+
+        Returns:
+            16-byte blake2b digest
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        for part in parts:
+            digest.update(json.dumps(part, sort_keys=True, default=str).encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.digest()
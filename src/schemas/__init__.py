@@ -1,6 +1,6 @@
 """Schema definitions for IteraAgent."""
 
-from .project_meta import ProjectMeta, TaskType, ExecutionStep
+from .project_meta import ProjectMeta, TaskType, ExecutionStep, FusedPMOutput
 from .graph_structure import (
     GraphStructure,
     NodeDef,
@@ -27,6 +27,7 @@ __all__ = [
     "ProjectMeta",
     "TaskType",
     "ExecutionStep",
+    "FusedPMOutput",
     # Graph structure
     "GraphStructure",
     "NodeDef",
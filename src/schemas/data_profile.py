@@ -9,7 +9,7 @@ class FileInfo(BaseModel):
     """Information about a single file."""
 
     path: str = Field(..., description="File path")
-    file_hash: str = Field(..., description="MD5 hash of the file")
+    file_hash: str = Field(..., description="Content hash of the file (b3:/b2: prefixed hex)")
     file_type: str = Field(..., description="File type (pdf, docx, txt, md, etc.)")
     size_bytes: int = Field(..., description="File size in bytes")
 
@@ -12,6 +12,9 @@ class NodeDef(BaseModel):
     Represents a single node in the LangGraph topology.
     """
 
+    # Nodes are never edited after construction; freezing lets designers share them
+    model_config = ConfigDict(frozen=True)
+
     id: str = Field(..., description="Unique node identifier")
     type: Literal["llm", "tool", "rag", "conditional", "custom"] = Field(
         ..., description="Node type"
@@ -28,6 +31,8 @@ class EdgeDef(BaseModel):
     Represents a direct connection between two nodes.
     """
 
+    model_config = ConfigDict(frozen=True)
+
     source: str = Field(..., description="Source node ID")
     target: str = Field(..., description="Target node ID")
 
@@ -78,3 +78,22 @@ class ProjectMeta(BaseModel):
             }
         },
     )
+
+
+class FusedPMOutput(BaseModel):
+    """Single-call PM output.
+
+    Combines the clarifier verdict, the requirement analysis and (for complex
+    tasks) the execution plan, so the dual-brain flow needs one LLM round trip.
+    """
+
+    is_ready: bool = Field(..., description="Whether the requirement is clear enough")
+    clarification_questions: Optional[List[str]] = Field(
+        default=None, description="Clarification questions when not ready"
+    )
+    project_meta: Optional[ProjectMeta] = Field(
+        default=None, description="Requirement analysis when ready"
+    )
+    execution_plan: Optional[List[ExecutionStep]] = Field(
+        default=None, description="Hierarchical task breakdown when requested"
+    )
@@ -39,7 +39,9 @@ class StateField(BaseModel):
 
     reducer: Optional[str] = Field(None, description="归约函数名称，如 'add_messages' 用于消息累积")
 
+    # Frozen: the designer's stock fields are shared between schemas
     model_config = ConfigDict(
+        frozen=True,
         json_schema_extra={
             "example": {
                 "name": "messages",
@@ -47,7 +49,7 @@ class StateField(BaseModel):
                 "description": "对话历史",
                 "reducer": "add_messages",
             }
-        }
+        },
     )
 
 
@@ -1,6 +1,7 @@
 """Utility modules."""
 
-from .file_utils import ensure_directory, read_json, write_json
+from .file_utils import ensure_directory, read_json, write_json, write_text_if_changed
+from .lru_cache import LRUCache
 from .validation import validate_agent_name
 from .uv_downloader import UVDownloader
 from .performance_metrics import PerformanceMetrics
@@ -10,6 +11,8 @@ __all__ = [
     "ensure_directory",
     "read_json",
     "write_json",
+    "write_text_if_changed",
+    "LRUCache",
     "validate_agent_name",
     "UVDownloader",
     "PerformanceMetrics",
@@ -50,3 +50,30 @@ def write_json(file_path: Path, data: Dict[str, Any], indent: int = 2) -> None:
 
     with open(file_path, "w", encoding="utf-8") as f:
         json.dump(data, f, indent=indent, ensure_ascii=False)
+
+
+def write_text_if_changed(file_path: Path, content: str, encoding: str = "utf-8") -> bool:
+    """Write text to a file only if its current content differs.
+
+    Leaving identical files untouched preserves their mtime for incremental
+    re-compiles and downstream caches.
+
+    Args:
+        file_path: Path to file
+        content: Text to write
+        encoding: Text encoding (default: utf-8)
+
+    Returns:
+        True if the file was written, False if it was already up to date
+    """
+    file_path = Path(file_path)
+    try:
+        if file_path.read_text(encoding=encoding) == content:
+            return False
+    except FileNotFoundError:
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+    except (UnicodeDecodeError, OSError):
+        pass  # Unreadable or corrupt file: overwrite it
+
+    file_path.write_text(content, encoding=encoding)
+    return True
@@ -6,7 +6,7 @@ JSON 工具函数
 
 import json
 import re
-from typing import Type, TypeVar
+from typing import List, Optional, Tuple, Type, TypeVar
 from pydantic import BaseModel
 
 T = TypeVar("T", bound=BaseModel)
@@ -103,6 +103,114 @@ def extract_json_from_text(text: str) -> str:
     raise ValueError(f"Could not extract valid JSON from text. First 200 chars: {text[:200]}...")
 
 
+def find_json_span(text: str, start: int = 0) -> Optional[Tuple[int, int]]:
+    """
+    单次正向扫描, 定位文本中第一个括号平衡的 {...} 片段
+
+    扫描时跟踪字符串状态与转义, 字符串内的花括号不计入深度;
+    线性时间, 不会像贪婪正则那样跨越到无关的花括号。
+
+    Args:
+        text: LLM 返回的原始文本
+        start: 开始查找的位置
+
+    Returns:
+        (起始下标, 结束下标) 左闭右开, 即 text[begin:end] 为 JSON 对象; 不存在时返回 None
+    """
+    begin = text.find("{", start)
+    if begin == -1:
+        return None
+
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(begin, len(text)):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                return begin, i + 1
+    return None
+
+
+class JsonObjectScanner:
+    """
+    find_json_span 的增量版本, 用于流式输出
+
+    文本分块到达时逐块扫描, 括号深度与字符串/转义状态跨块保留,
+    已扫描的文本不会被重新扫描, 总耗时与文本长度成线性关系。
+    """
+
+    def __init__(self) -> None:
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._parts: List[str] = []  # 当前未闭合对象已到达的片段
+
+    def feed(self, chunk: str) -> List[str]:
+        """
+        扫描新到达的文本块
+
+        Args:
+            chunk: 新到达的文本
+
+        Returns:
+            本块内闭合的顶层 {...} 片段 (按出现顺序, 通常为空)
+        """
+        completed = []
+        pos = 0
+        length = len(chunk)
+        while pos < length:
+            segment_start = pos
+            if self._depth == 0:
+                # 对象之外: 直接跳到下一个左花括号
+                segment_start = chunk.find("{", pos)
+                if segment_start == -1:
+                    break
+                self._depth = 1
+                pos = segment_start + 1
+
+            end = None
+            for i in range(pos, length):
+                ch = chunk[i]
+                if self._in_string:
+                    if self._escaped:
+                        self._escaped = False
+                    elif ch == "\\":
+                        self._escaped = True
+                    elif ch == '"':
+                        self._in_string = False
+                elif ch == '"':
+                    self._in_string = True
+                elif ch == "{":
+                    self._depth += 1
+                elif ch == "}":
+                    self._depth -= 1
+                    if self._depth == 0:
+                        end = i + 1
+                        break
+
+            if end is None:
+                self._parts.append(chunk[segment_start:])
+                break
+            self._parts.append(chunk[segment_start:end])
+            completed.append("".join(self._parts))
+            self._parts = []
+            pos = end
+        return completed
+
+
 def validate_json_schema(json_str: str, model: Type[T]) -> T:
     """
     验证 JSON 字符串是否符合 Pydantic 模型
@@ -3,6 +3,13 @@
 import time
 from typing import Dict, Any
 
+# Attribute that receives the duration of each known operation
+_DURATION_FIELDS = {
+    "venv_create": "venv_create_time",
+    "install": "install_time",
+    "download": "download_time",
+}
+
 
 class PerformanceMetrics:
     """Track performance metrics for environment setup operations."""
@@ -12,7 +19,8 @@ class PerformanceMetrics:
         self.venv_create_time: float = 0.0
         self.install_time: float = 0.0
         self.download_time: float = 0.0
-        self._start_times: Dict[str, float] = {}
+        # Monotonic start stamps in integer nanoseconds (no float per start)
+        self._start_times: Dict[str, int] = {}
 
     def start_timer(self, operation: str) -> None:
         """Start timing an operation.
@@ -20,7 +28,7 @@ class PerformanceMetrics:
         Args:
             operation: Name of the operation
         """
-        self._start_times[operation] = time.time()
+        self._start_times[operation] = time.perf_counter_ns()
 
     def stop_timer(self, operation: str) -> float:
         """Stop timing an operation and record duration.
@@ -31,20 +39,17 @@ class PerformanceMetrics:
         Returns:
             Duration in seconds
         """
-        if operation not in self._start_times:
+        start = self._start_times.pop(operation, None)
+        if start is None:
             return 0.0
 
-        duration = time.time() - self._start_times[operation]
+        duration = (time.perf_counter_ns() - start) / 1e9
 
         # Record to appropriate field
-        if operation == "venv_create":
-            self.venv_create_time = duration
-        elif operation == "install":
-            self.install_time = duration
-        elif operation == "download":
-            self.download_time = duration
-
-        del self._start_times[operation]
+        field = _DURATION_FIELDS.get(operation)
+        if field is not None:
+            setattr(self, field, duration)
+
         return duration
 
     def record_venv_create(self, duration: float) -> None:
@@ -4,6 +4,7 @@ This module handles automatic downloading and setup of the uv package manager.
 """
 
 import os
+import shutil
 import sys
 import urllib.request
 from pathlib import Path
@@ -33,6 +34,9 @@ class UVDownloader:
     def ensure_uv(self) -> Path:
         """Ensure uv is available, download if not exists.
 
+        A project-local binary is preferred, then a uv already on PATH; the
+        release archive is only downloaded when neither exists.
+
         Returns:
             Path to uv executable
 
@@ -43,6 +47,11 @@ class UVDownloader:
             print(f"✅ uv already exists: {self.uv_path}")
             return self.uv_path
 
+        system_uv = shutil.which("uv")
+        if system_uv:
+            print(f"✅ Using uv from PATH: {system_uv}")
+            return Path(system_uv)
+
         # Create bin directory
         self.bin_dir.mkdir(parents=True, exist_ok=True)
 
@@ -0,0 +1,384 @@
+"""Unit tests for EnvManager module."""
+
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from src.core import env_manager
+from src.core.env_manager import EnvManager
+
+
+@pytest.fixture
+def manager(tmp_path):
+    """Create an EnvManager for an agent directory under tmp_path."""
+    agent_dir = tmp_path / "agents" / "test_agent"
+    agent_dir.mkdir(parents=True)
+    return EnvManager(agent_dir, use_uv=False)
+
+
+def _python(code: str) -> list[str]:
+    return [sys.executable, "-c", code]
+
+
+# A child that exits at once but leaves a grandchild holding stdout/stderr open
+_GRANDCHILD_HOLDS_PIPE = (
+    "import subprocess, sys; "
+    "subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(15)']); "
+    "print('parent done')"
+)
+
+
+def test_run_command_captures_output(manager):
+    """Test stdout and stderr are returned decoded."""
+    process = manager._run_command(
+        _python("import sys; print('out'); print('err', file=sys.stderr)"), cwd=manager.agent_dir
+    )
+
+    assert process.returncode == 0
+    assert process.stdout.strip() == "out"
+    assert process.stderr.strip() == "err"
+
+
+def test_run_command_nonzero_exit_carries_stderr(manager):
+    """Test a failing command reports its exit code and stderr."""
+    process = manager._run_command(
+        _python("import sys; sys.stderr.write('boom'); sys.exit(3)"), cwd=manager.agent_dir
+    )
+
+    assert process.returncode == 3
+    assert "boom" in process.stderr
+
+
+def test_run_command_timeout(manager):
+    """Test the timeout fires and the child is killed."""
+    start = time.monotonic()
+    with pytest.raises(subprocess.TimeoutExpired):
+        manager._run_command(
+            _python("import time; time.sleep(30)"), cwd=manager.agent_dir, timeout=1
+        )
+
+    assert time.monotonic() - start < 10
+
+
+def test_run_command_grandchild_holding_pipe_does_not_hang(manager):
+    """Test the call returns when the child exits, even if the pipe stays open."""
+    start = time.monotonic()
+    process = manager._run_command(
+        _python(_GRANDCHILD_HOLDS_PIPE), cwd=manager.agent_dir, timeout=20
+    )
+
+    assert process.returncode == 0
+    assert "parent done" in process.stdout
+    assert time.monotonic() - start < 10
+
+
+def test_run_command_without_pidfd(manager, monkeypatch):
+    """Test the sleep-poll fallback used where pidfds are unavailable."""
+    monkeypatch.setattr(env_manager, "_open_pidfd", lambda pid: None)
+
+    process = manager._run_command(_python("print('out')"), cwd=manager.agent_dir)
+    assert process.stdout.strip() == "out"
+
+    with pytest.raises(subprocess.TimeoutExpired):
+        manager._run_command(
+            _python("import time; time.sleep(30)"), cwd=manager.agent_dir, timeout=1
+        )
+
+
+def test_run_command_output_tail_is_bounded(manager):
+    """Test only the last _OUTPUT_TAIL_BYTES of a long stream are kept."""
+    size = 4 * env_manager._OUTPUT_TAIL_BYTES
+    process = manager._run_command(
+        _python(f"import sys; sys.stdout.write('a' * {size} + 'END')"), cwd=manager.agent_dir
+    )
+
+    assert len(process.stdout) == env_manager._OUTPUT_TAIL_BYTES
+    assert process.stdout.endswith("END")
+
+
+def _fake_venv(manager) -> None:
+    """Lay out a minimal venv whose scripts embed its absolute path."""
+    venv_path = manager.venv_path
+    (venv_path / "bin").mkdir(parents=True)
+    (venv_path / "lib" / "site-packages").mkdir(parents=True)
+    (venv_path / "pyvenv.cfg").write_text(f"home = /usr/bin\nprompt = {venv_path}\n")
+    activate = venv_path / "bin" / "activate"
+    activate.write_text(f'VIRTUAL_ENV="{venv_path}"\n')
+    activate.chmod(0o755)
+    (venv_path / "bin" / "python").symlink_to(sys.executable)
+    (venv_path / "lib" / "site-packages" / "pkg.py").write_text("VALUE = 1\n")
+
+
+@pytest.fixture
+def requirements(manager):
+    """Create the agent's requirements.txt."""
+    requirements_file = manager.agent_dir / "requirements.txt"
+    requirements_file.write_text("requests==2.31.0\n")
+    return requirements_file
+
+
+def _sibling(manager, name: str, requirements_text: str) -> EnvManager:
+    """Create an EnvManager for another agent next to manager's."""
+    agent_dir = manager.agent_dir.parent / name
+    agent_dir.mkdir()
+    (agent_dir / "requirements.txt").write_text(requirements_text)
+    return EnvManager(agent_dir, use_uv=False)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="template venvs are POSIX-only")
+def test_store_and_clone_template_venv(manager, requirements):
+    """Test a stored template is cloned into another agent and relocated."""
+    _fake_venv(manager)
+    manager._store_template_venv(requirements, used_uv=False)
+
+    template = manager._template_venv_for(requirements, used_uv=False)
+    assert template.is_dir()
+    assert str(template) in (template / "bin" / "activate").read_text()
+    # The source venv is left untouched
+    assert str(manager.venv_path) in (manager.venv_path / "bin" / "activate").read_text()
+
+    other = _sibling(manager, "other_agent", requirements.read_text())
+    assert other._clone_template_venv(other.agent_dir / "requirements.txt", used_uv=False)
+
+    activate = other.venv_path / "bin" / "activate"
+    assert activate.read_text() == f'VIRTUAL_ENV="{other.venv_path}"\n'
+    assert activate.stat().st_mode & 0o777 == 0o755
+    assert str(other.venv_path) in (other.venv_path / "pyvenv.cfg").read_text()
+    assert (other.venv_path / "bin" / "python").is_symlink()
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="template venvs are POSIX-only")
+def test_cloned_venv_does_not_share_files_with_template(manager, requirements):
+    """Test writes into a cloned venv (e.g. pip install -U) leave the template intact."""
+    _fake_venv(manager)
+    manager._store_template_venv(requirements, used_uv=False)
+    template = manager._template_venv_for(requirements, used_uv=False)
+
+    other = _sibling(manager, "other_agent", requirements.read_text())
+    other._clone_template_venv(other.agent_dir / "requirements.txt", used_uv=False)
+
+    module = other.venv_path / "lib" / "site-packages" / "pkg.py"
+    template_module = template / "lib" / "site-packages" / "pkg.py"
+    assert module.stat().st_ino != template_module.stat().st_ino
+
+    with open(module, "w") as f:
+        f.write("VALUE = 2\n")
+    assert template_module.read_text() == "VALUE = 1\n"
+
+
+def test_clone_without_template(manager, requirements):
+    """Test cloning reports False when no template was stored."""
+    assert not manager._clone_template_venv(requirements, used_uv=False)
+    assert not manager.venv_path.exists()
+
+
+def test_relocate_venv_rewrites_embedded_paths(tmp_path):
+    """Test relocation rewrites scripts and pyvenv.cfg but not symlinks or other files."""
+    old_path = tmp_path / "old" / ".venv"
+    venv_path = tmp_path / "new" / ".venv"
+    (venv_path / "bin").mkdir(parents=True)
+    (venv_path / "pyvenv.cfg").write_text(f"prompt = {old_path}\n")
+    (venv_path / "bin" / "activate").write_text(f"VIRTUAL_ENV={old_path}\n")
+    (venv_path / "bin" / "tool").write_text("#!/usr/bin/env python\n")
+    (venv_path / "bin" / "link").symlink_to(venv_path / "bin" / "activate")
+
+    env_manager._relocate_venv(venv_path, old_path)
+
+    assert (venv_path / "pyvenv.cfg").read_text() == f"prompt = {venv_path}\n"
+    assert (venv_path / "bin" / "activate").read_text() == f"VIRTUAL_ENV={venv_path}\n"
+    assert (venv_path / "bin" / "tool").read_text() == "#!/usr/bin/env python\n"
+    assert (venv_path / "bin" / "link").is_symlink()
+
+
+def test_relocate_venv_to_explicit_target(tmp_path):
+    """Test a staged copy is pointed at its final location, not the staging one."""
+    old_path, staged, final = tmp_path / "a", tmp_path / "staging", tmp_path / "final"
+    staged.mkdir()
+    (staged / "pyvenv.cfg").write_text(f"prompt = {old_path}\n")
+
+    env_manager._relocate_venv(staged, old_path, final)
+
+    assert (staged / "pyvenv.cfg").read_text() == f"prompt = {final}\n"
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="template venvs are POSIX-only")
+def test_venv_cache_evicts_least_recently_used(manager, requirements, monkeypatch):
+    """Test the template cache stays bounded, keeping recently cloned templates."""
+    monkeypatch.setattr(env_manager, "_VENV_CACHE_MAX_TEMPLATES", 2)
+
+    managers = [manager] + [
+        _sibling(manager, f"agent_{index}", f"package-{index}==1.0\n") for index in range(2)
+    ]
+    templates = []
+    for index, agent in enumerate(managers):
+        _fake_venv(agent)
+        agent._store_template_venv(agent.agent_dir / "requirements.txt", used_uv=False)
+        template = agent._template_venv_for(agent.agent_dir / "requirements.txt", used_uv=False)
+        os.utime(template.parent, (index, index))
+        templates.append(template)
+
+    assert not templates[0].exists()
+    assert templates[1].exists() and templates[2].exists()
+
+    manager.clear_venv_cache()
+    assert list(manager.venv_cache_dir.iterdir()) == []
+
+
+class _FakeUv:
+    """Stand-in for _run_command that records uv invocations."""
+
+    def __init__(self, offline_returncode: int = 0, compile_returncode: int = 0):
+        self.calls: list[list[str]] = []
+        self.offline_returncode = offline_returncode
+        self.compile_returncode = compile_returncode
+
+    def __call__(self, cmd, cwd, timeout=60, env=None):
+        self.calls.append(cmd)
+        returncode = 0
+        if "compile" in cmd:
+            returncode = self.compile_returncode
+            Path(cmd[cmd.index("-o") + 1]).write_text("requests==2.31.0\n")
+        elif "--offline" in cmd:
+            returncode = self.offline_returncode
+        return subprocess.CompletedProcess(cmd, returncode, "", "uv error" if returncode else "")
+
+
+@pytest.fixture
+def uv_manager(manager, requirements):
+    """EnvManager with a fake uv binary and venv interpreter."""
+    manager._uv_path = Path("/fake/uv")
+    manager._python_exe = Path(sys.executable)
+    return manager
+
+
+def test_install_with_uv_compiles_then_replays_lock(uv_manager, requirements, monkeypatch):
+    """Test the first install pins a lockfile and the next one replays it offline."""
+    fake_uv = _FakeUv()
+    monkeypatch.setattr(uv_manager, "_run_command", fake_uv)
+    lock_file = uv_manager._uv_lock_file(requirements, uv_manager._python_exe)
+
+    assert uv_manager._install_with_uv(requirements)
+    install, compile_ = fake_uv.calls
+    assert str(requirements) in install and "--offline" not in install
+    assert "compile" in compile_
+    assert lock_file.exists()
+
+    fake_uv.calls.clear()
+    assert uv_manager._install_with_uv(requirements)
+    (replay,) = fake_uv.calls
+    assert "--offline" in replay
+    assert replay[replay.index("-r") + 1] == str(lock_file)
+
+
+def test_install_with_uv_falls_back_when_offline_replay_misses(
+    uv_manager, requirements, monkeypatch
+):
+    """Test an offline replay failure (pruned cache) falls back to an online install."""
+    lock_file = uv_manager._uv_lock_file(requirements, uv_manager._python_exe)
+    lock_file.parent.mkdir(parents=True)
+    lock_file.write_text("requests==2.31.0\n")
+    fake_uv = _FakeUv(offline_returncode=2)
+    monkeypatch.setattr(uv_manager, "_run_command", fake_uv)
+
+    assert uv_manager._install_with_uv(requirements)
+    replay, install, compile_ = fake_uv.calls
+    assert "--offline" in replay
+    assert str(requirements) in install and "--offline" not in install
+    assert "compile" in compile_
+
+
+def test_install_with_uv_drops_lock_when_compile_fails(uv_manager, requirements, monkeypatch):
+    """Test a failed uv pip compile leaves no lockfile to replay."""
+    monkeypatch.setattr(uv_manager, "_run_command", _FakeUv(compile_returncode=1))
+
+    assert uv_manager._install_with_uv(requirements)
+    assert not uv_manager._uv_lock_file(requirements, uv_manager._python_exe).exists()
+
+
+def test_uv_lock_file_tracks_requirements(uv_manager, requirements):
+    """Test the lockfile is keyed by the requirements content."""
+    lock_file = uv_manager._uv_lock_file(requirements, uv_manager._python_exe)
+    assert lock_file.parent == uv_manager.uv_cache_dir / "locks"
+    assert lock_file == uv_manager._uv_lock_file(requirements, uv_manager._python_exe)
+
+    requirements.write_text("requests==2.32.0\n")
+    assert lock_file != uv_manager._uv_lock_file(requirements, uv_manager._python_exe)
+
+
+def test_setup_many_resolves_uv_once_before_setup(tmp_path, monkeypatch):
+    """Test uv is fetched once up front and every agent still gets a result in order."""
+    events = []
+    managers = []
+    for index in range(3):
+        agent_dir = tmp_path / "agents" / f"agent_{index}"
+        agent_dir.mkdir(parents=True)
+        (agent_dir / "requirements.txt").write_text("requests\n" if index < 2 else "rich\n")
+        managers.append(EnvManager(agent_dir, use_uv=True))
+
+    def ensure_uv():
+        events.append("ensure_uv")
+        return Path("/fake/uv")
+
+    def setup_environment(manager):
+        events.append(manager.agent_dir.name)
+        return manager.agent_dir.name
+
+    for manager in managers:
+        monkeypatch.setattr(manager.uv_downloader, "ensure_uv", ensure_uv)
+    monkeypatch.setattr(EnvManager, "setup_environment", setup_environment)
+
+    results = EnvManager.setup_many(managers, max_workers=2)
+
+    assert results == ["agent_0", "agent_1", "agent_2"]
+    assert events[0] == "ensure_uv" and events.count("ensure_uv") == 1
+    # agent_1 shares agent_0's requirements, so it runs after the leaders
+    assert events[-1] == "agent_1"
+
+
+def test_precompile_bytecode_waits_for_compileall(manager, capsys):
+    """Test bytecode exists when precompilation returns and bad files are not fatal."""
+    manager._python_exe = Path(sys.executable)
+    site_packages = manager.venv_path / "lib" / "site-packages"
+    site_packages.mkdir(parents=True)
+    (site_packages / "good.py").write_text("VALUE = 1\n")
+    (site_packages / "bad.py").write_text("def broken(:\n")
+
+    manager._precompile_bytecode()
+
+    assert list((site_packages / "__pycache__").glob("good.*.pyc"))
+    assert "incomplete" in capsys.readouterr().out
+
+
+def test_uv_env_keeps_uv_index_unless_pip_index_is_exported(manager, monkeypatch):
+    """Test uv uses its own index configuration unless the caller set PIP_INDEX_URL."""
+    monkeypatch.delenv("PIP_INDEX_URL", raising=False)
+    monkeypatch.delenv("UV_INDEX_URL", raising=False)
+    assert "UV_INDEX_URL" not in manager._uv_env()
+
+    monkeypatch.setenv("PIP_INDEX_URL", "https://example.invalid/simple")
+    manager._uv_env_cache = None
+    assert manager._uv_env()["UV_INDEX_URL"] == "https://example.invalid/simple"
+
+
+def test_pip_env_respects_exported_cache_dir(manager, monkeypatch):
+    """Test the shared pip cache is only a default for PIP_CACHE_DIR."""
+    monkeypatch.delenv("PIP_CACHE_DIR", raising=False)
+    assert manager._pip_env()["PIP_CACHE_DIR"] == str(manager.pip_cache_dir)
+
+    monkeypatch.setenv("PIP_CACHE_DIR", "/custom/pip-cache")
+    manager._pip_env_cache = None
+    assert manager._pip_env()["PIP_CACHE_DIR"] == "/custom/pip-cache"
+
+
+def test_uv_env_respects_exported_cache_dir(manager, monkeypatch):
+    """Test the project uv cache is only a default for UV_CACHE_DIR."""
+    monkeypatch.delenv("UV_CACHE_DIR", raising=False)
+    assert manager._uv_env()["UV_CACHE_DIR"] == str(manager.uv_cache_dir)
+
+    monkeypatch.setenv("UV_CACHE_DIR", "/custom/uv-cache")
+    manager._uv_env_cache = None
+    assert manager._uv_env()["UV_CACHE_DIR"] == "/custom/uv-cache"
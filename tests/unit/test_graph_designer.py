@@ -0,0 +1,89 @@
+"""Unit tests for GraphDesigner."""
+
+import pytest
+from unittest.mock import MagicMock
+
+from src.core.graph_designer import GraphDesigner
+from src.schemas import PatternConfig, PatternType, ProjectMeta
+from src.llm import BuilderClient
+
+
+@pytest.fixture
+def designer():
+    """Create a GraphDesigner with a mock builder client."""
+    return GraphDesigner(MagicMock(spec=BuilderClient))
+
+
+def _meta(description: str, intent: str = "", complexity: int = 1) -> ProjectMeta:
+    return ProjectMeta(
+        agent_name="test_agent",
+        description=description,
+        user_intent_summary=intent,
+        complexity_score=complexity,
+    )
+
+
+@pytest.mark.parametrize(
+    "description,intent",
+    [
+        ("写一篇文章并反复迭代", ""),
+        ("Draft an essay", "then REVIEW and revise it"),
+        ("代码助手", "帮我优化这段代码"),
+    ],
+)
+def test_heuristic_selects_reflection_on_keywords(designer, description, intent):
+    """Iteration keywords in description or intent select Reflection."""
+    meta = _meta(description, intent)
+    assert designer._heuristic_pattern_selection(meta) == PatternType.REFLECTION
+
+
+def test_heuristic_falls_back_to_supervisor_and_sequential(designer):
+    """Without keywords, complexity decides between Supervisor and Sequential."""
+    assert designer._heuristic_pattern_selection(_meta("Chat bot", complexity=7)) == (
+        PatternType.SUPERVISOR
+    )
+    assert designer._heuristic_pattern_selection(_meta("Chat bot")) == PatternType.SEQUENTIAL
+
+
+def test_generate_sample_args_fills_required_fields_only(designer):
+    """Sample args cover required fields, typed per JSON schema."""
+    metadata = MagicMock(examples=None)
+    metadata.openapi_schema = {
+        "properties": {
+            "query": {"type": "string"},
+            "limit": {"type": "integer"},
+            "ratio": {"type": "number"},
+            "flag": {"type": "boolean"},
+            "tags": {"type": "array"},
+            "extra": {"type": "object"},
+            "optional": {"type": "string"},
+        },
+        "required": ["query", "limit", "ratio", "flag", "tags", "extra"],
+    }
+
+    assert designer._generate_sample_args("search", metadata) == {
+        "query": "sample_query",
+        "limit": 1,
+        "ratio": 1.0,
+        "flag": True,
+        "tags": [],
+        "extra": {},
+    }
+
+
+def test_heuristic_prefers_reflection_over_supervisor(designer):
+    """Iteration keywords win over a high complexity score."""
+    meta = _meta("Research agent", "Iterate on the report until approved", complexity=8)
+    assert designer._heuristic_pattern_selection(meta) == PatternType.REFLECTION
+
+
+def test_pattern_state_fields_do_not_share_defaults(designer):
+    """Each schema gets its own mutable default values."""
+    pattern = PatternConfig(pattern_type=PatternType.SUPERVISOR)
+    first = designer._get_pattern_state_fields(pattern)
+    second = designer._get_pattern_state_fields(pattern)
+
+    tool_results = next(f for f in first if f.name == "tool_results")
+    tool_results.default["leaked"] = True
+
+    assert next(f for f in second if f.name == "tool_results").default == {}
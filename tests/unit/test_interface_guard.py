@@ -17,6 +17,14 @@ def mock_builder_client():
     return client
 
 
+@pytest.fixture(autouse=True)
+def clear_fix_cache():
+    """Start every test without fixes cached by earlier tests."""
+    InterfaceGuard._FIX_CACHE.clear()
+    yield
+    InterfaceGuard._FIX_CACHE.clear()
+
+
 @pytest.fixture
 def sample_schema():
     """Sample tool schema for testing."""
@@ -75,6 +83,48 @@ class TestInterfaceGuardValidation:
         # Should still be valid as Pydantic ignores extra fields by default
         assert is_valid is True
 
+    def test_coercible_value_falls_back_to_pydantic(self, mock_builder_client, sample_schema):
+        """Test values that need coercion are still judged by Pydantic."""
+        guard = InterfaceGuard(mock_builder_client)
+
+        is_valid, errors = guard.validate_sync(
+            "test_tool", {"query": "test", "max_results": "5"}, sample_schema
+        )
+
+        assert is_valid is True
+        assert errors == []
+
+    def test_try_validate(self, mock_builder_client, sample_schema):
+        """Test the synchronous fast path returns a result only for valid args."""
+        guard = InterfaceGuard(mock_builder_client)
+
+        result = guard.try_validate("test_tool", {"query": "test"}, sample_schema)
+        assert result.is_valid is True
+        assert result.corrected_args == {"query": "test"}
+
+        assert guard.try_validate("test_tool", {"max_results": 5}, sample_schema) is None
+        mock_builder_client.call.assert_not_called()
+
+    def test_model_reused_for_same_schema(self, mock_builder_client, sample_schema):
+        """Test the generated model is cached across guards and key order."""
+        first = InterfaceGuard(mock_builder_client)._create_pydantic_model(sample_schema)
+        reordered = dict(reversed(list(sample_schema.items())))
+        second = InterfaceGuard(mock_builder_client)._create_pydantic_model(reordered)
+
+        assert first is second
+
+    def test_model_cache_is_bounded(self, mock_builder_client, monkeypatch):
+        """Test the shared model cache evicts least recently used schemas."""
+        monkeypatch.setattr(InterfaceGuard._MODEL_CACHE, "maxsize", 2)
+        guard = InterfaceGuard(mock_builder_client)
+
+        for index in range(5):
+            guard._create_pydantic_model(
+                {"type": "object", "properties": {f"field_{index}": {"type": "string"}}}
+            )
+
+        assert len(InterfaceGuard._MODEL_CACHE) == 2
+
 
 class TestInterfaceGuardAutoCorrection:
     """Test auto-correction functionality."""
@@ -128,6 +178,63 @@ class TestInterfaceGuardAutoCorrection:
         assert result.is_valid is True
         assert isinstance(result.corrected_args["max_results"], int)
 
+    @pytest.mark.asyncio
+    async def test_successful_fix_reused_for_same_input(self, mock_builder_client, sample_schema):
+        """Test a validated fix is reused instead of calling the LLM again."""
+        mock_builder_client.call.return_value = '{"query": "corrected", "max_results": 5}'
+
+        for _ in range(2):
+            guard = InterfaceGuard(mock_builder_client, max_retries=3)
+            result = await guard.validate_and_fix("test_tool", {"max_results": 5}, sample_schema)
+            assert result.is_valid is True
+            assert result.corrected_args["query"] == "corrected"
+
+        assert mock_builder_client.call.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_fix_not_reused_across_builder_models(self, mock_builder_client, sample_schema):
+        """Test a fix cached for one builder model is not served to another."""
+        mock_builder_client.call.return_value = '{"query": "corrected", "max_results": 5}'
+
+        for model in ("model-a", "model-b"):
+            mock_builder_client.config = MagicMock(model=model, temperature=0.0)
+            guard = InterfaceGuard(mock_builder_client, max_retries=3)
+            result = await guard.validate_and_fix("test_tool", {"max_results": 5}, sample_schema)
+            assert result.is_valid is True
+
+        assert mock_builder_client.call.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_validate_batch_fixes_only_failed_items(self, mock_builder_client, sample_schema):
+        """Test a batch is validated together and only invalid entries are corrected."""
+        guard = InterfaceGuard(mock_builder_client, max_retries=1)
+        mock_builder_client.call.return_value = '{"query": "fixed"}'
+
+        results = await guard.validate_batch(
+            "test_tool", [{"query": "a"}, {"max_results": 5}, {"query": "c"}], sample_schema
+        )
+
+        assert [r.is_valid for r in results] == [True, True, True]
+        assert [r.retry_count for r in results] == [0, 1, 0]
+        assert results[1].corrected_args == {"query": "fixed"}
+        assert mock_builder_client.call.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_auto_correction_extracts_json_from_prose(
+        self, mock_builder_client, sample_schema
+    ):
+        """Test the first balanced JSON object is extracted from surrounding text."""
+        guard = InterfaceGuard(mock_builder_client, max_retries=1)
+
+        mock_builder_client.call.return_value = (
+            '修正如下: {"query": "a {b} \\"c}", "max_results": 3} 另见 {"other": 1}'
+        )
+
+        result = await guard.validate_and_fix("test_tool", {"max_results": 5}, sample_schema)
+
+        assert result.is_valid is True
+        assert result.corrected_args == {"query": 'a {b} "c}', "max_results": 3}
+
 
 class TestInterfaceGuardEdgeCases:
     """Test edge cases and error handling."""
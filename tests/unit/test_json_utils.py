@@ -0,0 +1,31 @@
+"""Unit tests for JSON utilities."""
+
+from src.utils.json_utils import JsonObjectScanner, find_json_span
+
+
+def test_find_json_span_skips_braces_in_strings():
+    """Test braces inside strings do not end the object."""
+    text = 'Here: {"a": "}{", "b": {"c": 1}} trailing }'
+    begin, end = find_json_span(text)
+    assert text[begin:end] == '{"a": "}{", "b": {"c": 1}}'
+
+
+def test_scanner_matches_find_json_span_across_chunks():
+    """Test the incremental scanner finds the same object however the text is split."""
+    text = 'prose {"q": "say \\"}\\"", "n": {"x": [1, 2]}} more {"second": true}'
+    begin, end = find_json_span(text)
+
+    for size in range(1, len(text) + 1):
+        scanner = JsonObjectScanner()
+        found = []
+        for i in range(0, len(text), size):
+            found.extend(scanner.feed(text[i : i + size]))
+        assert found == [text[begin:end], '{"second": true}']
+
+
+def test_scanner_reports_nothing_for_unclosed_object():
+    """Test an object still streaming in is not reported."""
+    scanner = JsonObjectScanner()
+    assert scanner.feed('{"a": {"b": 1}') == []
+    assert scanner.feed(", ") == []
+    assert scanner.feed('"c": 2}') == ['{"a": {"b": 1}, "c": 2}']
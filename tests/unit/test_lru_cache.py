@@ -0,0 +1,32 @@
+"""Unit tests for LRUCache."""
+
+from src.utils import LRUCache
+
+
+def test_evicts_least_recently_used():
+    """Test a read refreshes an entry so the oldest untouched one is evicted."""
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_clear_resets_counters():
+    """Test clear drops entries and hit/miss counters."""
+    cache = LRUCache()
+    cache.put(("tuple", "key"), object())
+    cache.get(("tuple", "key"))
+    cache.get("missing")
+
+    cache.clear()
+
+    assert len(cache) == 0
+    assert (cache.hits, cache.misses) == (0, 0)
@@ -5,7 +5,7 @@ from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock
 
 from src.core.pm import PM
-from src.schemas import ProjectMeta, TaskType
+from src.schemas import FusedPMOutput, ProjectMeta, TaskType
 from src.llm import BuilderClient
 
 
@@ -138,5 +138,168 @@ def test_save_and_load_project_meta(pm, tmp_path):
     assert loaded.has_rag == project_meta.has_rag
 
 
+@pytest.mark.asyncio
+async def test_save_and_load_project_meta_async(pm, tmp_path):
+    """Test the non-blocking save/load variants round-trip project metadata."""
+    project_meta = ProjectMeta(
+        agent_name="test_agent",
+        description="Test description",
+        task_type=TaskType.RAG,
+        user_intent_summary="Test intent",
+    )
+
+    output_path = tmp_path / "nested" / "project_meta.json"
+    await pm.save_project_meta_async(project_meta, output_path)
+    loaded = await pm.load_project_meta_async(output_path)
+
+    assert loaded == project_meta
+
+
+@pytest.mark.asyncio
+async def test_analyze_requirements_reuses_cached_result(pm, mock_builder_client):
+    """Test a repeated requirement is answered from cache without another LLM call."""
+    mock_response = ProjectMeta(
+        agent_name="friendly_chatbot",
+        description="A friendly chatbot assistant",
+        has_rag=False,
+        task_type=TaskType.CHAT,
+        language="en-US",
+        user_intent_summary="Create a friendly chatbot",
+        clarification_needed=False,
+    )
+    mock_builder_client.call = AsyncMock(return_value=mock_response)
+
+    first = await pm.analyze_requirements("Create a friendly chatbot")
+    second = await pm.analyze_requirements("Create a  friendly chatbot ")
+
+    assert second == first
+    assert second is not first
+    assert mock_builder_client.call.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_speculative_clarification_loop_runs_analysis_once(mock_builder_client):
+    """Test speculative mode analyzes alongside the clarifier without repeating the call."""
+    meta = ProjectMeta(
+        agent_name="friendly_chatbot",
+        description="A friendly chatbot assistant",
+        task_type=TaskType.CHAT,
+        user_intent_summary="Create a friendly chatbot",
+    )
+
+    async def fake_call(prompt, schema=None):
+        if schema is ProjectMeta:
+            return meta
+        return '{"is_ready": true, "completeness_score": 9, "clarification_questions": []}'
+
+    mock_builder_client.call = AsyncMock(side_effect=fake_call)
+    pm = PM(mock_builder_client, speculative=True)
+
+    result = await pm.analyze_with_clarification_loop("Create a friendly chatbot")
+
+    assert result.status == "ready"
+    assert result.agent_name == "friendly_chatbot"
+    assert mock_builder_client.call.await_count == 2
+    assert [entry["role"] for entry in pm.conversation_history] == ["user", "assistant"]
+
+
+@pytest.mark.asyncio
+async def test_discarded_speculative_analysis_leaves_no_trace(mock_builder_client):
+    """Test a speculative analysis dropped for clarification touches neither history nor cache."""
+    meta = ProjectMeta(
+        agent_name="vague_agent",
+        description="Unclear request",
+        task_type=TaskType.CHAT,
+        user_intent_summary="Build something",
+    )
+
+    async def fake_call(prompt, schema=None):
+        if schema is ProjectMeta:
+            return meta
+        return '{"is_ready": false, "completeness_score": 2, "clarification_questions": ["What?"]}'
+
+    mock_builder_client.call = AsyncMock(side_effect=fake_call)
+    pm = PM(mock_builder_client, speculative=True)
+
+    result = await pm.analyze_with_clarification_loop("Build something")
+
+    assert result.status == "clarifying"
+    assert list(pm.conversation_history) == []
+    assert pm.response_cache.get(pm._cache_key("analyze", "Build something", [])) is None
+
+
+@pytest.mark.asyncio
+async def test_analyze_fused_uses_single_llm_call(pm, mock_builder_client):
+    """Test the fused flow gets clarification and analysis from one LLM call."""
+    fused = FusedPMOutput(
+        is_ready=True,
+        project_meta=ProjectMeta(
+            agent_name="friendly_chatbot",
+            description="A friendly chatbot assistant",
+            task_type=TaskType.CHAT,
+            user_intent_summary="Create a friendly chatbot",
+        ),
+    )
+    mock_builder_client.call = AsyncMock(return_value=fused)
+
+    result = await pm.analyze_fused("Create a friendly chatbot")
+
+    assert result.status == "ready"
+    assert result.agent_name == "friendly_chatbot"
+    assert result.complexity_score == 1
+    assert mock_builder_client.call.await_count == 1
+    assert mock_builder_client.call.call_args.kwargs["schema"] is FusedPMOutput
+
+
+def test_extract_json_takes_first_balanced_object(pm):
+    """Test JSON extraction ignores braces in strings and in trailing prose."""
+    text = 'Result:\n```json\n{"a": {"b": "}"}}\n```\nNote: {not json}'
+
+    assert pm._extract_json(text) == {"a": {"b": "}"}}
+    assert pm._extract_json('Answer {"is_ready": true} then {junk}') == {"is_ready": True}
+
+
+def test_estimate_complexity(pm):
+    """Test complexity scoring counts each keyword bucket and files once."""
+    assert pm.estimate_complexity("Create a friendly chatbot") == 1
+    assert pm.estimate_complexity("Search the web AND summarize the document", True) == 6
+
+
+@pytest.mark.asyncio
+async def test_clarify_stream_json_stops_after_complete_object(mock_builder_client):
+    """Test streamed JSON replies are parsed as soon as the object is complete."""
+    consumed = []
+
+    async def fake_stream(prompt):
+        for chunk in ['{"is_ready": true, ', '"clarification_questions": []}', " Extra text"]:
+            consumed.append(chunk)
+            yield chunk
+
+    mock_builder_client.stream = fake_stream
+    pm = PM(mock_builder_client, stream_json=True)
+
+    is_ready, questions = await pm.clarify_requirements("Create a friendly chatbot")
+
+    assert is_ready is True
+    assert questions is None
+    assert len(consumed) == 2
+
+
+@pytest.mark.asyncio
+async def test_clarifier_questions_are_validated(mock_builder_client):
+    """Test a malformed question list from the clarifier never reaches ProjectMeta."""
+    mock_builder_client.call = AsyncMock(
+        return_value='{"is_ready": false, "clarification_questions": "What input?"}'
+    )
+    pm = PM(mock_builder_client)
+
+    result = await pm.analyze_with_clarification_loop("Build an agent")
+
+    assert result.status == "clarifying"
+    questions = result.clarification_questions
+    assert isinstance(questions, list) and all(isinstance(q, str) for q in questions)
+    assert questions != list("What input?")
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -3,8 +3,9 @@
 import pytest
 from pathlib import Path
 import tempfile
+import sqlite3
 
-from src.core.profiler import Profiler
+from src.core.profiler import CACHE_FILENAME, Profiler
 from src.schemas import DataProfile
 
 
@@ -49,7 +50,7 @@ def test_analyze_single_file(profiler, sample_text_file):
     assert profile.estimated_tokens > 0
     assert len(profile.files) == 1
     assert profile.files[0].file_type == "txt"
-    assert len(profile.files[0].file_hash) == 32  # MD5 hash length
+    assert profile.files[0].file_hash.startswith(("b3:", "b2:"))
 
 
 def test_analyze_multiple_files(profiler, sample_text_file, sample_markdown_file):
@@ -61,6 +62,52 @@ def test_analyze_multiple_files(profiler, sample_text_file, sample_markdown_file
     assert profile.total_size_bytes > 0
 
 
+def test_analyze_keeps_input_order_and_skips_missing(sample_text_file, sample_markdown_file):
+    """Test concurrent profiling reports files in input order without missing ones."""
+    profiler = Profiler(max_workers=4)
+    missing = sample_text_file.parent / "missing.txt"
+
+    profile = profiler.analyze([sample_markdown_file, missing, sample_text_file])
+
+    assert [f.path for f in profile.files] == [str(sample_markdown_file), str(sample_text_file)]
+
+
+def test_cache_skips_unchanged_files(sample_text_file, tmp_path, monkeypatch):
+    """Test cached results are reused until the file changes."""
+    first = Profiler(cache_dir=tmp_path / "cache").analyze([sample_text_file])
+
+    profiler = Profiler(cache_dir=tmp_path / "cache")
+
+    def fail(file_path):
+        raise AssertionError(f"{file_path} should have been served from cache")
+
+    monkeypatch.setattr(profiler, "_profile_one", fail)
+    second = profiler.analyze([sample_text_file])
+
+    assert second.files == first.files
+    assert second.estimated_tokens == first.estimated_tokens
+    assert second.languages_detected == first.languages_detected
+
+    sample_text_file.write_text("changed content", encoding="utf-8")
+    third = Profiler(cache_dir=tmp_path / "cache").analyze([sample_text_file])
+
+    assert third.files[0].file_hash != first.files[0].file_hash
+
+
+def test_cache_replaces_row_of_edited_file(sample_text_file, tmp_path):
+    """Test an edited file overwrites its cache row instead of adding one."""
+    for content in ("first version", "second version", "third version"):
+        sample_text_file.write_text(content, encoding="utf-8")
+        Profiler(cache_dir=tmp_path / "cache").analyze([sample_text_file])
+
+    conn = sqlite3.connect(tmp_path / "cache" / CACHE_FILENAME)
+    try:
+        (count,) = conn.execute("SELECT COUNT(*) FROM files").fetchone()
+    finally:
+        conn.close()
+    assert count == 1
+
+
 def test_table_detection(profiler, sample_markdown_file):
     """Test table detection in markdown."""
     profile = profiler.analyze([sample_markdown_file])
@@ -86,13 +133,14 @@ def test_language_detection_chinese(profiler, tmp_path):
 
 
 def test_hash_calculation(profiler, sample_text_file):
-    """Test MD5 hash calculation."""
+    """Test content hash calculation."""
     hash1 = profiler._calculate_hash(sample_text_file)
     hash2 = profiler._calculate_hash(sample_text_file)
 
     # Same file should have same hash
     assert hash1 == hash2
-    assert len(hash1) == 32
+    assert hash1[:3] in ("b3:", "b2:")
+    assert len(hash1) == 3 + 64
 
 
 def test_save_and_load_profile(profiler, sample_text_file, tmp_path):
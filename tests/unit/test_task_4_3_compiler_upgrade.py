@@ -57,6 +57,30 @@ def test_requirements_exclude_testing():
     print("✅ 测试 2 通过: 可以排除测试依赖")
 
 
+def test_requirements_deduplicated():
+    """测试 2b: 验证 requirements.txt 不含重复依赖"""
+
+    from src.schemas import RAGConfig
+
+    template_dir = project_root / "src" / "templates"
+    compiler = Compiler(template_dir)
+
+    requirements = compiler._generate_requirements(
+        has_rag=True, has_tools=True, rag_config=RAGConfig(), include_testing=True
+    )
+    packages = [
+        line for line in requirements.splitlines() if line.strip() and not line.startswith("#")
+    ]
+
+    assert len(packages) == len(set(packages))
+    assert packages.count("langchain-community>=0.2.0") == 1
+    assert packages.count("langchain-openai>=0.1.0") == 1
+    # 所有包都已在前面列出的分组不留下空标题
+    assert "# Tool dependencies" not in requirements
+
+    print("✅ 测试 2b 通过: requirements.txt 已去重")
+
+
 def test_generate_pip_config():
     """测试 3: 验证生成 pip.conf"""
 
@@ -131,6 +155,64 @@ def test_env_template_updated():
     print("✅ 测试 6 通过: .env.template 更新正确")
 
 
+def test_write_text_if_changed(tmp_path):
+    """测试 6b: 内容未变化时不重写文件"""
+
+    from src.utils.file_utils import write_text_if_changed
+
+    target = tmp_path / "pip.conf"
+    assert write_text_if_changed(target, "[global]\n") is True
+    assert write_text_if_changed(target, "[global]\n") is False
+    assert write_text_if_changed(target, "[install]\n") is True
+    assert target.read_text(encoding="utf-8") == "[install]\n"
+
+    print("✅ 测试 6b 通过: 仅在内容变化时写入")
+
+
+def test_env_change_detection_ignores_timestamp():
+    """测试 6b2: .env 变化检测忽略时间戳行"""
+
+    from src.core.compiler import _ENV_TIMESTAMP_PREFIX, _strip_env_timestamp
+
+    old = f"# header\n{_ENV_TIMESTAMP_PREFIX}2024-01-01\nKEY=a\n"
+    new = f"# header\n{_ENV_TIMESTAMP_PREFIX}2024-06-30\nKEY=a\n"
+    assert _strip_env_timestamp(old) == _strip_env_timestamp(new)
+    assert _strip_env_timestamp(old) != _strip_env_timestamp(new.replace("KEY=a", "KEY=b"))
+
+    print("✅ 测试 6b2 通过: 时间戳不触发 .env 重写")
+
+
+def test_tool_init_params_literals(monkeypatch):
+    """测试 6c: 工具默认参数生成合法的 Python 字面量"""
+
+    import src.core.compiler as compiler_module
+
+    fake_tool = {
+        "id": "fake_tool",
+        "name": "Fake Tool",
+        "import_path": "fake.module.FakeTool",
+        "args_schema": {
+            "properties": {
+                "query": {"type": "string", "default": 'say "hi"'},
+                "verbose": {"type": "boolean", "default": False},
+                "limit": {"type": "integer", "default": None},
+                "text": {"type": "string"},
+            }
+        },
+    }
+    monkeypatch.setattr(compiler_module, "CURATED_TOOLS", [fake_tool])
+
+    compiler = Compiler(project_root / "src" / "templates")
+    context = compiler._prepare_tool_context(["fake_tool"])
+
+    params = context["tool_inits"][0]["params"]
+    assert params == "query='say \"hi\"', verbose=False, limit=None"
+    # 生成的参数串必须是合法的调用参数
+    compile(f"FakeTool({params})", "<params>", "eval")
+
+    print("✅ 测试 6c 通过: 默认参数正确转义")
+
+
 def test_optimization_comments():
     """测试 7: 验证优化注释"""
 
@@ -160,6 +242,7 @@ if __name__ == "__main__":
     # 运行所有测试
     test_requirements_include_deepeval()
     test_requirements_exclude_testing()
+    test_requirements_deduplicated()
     test_generate_pip_config()
     test_generate_install_script_sh()
     test_generate_install_script_bat()
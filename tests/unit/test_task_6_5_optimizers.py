@@ -14,9 +14,11 @@ from src.schemas.tools_config import ToolsConfig
 from src.schemas.analysis_result import AnalysisResult, FixStep
 from src.schemas.test_report import IterationReport, TestCaseReport as SchemaTestCaseReport
 from src.schemas.project_meta import ProjectMeta, TaskType
+from src.schemas.simulation import SimulationIssue, SimulationResult
 from src.core.rag_optimizer import RAGOptimizer
 from src.core.tool_optimizer import ToolOptimizer
 from src.core.compiler_optimizer import CompilerOptimizer
+from src.core.graph_optimizer import GraphOptimizer
 
 
 class TestRAGOptimizer:
@@ -140,6 +142,72 @@ class TestCompilerOptimizer:
         content = req_file.read_text()
         assert "new_package" in content
 
+    @pytest.mark.asyncio
+    async def test_optimize_dependencies_skips_declared(self, tmp_path):
+        """Test already-declared packages are not appended again"""
+        optimizer = CompilerOptimizer(MagicMock())
+
+        req_file = tmp_path / "requirements.txt"
+        req_file.write_text("langchain>=0.2.0\n# new_package is mentioned here only\n")
+
+        analysis = AnalysisResult(
+            primary_issue="Import error",
+            root_cause="Missing package",
+            fix_strategy=[],
+            estimated_success_rate=0.5,
+        )
+
+        error_msg = "No module named 'new_package'"
+
+        assert await optimizer.optimize_dependencies(tmp_path, analysis, error_msg)
+        # Second attempt with the same error must not duplicate the entry
+        assert not await optimizer.optimize_dependencies(tmp_path, analysis, error_msg)
+        assert req_file.read_text().count("new_package>=0.1.0") == 1
+
+
+class TestGraphOptimizer:
+    """Test Graph optimizer"""
+
+    @pytest.mark.asyncio
+    async def test_speculative_fix_is_used_after_failed_simulation(self):
+        """Test the pre-started fix replaces the serial retry when simulation fails"""
+        designer = MagicMock()
+        designer.fix_logic = AsyncMock(side_effect=["graph_1", "graph_2", "graph_3"])
+
+        failed = SimulationResult(
+            success=False,
+            total_steps=1,
+            execution_trace="",
+            issues=[
+                SimulationIssue(issue_type="infinite_loop", severity="error", description="loop")
+            ],
+        )
+        passed = SimulationResult(success=True, total_steps=1, execution_trace="")
+        simulator = MagicMock()
+        simulator.simulate = AsyncMock(side_effect=[failed, passed])
+
+        analysis = AnalysisResult(
+            primary_issue="Loop detected",
+            root_cause="Missing exit edge",
+            fix_strategy=[],
+            estimated_success_rate=0.5,
+        )
+        meta = ProjectMeta(
+            agent_name="Test",
+            description="Test agent",
+            user_intent_summary="Test",
+            has_rag=False,
+        )
+
+        optimizer = GraphOptimizer(designer, simulator, speculative=True)
+        graph, sim_result = await optimizer.optimize_graph("graph_0", analysis, meta)
+
+        # Second simulation ran on the speculative fix of graph_1
+        assert graph == "graph_2"
+        assert not sim_result.has_errors()
+        assert simulator.simulate.await_args_list[1].args[0] == "graph_2"
+        assert designer.fix_logic.call_args_list[1].args[0] == "graph_1"
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])